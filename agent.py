@@ -1,4 +1,4 @@
-import asyncio, random, string
+import asyncio, copy, random, string
 import nest_asyncio
 
 nest_asyncio.apply()
@@ -12,6 +12,7 @@ import uuid
 import models
 
 from python.helpers import extract_tools, files, errors, history, tokens, context as context_helper
+from python.helpers import tool_registry
 from python.helpers import dirty_json
 from python.helpers.print_style import PrintStyle
 
@@ -21,8 +22,9 @@ from langchain_core.prompts import (
 from langchain_core.messages import SystemMessage, BaseMessage
 
 import python.helpers.log as Log
-from python.helpers.dirty_json import DirtyJson
+from python.helpers.dirty_json import DirtyJson, DirtyJsonStream
 from python.helpers.defer import DeferredTask
+from python.helpers.stream_coalescer import StreamCoalescer
 from typing import Callable
 from python.helpers.localization import Localization
 from python.helpers.extension import call_extensions
@@ -169,7 +171,7 @@ class AgentContext:
             ),
             "no": self.no,
             "log_guid": self.log.guid,
-            "log_version": len(self.log.updates),
+            "log_version": self.log.version,
             "log_length": len(self.log.logs),
             "paused": self.paused,
             "last_message": (
@@ -286,6 +288,8 @@ class AgentConfig:
     code_exec_ssh_port: int = 55022
     code_exec_ssh_user: str = "root"
     code_exec_ssh_pass: str = ""
+    stream_coalesce_ms: int = 50  # batch streamed chunks for extensions and parsing, 0 disables
+    stream_coalesce_chars: int = 512
     additional: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -308,12 +312,28 @@ class LoopData:
         self.params_temporary: dict = {}
         self.params_persistent: dict = {}
         self.current_tool = None
+        self.prompt_tokens: int | None = None  # estimate of the last prompt built
 
         # override values with kwargs
         for key, value in kwargs.items():
             setattr(self, key, value)
 
 
+class ContextWindow:
+    """Last prompt sent to the chat model, formatted to text only when someone asks for it."""
+
+    def __init__(self, messages: list[BaseMessage], tokens: int):
+        self.messages = messages
+        self.tokens = tokens
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = ChatPromptTemplate.from_messages(self.messages).format()
+        return self._text
+
+
 # intervention exception class - skips rest of message loop iteration
 class InterventionException(Exception):
     pass
@@ -413,13 +433,39 @@ class Agent:
                             # Use the potentially modified full text for downstream processing
                             await self.handle_response_stream(stream_data["full"])
 
-                        # call main LLM
-                        agent_response, _reasoning = await self.call_chat_model(
-                            messages=prompt,
-                            response_callback=stream_callback,
-                            reasoning_callback=reasoning_callback,
+                        # coalesce chunks so extensions and parsing run per batch, not per token
+                        reasoning_stream = StreamCoalescer(
+                            reasoning_callback,
+                            self.config.stream_coalesce_ms,
+                            self.config.stream_coalesce_chars,
+                        )
+                        response_stream = StreamCoalescer(
+                            stream_callback,
+                            self.config.stream_coalesce_ms,
+                            self.config.stream_coalesce_chars,
                         )
 
+                        async def response_chunk_callback(chunk: str, full: str):
+                            await reasoning_stream.flush()  # reasoning always precedes response
+                            await response_stream.add(chunk, full)
+
+                        # call main LLM
+                        try:
+                            agent_response, _reasoning = await self.call_chat_model(
+                                messages=prompt,
+                                response_callback=response_chunk_callback,
+                                reasoning_callback=reasoning_stream.add,
+                                input_tokens=self.loop_data.prompt_tokens,
+                            )
+                        finally:
+                            # no timer flush after a failed stream
+                            reasoning_stream.cancel()
+                            response_stream.cancel()
+
+                        # process whatever is left in the buffers
+                        await reasoning_stream.flush()
+                        await response_stream.flush()
+
                         # Notify extensions to finalize their stream filters
                         await self.call_extensions(
                             "reasoning_stream_end", loop_data=self.loop_data
@@ -489,7 +535,8 @@ class Agent:
 
         # set system prompt and message history
         loop_data.system = await self.get_system_prompt(self.loop_data)
-        loop_data.history_output = self.history.output()
+        history_output = loop_data.history_output = self.history.output()
+        history_count = len(history_output)
 
         # and allow extensions to edit them
         await self.call_extensions("message_loop_prompts_after", loop_data=loop_data)
@@ -498,7 +545,7 @@ class Agent:
         system_text = "\n\n".join(loop_data.system)
 
         # join extras
-        extras = history.Message(  # type: ignore[abstract]
+        extras_message = history.Message(  # type: ignore[abstract]
             False,
             content=self.read_prompt(
                 "agent.context.extras.md",
@@ -506,9 +553,24 @@ class Agent:
                     {**loop_data.extras_persistent, **loop_data.extras_temporary}
                 ),
             ),
-        ).output()
+        )
+        extras = extras_message.output()
         loop_data.extras_temporary.clear()
 
+        # count tokens from the cached per-message counts of the history,
+        # only the system prompt and extras are new text in each iteration
+        if loop_data.history_output is history_output and len(history_output) == history_count:
+            history_tokens = self.history.get_tokens()
+        else:  # replaced or changed by an extension
+            history_tokens = tokens.approximate_tokens(
+                history.output_text(loop_data.history_output)
+            )
+        loop_data.prompt_tokens = (
+            tokens.approximate_tokens(system_text)
+            + history_tokens
+            + extras_message.get_tokens()
+        )
+
         # convert history + extras to LLM format
         history_langchain: list[BaseMessage] = history.output_langchain(
             loop_data.history_output + extras
@@ -519,15 +581,11 @@ class Agent:
             SystemMessage(content=system_text),
             *history_langchain,
         ]
-        full_text = ChatPromptTemplate.from_messages(full_prompt).format()
 
-        # store as last context window content
+        # store as last context window content, text is rendered on request
         self.set_data(
             Agent.DATA_NAME_CTX_WINDOW,
-            {
-                "text": full_text,
-                "tokens": tokens.approximate_tokens(full_text),
-            },
+            ContextWindow(full_prompt, loop_data.prompt_tokens),
         )
 
         return full_prompt
@@ -731,6 +789,7 @@ class Agent:
         response_callback: Callable[[str, str], Awaitable[None]] | None = None,
         reasoning_callback: Callable[[str, str], Awaitable[None]] | None = None,
         background: bool = False,
+        input_tokens: int | None = None,
     ):
         response = ""
 
@@ -743,6 +802,7 @@ class Agent:
             reasoning_callback=reasoning_callback,
             response_callback=response_callback,
             rate_limiter_callback=self.rate_limiter_callback if not background else None,
+            input_tokens=input_tokens,
         )
 
         return response, reasoning
@@ -876,8 +936,15 @@ class Agent:
         try:
             if len(stream) < 25:
                 return  # no reason to try
-            response = DirtyJson.parse_string(stream)
+            # resumable parser, only the text added since the last batch is parsed
+            parser = self.loop_data.params_temporary.get("_response_parser")
+            if not parser:
+                parser = DirtyJsonStream()
+                self.loop_data.params_temporary["_response_parser"] = parser
+            response = parser.update(stream)
             if isinstance(response, dict):
+                # extensions may modify parsed data, keep the parser's live object intact
+                response = copy.deepcopy(response)
                 await self.call_extensions(
                     "response_stream",
                     loop_data=self.loop_data,
@@ -892,28 +959,9 @@ class Agent:
         self, name: str, method: str | None, args: dict, message: str, loop_data: LoopData | None, **kwargs
     ):
         from python.tools.unknown import Unknown
-        from python.helpers.tool import Tool
-
-        classes = []
 
-        # try agent tools first
-        if self.config.profile:
-            try:
-                classes = extract_tools.load_classes_from_file(
-                    "agents/" + self.config.profile + "/tools/" + name + ".py", Tool  # type: ignore[arg-type]
-                )
-            except Exception:
-                pass
-
-        # try default tools
-        if not classes:
-            try:
-                classes = extract_tools.load_classes_from_file(
-                    "python/tools/" + name + ".py", Tool  # type: ignore[arg-type]
-                )
-            except Exception as e:
-                pass
-        tool_class = classes[0] if classes else Unknown
+        # agent tools first, default tools as backup, resolved classes are cached by file mtime
+        tool_class = tool_registry.get_tool_class(name, self.config.profile) or Unknown
         return tool_class(
             agent=self, name=name, method=method, args=args, message=message, loop_data=loop_data, **kwargs
         )
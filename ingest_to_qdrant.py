@@ -5,23 +5,28 @@ Embeds documents and uploads to Qdrant with proper chunking
 """
 
 import json
+import os
 import uuid
 import hashlib
 from typing import List, Dict
 from sentence_transformers import SentenceTransformer
 import requests
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
+from python.helpers.bm25_sparse import BM25SparseEncoder
 
 QDRANT_URL = "http://qdrant-unity:6333"
 COLLECTION_NAME = "unity_project_kb"
 METADATA_FILE = "/tmp/unity_kb_metadata.json"
+BM25_STATS_FILE = "/tmp/unity_kb_bm25.json"  # document frequencies, query with the same file
 
 class UnityKBIngester:
     def __init__(self):
         print("🔧 Initializing embeddings model...")
         self.dense_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        self.sparse_vectorizer = TfidfVectorizer(max_features=1000)
+        # full re-ingest, document frequencies are rebuilt from scratch
+        if os.path.exists(BM25_STATS_FILE):
+            os.remove(BM25_STATS_FILE)
+        self.sparse_encoder = BM25SparseEncoder(BM25_STATS_FILE)
         print("   ✅ Model loaded: all-MiniLM-L6-v2 (384 dimensions)")
     
     def chunk_code(self, content: str, max_chunk_size: int = 1000) -> List[str]:
@@ -73,23 +78,10 @@ class UnityKBIngester:
         seed = f"{asset_guid}_{chunk_index}"
         return str(uuid.uuid5(namespace, seed))
     
-    def create_sparse_vector(self, text: str) -> List[Dict]:
-        """Create sparse vector for keyword matching"""
-        # Simple TF-IDF based sparse vector
-        # In production, use SPLADE or BM25
-        tokens = text.lower().split()
-        token_counts = {}
-        for token in tokens:
-            token_counts[token] = token_counts.get(token, 0) + 1
-        
-        # Convert to sparse format: list of {index, value}
-        sparse = []
-        for i, (token, count) in enumerate(list(token_counts.items())[:100]):
-            sparse.append({
-                "index": hash(token) % 100000,
-                "value": float(count)
-            })
-        return sparse
+    def create_sparse_vector(self, text: str) -> Dict:
+        """BM25 sparse vector for keyword matching, frequencies must be counted first"""
+        sparse = self.sparse_encoder.encode_document(text, update=False)
+        return {"indices": list(sparse.keys()), "values": list(sparse.values())}
     
     def ingest_documents(self, batch_size: int = 100):
         """Main ingestion pipeline"""
@@ -103,21 +95,24 @@ class UnityKBIngester:
             documents = json.load(f)
         print(f"   ✅ Loaded {len(documents)} documents")
         
+        # Count document frequencies of all chunks first, so every chunk gets the same BM25 statistics
+        chunked = []
+        for doc in documents:
+            chunks = self.chunk_code(doc['content'])
+            enriched = [self.enrich_context(chunk, doc) for chunk in chunks]
+            self.sparse_encoder.encode_documents(enriched)
+            chunked.append((chunks, enriched))
+        self.sparse_encoder.save()
+        
         # Process documents
         print(f"\n2. Processing documents...")
         points = []
         total_chunks = 0
         
-        for doc_idx, doc in enumerate(documents):
+        for doc_idx, (doc, (chunks, enriched)) in enumerate(zip(documents, chunked)):
             print(f"\r   Processing {doc_idx + 1}/{len(documents)}: {doc['file_path'][:50]}...", end='')
             
-            # Chunk the content
-            chunks = self.chunk_code(doc['content'])
-            
-            for chunk_idx, chunk in enumerate(chunks):
-                # Context enrichment
-                enriched_chunk = self.enrich_context(chunk, doc)
-                
+            for chunk_idx, (chunk, enriched_chunk) in enumerate(zip(chunks, enriched)):
                 # Generate embeddings
                 dense_vector = self.dense_model.encode(enriched_chunk).tolist()
                 sparse_vector = self.create_sparse_vector(enriched_chunk)
@@ -133,10 +128,7 @@ class UnityKBIngester:
                     "id": point_id,
                     "vector": {
                         "text-dense": dense_vector,
-                        "text-sparse": {
-                            "indices": [sv["index"] for sv in sparse_vector],
-                            "values": [sv["value"] for sv in sparse_vector]
-                        }
+                        "text-sparse": sparse_vector
                     },
                     "payload": {
                         "asset_guid": doc['asset_guid'],
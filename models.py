@@ -1,7 +1,10 @@
+import asyncio
 from dataclasses import dataclass, field
 from enum import Enum
+import json
 import logging
 import os
+import threading
 from typing import (
     Any,
     Awaitable,
@@ -14,7 +17,7 @@ from typing import (
     TypedDict,
 )
 
-from litellm import completion, acompletion, embedding
+from litellm import completion, acompletion, embedding, aembedding
 import litellm
 import openai
 from litellm.types.utils import ModelResponse
@@ -24,8 +27,9 @@ from python.helpers import settings, dirty_json
 from python.helpers.dotenv import load_dotenv
 from python.helpers.providers import get_provider_config
 from python.helpers.rate_limiter import RateLimiter
-from python.helpers.tokens import approximate_tokens
+from python.helpers.tokens import approximate_tokens, estimate_tokens
 from python.helpers import dirty_json, browser_use_monkeypatch
+from python.helpers.embedding_batcher import get_batcher
 
 from langchain_core.language_models.chat_models import SimpleChatModel
 from langchain_core.outputs.chat_generation import ChatGenerationChunk
@@ -196,6 +200,8 @@ class ChatGenerationResult:
 
 rate_limiters: dict[str, RateLimiter] = {}
 api_keys_round_robin: dict[str, int] = {}
+local_embedding_models: dict[str, "LocalEmbeddingModel"] = {}
+_local_embedding_models_lock = threading.Lock()
 
 
 def get_api_key(service: str) -> str:
@@ -256,6 +262,7 @@ async def apply_rate_limiter(
     rate_limiter_callback: (
         Callable[[str, str, int, int], Awaitable[bool]] | None
     ) = None,
+    input_tokens: int | None = None,
 ):
     if not model_config:
         return
@@ -266,9 +273,14 @@ async def apply_rate_limiter(
         model_config.limit_input,
         model_config.limit_output,
     )
-    limiter.add(input=approximate_tokens(input_text))
-    limiter.add(requests=1)
-    await limiter.wait(rate_limiter_callback)
+    if input_tokens is None:
+        # a tokenizer pass is only worth it when input tokens are limited
+        input_tokens = (
+            approximate_tokens(input_text)
+            if model_config.limit_input > 0
+            else estimate_tokens(input_text)
+        )
+    await limiter.acquire(rate_limiter_callback, input=input_tokens, requests=1)
     return limiter
 
 
@@ -289,6 +301,42 @@ def apply_rate_limiter_sync(
     )
 
 
+def _has_rate_limits(model_config: ModelConfig | None) -> bool:
+    return bool(
+        model_config
+        and (
+            model_config.limit_requests > 0
+            or model_config.limit_input > 0
+            or model_config.limit_output > 0
+        )
+    )
+
+
+async def apply_embedding_rate_limiter(model_config: ModelConfig | None, texts: List[str]):
+    # skipped without configured limits, tokens are estimated from length instead of encoded
+    if not _has_rate_limits(model_config):
+        return
+    await apply_rate_limiter(model_config, "", input_tokens=estimate_tokens(texts))
+
+
+def apply_embedding_rate_limiter_sync(model_config: ModelConfig | None, texts: List[str]):
+    if not _has_rate_limits(model_config):
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(apply_embedding_rate_limiter(model_config, texts))
+    # sync embedding on an event loop thread, waiting here would stall every task of that loop,
+    # the usage is counted without waiting so the async callers wait for it instead
+    get_rate_limiter(
+        model_config.provider,  # type: ignore
+        model_config.name,  # type: ignore
+        model_config.limit_requests,  # type: ignore
+        model_config.limit_input,  # type: ignore
+        model_config.limit_output,  # type: ignore
+    ).add(input=estimate_tokens(texts), requests=1)
+
+
 class LiteLLMChatWrapper(SimpleChatModel):
     model_name: str
     provider: str
@@ -464,6 +512,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
         rate_limiter_callback: (
             Callable[[str, str, int, int], Awaitable[bool]] | None
         ) = None,
+        input_tokens: int | None = None,
         **kwargs: Any,
     ) -> Tuple[str, str]:
 
@@ -481,8 +530,12 @@ class LiteLLMChatWrapper(SimpleChatModel):
         msgs_conv = self._convert_messages(messages)
 
         # Apply rate limiting if configured
+        # callers that know the prompt size (agent loop) pass it to skip tokenizing it again
         limiter = await apply_rate_limiter(
-            self.a0_model_conf, str(msgs_conv), rate_limiter_callback
+            self.a0_model_conf,
+            str(msgs_conv) if input_tokens is None else "",
+            rate_limiter_callback,
+            input_tokens=input_tokens,
         )
 
         # Prepare call kwargs and retry config (strip A0-only params before calling LiteLLM)
@@ -521,11 +574,11 @@ class LiteLLMChatWrapper(SimpleChatModel):
                             if tokens_callback:
                                 await tokens_callback(
                                     output["reasoning_delta"],
-                                    approximate_tokens(output["reasoning_delta"]),
+                                    estimate_tokens(output["reasoning_delta"]),
                                 )
                             # Add output tokens to rate limiter if configured
                             if limiter:
-                                limiter.add(output=approximate_tokens(output["reasoning_delta"]))
+                                limiter.add(output=estimate_tokens(output["reasoning_delta"]))
                         # collect response delta and call callbacks
                         if output["response_delta"]:
                             if response_callback:
@@ -533,11 +586,11 @@ class LiteLLMChatWrapper(SimpleChatModel):
                             if tokens_callback:
                                 await tokens_callback(
                                     output["response_delta"],
-                                    approximate_tokens(output["response_delta"]),
+                                    estimate_tokens(output["response_delta"]),
                                 )
                             # Add output tokens to rate limiter if configured
                             if limiter:
-                                limiter.add(output=approximate_tokens(output["response_delta"]))
+                                limiter.add(output=estimate_tokens(output["response_delta"]))
 
                 # non-stream response
                 else:
@@ -545,9 +598,9 @@ class LiteLLMChatWrapper(SimpleChatModel):
                     output = result.add_chunk(parsed)
                     if limiter:
                         if output["response_delta"]:
-                            limiter.add(output=approximate_tokens(output["response_delta"]))
+                            limiter.add(output=estimate_tokens(output["response_delta"]))
                         if output["reasoning_delta"]:
-                            limiter.add(output=approximate_tokens(output["reasoning_delta"]))
+                            limiter.add(output=estimate_tokens(output["reasoning_delta"]))
 
                 # Successful completion of stream
                 return result.response, result.reasoning
@@ -673,23 +726,78 @@ class LiteLLMEmbeddingWrapper(Embeddings):
         self.kwargs = kwargs
         self.a0_model_conf = model_config
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        # Apply rate limiting if configured
-        apply_rate_limiter_sync(self.a0_model_conf, " ".join(texts))
-
-        resp = embedding(model=self.model_name, input=texts, **self.kwargs)
+    @staticmethod
+    def _vectors(resp) -> List[List[float]]:
         return [
             item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
             for item in resp.data  # type: ignore
         ]
 
-    def embed_query(self, text: str) -> List[float]:
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        return self._vectors(embedding(model=self.model_name, input=texts, **self.kwargs))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
         # Apply rate limiting if configured
-        apply_rate_limiter_sync(self.a0_model_conf, text)
+        apply_embedding_rate_limiter_sync(self.a0_model_conf, texts)
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await apply_embedding_rate_limiter(self.a0_model_conf, texts)
+        resp = await aembedding(model=self.model_name, input=texts, **self.kwargs)
+        return self._vectors(resp)
 
-        resp = embedding(model=self.model_name, input=[text], **self.kwargs)
-        item = resp.data[0]  # type: ignore
-        return item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
+    async def aembed_query(self, text: str) -> List[float]:
+        await apply_embedding_rate_limiter(self.a0_model_conf, [text])
+        # concurrent queries of all agents go out in one request
+        key = f"{self.model_name}\\{json.dumps(self.kwargs, sort_keys=True, default=str)}"
+        return await get_batcher(key, self._embed).embed(text)
+
+
+class LocalEmbeddingModel:
+    """SentenceTransformer weights shared by all wrappers of the same provider, model and arguments."""
+
+    def __init__(self, key: str, model: str, **st_kwargs: Any):
+        self.key = key
+        self.model_name = model
+        self.st_kwargs = st_kwargs
+        self.model: SentenceTransformer | None = None
+        # guards loading only, inference does not change the model and runs concurrently
+        self.lock = threading.Lock()
+
+    def load(self) -> SentenceTransformer:
+        with self.lock:
+            if self.model is None:
+                self.model = SentenceTransformer(self.model_name, **self.st_kwargs)
+            return self.model
+
+    def encode(self, texts: List[str]):
+        model = self.model or self.load()
+        return model.encode(texts, convert_to_tensor=False)  # type: ignore
+
+    def memory_bytes(self) -> int:
+        if self.model is None:
+            return 0
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def get_local_embedding_model(provider: str, model: str, **st_kwargs: Any) -> LocalEmbeddingModel:
+    key = f"{provider}\\{model}\\{json.dumps(st_kwargs, sort_keys=True, default=str)}"
+    with _local_embedding_models_lock:
+        entry = local_embedding_models.get(key)
+        if entry is None:
+            entry = local_embedding_models[key] = LocalEmbeddingModel(key, model, **st_kwargs)
+    # loaded outside the registry lock, other models stay available meanwhile
+    entry.load()
+    return entry
+
+
+def get_local_embedding_models_memory() -> dict[str, int]:
+    """Resident parameter and buffer bytes of each loaded local embedding model."""
+    return {key: entry.memory_bytes() for key, entry in list(local_embedding_models.items())}
 
 
 class LocalSentenceTransformerWrapper(Embeddings):
@@ -720,26 +828,32 @@ class LocalSentenceTransformerWrapper(Embeddings):
         }
         st_kwargs = {k: v for k, v in (kwargs or {}).items() if k in st_allowed_keys}
 
-        self.model = SentenceTransformer(model, **st_kwargs)
+        # weights are loaded once per process, wrappers only differ in their rate limits
+        self.shared = get_local_embedding_model(provider, model, **st_kwargs)
+        self.model = self.shared.model
         self.model_name = model
         self.a0_model_conf = model_config
 
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.shared.encode(texts)
+        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         # Apply rate limiting if configured
-        apply_rate_limiter_sync(self.a0_model_conf, " ".join(texts))
-
-        embeddings = self.model.encode(texts, convert_to_tensor=False)  # type: ignore
-        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+        apply_embedding_rate_limiter_sync(self.a0_model_conf, texts)
+        return self._embed(texts)
 
     def embed_query(self, text: str) -> List[float]:
-        # Apply rate limiting if configured
-        apply_rate_limiter_sync(self.a0_model_conf, text)
+        return self.embed_documents([text])[0]
 
-        embedding = self.model.encode([text], convert_to_tensor=False)  # type: ignore
-        result = (
-            embedding[0].tolist() if hasattr(embedding[0], "tolist") else embedding[0]
-        )
-        return result  # type: ignore
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await apply_embedding_rate_limiter(self.a0_model_conf, texts)
+        return await asyncio.to_thread(self._embed, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await apply_embedding_rate_limiter(self.a0_model_conf, [text])
+        # concurrent queries of all agents share one forward pass
+        return await get_batcher(self.shared.key, self._embed).embed(text)
 
 
 def _get_litellm_chat(
@@ -917,3 +1031,10 @@ def get_embedding_model(
     orig = provider.lower()
     provider_name, kwargs = _merge_provider_defaults("embedding", orig, kwargs)
     return _get_litellm_embedding(name, provider_name, model_config, **kwargs)
+
+
+async def warm_up_embedding_model(provider: str, name: str, **kwargs: Any) -> dict[str, int]:
+    """Load the embedding model and run one embedding, returns get_local_embedding_models_memory()."""
+    model = get_embedding_model(provider, name, **kwargs)
+    await model.aembed_query("warm-up")
+    return get_local_embedding_models_memory()
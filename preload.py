@@ -1,5 +1,5 @@
 import asyncio
-from python.helpers import runtime, whisper, settings
+from python.helpers import runtime, whisper, settings, tool_registry
 from python.helpers.print_style import PrintStyle
 from python.helpers import kokoro_tts
 import models
@@ -20,12 +20,13 @@ async def preload():
         async def preload_embedding():
             if set["embed_model_provider"].lower() == "huggingface":
                 try:
-                    # Use the new LiteLLM-based model system
-                    emb_mod = models.get_embedding_model(
+                    # load the shared weights agents will reuse and run one embedding
+                    memory = await models.warm_up_embedding_model(
                         "huggingface", set["embed_model_name"]
                     )
-                    emb_txt = await emb_mod.aembed_query("test")
-                    return emb_txt
+                    for key, size in memory.items():
+                        PrintStyle().print(f"Embedding model {key}: {size / 2**20:.0f} MB")
+                    return memory
                 except Exception as e:
                     PrintStyle().error(f"Error in preload_embedding: {e}")
 
@@ -37,9 +38,17 @@ async def preload():
                 except Exception as e:
                     PrintStyle().error(f"Error in preload_kokoro: {e}")
 
+        # index tool classes so the first tool call does not pay for imports
+        async def preload_tools():
+            try:
+                return tool_registry.index_tools(set["agent_profile"])
+            except Exception as e:
+                PrintStyle().error(f"Error in preload_tools: {e}")
+
         # async tasks to preload
         tasks = [
             preload_embedding(),
+            preload_tools(),
             # preload_whisper(),
             # preload_kokoro()
         ]
@@ -9,10 +9,15 @@ class GetCtxWindow(ApiHandler):
         context = self.use_context(ctxid)
         agent = context.streaming_agent or context.agent0
         window = agent.get_data(agent.DATA_NAME_CTX_WINDOW)
-        if not window or not isinstance(window, dict):
+        if not window:
             return {"content": "", "tokens": 0}
 
-        text = window["text"]
-        tokens = window["tokens"]
+        # the prompt is kept as messages and formatted here, not on every agent iteration
+        if isinstance(window, dict):  # stored by older versions
+            text = window.get("text", "")
+            tokens = window.get("tokens", 0)
+        else:
+            text = window.text
+            tokens = window.tokens
 
         return {"content": text, "tokens": tokens}
@@ -1,3 +1,5 @@
+import uuid
+
 from python.helpers.api import ApiHandler, Request, Response
 
 from agent import AgentContext, AgentContextType
@@ -7,12 +9,23 @@ from python.helpers.localization import Localization
 from python.helpers.dotenv import get_dotenv_value
 
 
+# contexts and tasks listing shared by all clients: (signature, version, contexts, tasks)
+_listing: tuple | None = None
+_listing_version = 0
+# versions restart with the process, clients compare the guid too
+_listing_guid = str(uuid.uuid4())
+
+
 class Poll(ApiHandler):
 
     async def process(self, input: dict, request: Request) -> dict | Response:
         ctxid = input.get("context", "")
         from_no = input.get("log_from", 0)
         notifications_from = input.get("notifications_from", 0)
+        # clients that can apply appended content and keep an unchanged listing
+        log_deltas = bool(input.get("log_deltas", False))
+        listing_from = input.get("listing_version", None)
+        listing_guid = input.get("listing_guid", None)
 
         # Get timezone from input (default to dotenv default or UTC if not provided)
         timezone = input.get("timezone", get_dotenv_value("DEFAULT_USER_TIMEZONE", "UTC"))
@@ -28,16 +41,67 @@ class Poll(ApiHandler):
             context = None
 
         # Get logs only if we have a context
-        logs = context.log.output(start=from_no) if context else []
+        logs = context.log.output(start=from_no, deltas=log_deltas) if context else []
 
         # Get notifications from global notification manager
         notification_manager = AgentContext.get_notification_manager()
         notifications = notification_manager.output(start=notifications_from)
 
-        # loop AgentContext._contexts
-
         # Get a task scheduler instance
         scheduler = TaskScheduler.get()
+        listing_version, ctxs, tasks = self._get_listing(scheduler, timezone)
+
+        # data from this server
+        return {
+            "deselect_chat": ctxid and not context,
+            "context": context.id if context else "",
+            **(
+                {}
+                if listing_guid == _listing_guid and listing_from == listing_version
+                else {"contexts": ctxs, "tasks": tasks}
+            ),
+            "listing_version": listing_version,
+            "listing_guid": _listing_guid,
+            "logs": logs,
+            "log_guid": context.log.guid if context else "",
+            "log_version": context.log.version if context else 0,
+            "log_progress": context.log.progress if context else 0,
+            "log_progress_active": context.log.progress_active if context else False,
+            "paused": context.paused if context else False,
+            "notifications": notifications,
+            "notifications_guid": notification_manager.guid,
+            "notifications_version": len(notification_manager.updates),
+        }
+
+    @staticmethod
+    def _listing_signature(scheduler: TaskScheduler, timezone: str) -> tuple:
+        # everything the sidebar shows, so log_version/log_length in a listing are as of its last
+        # change, they are left out to not resend the listing on every streamed chunk
+        contexts = tuple(
+            (
+                ctx.id,
+                ctx.type,
+                ctx.name,
+                ctx.no,
+                ctx.paused,
+                ctx.created_at,
+                ctx.last_message,
+                ctx.log.guid,
+                repr(ctx.output_data),
+            )
+            for ctx in AgentContext._contexts.values()
+        )
+        tasks = tuple(
+            (task.uuid, task.context_id, task.state, task.updated_at)
+            for task in scheduler.get_tasks()
+        )
+        return timezone, contexts, tasks
+
+    def _get_listing(self, scheduler: TaskScheduler, timezone: str) -> tuple[int, list, list]:
+        global _listing, _listing_version
+        signature = self._listing_signature(scheduler, timezone)
+        if _listing and _listing[0] == signature:
+            return _listing[1], _listing[2], _listing[3]
 
         # Always reload the scheduler on each poll to ensure we have the latest task state
         # await scheduler.reload() # does not seem to be needed
@@ -107,19 +171,6 @@ class Poll(ApiHandler):
         ctxs.sort(key=lambda x: x["created_at"], reverse=True)
         tasks.sort(key=lambda x: x["created_at"], reverse=True)
 
-        # data from this server
-        return {
-            "deselect_chat": ctxid and not context,
-            "context": context.id if context else "",
-            "contexts": ctxs,
-            "tasks": tasks,
-            "logs": logs,
-            "log_guid": context.log.guid if context else "",
-            "log_version": len(context.log.updates) if context else 0,
-            "log_progress": context.log.progress if context else 0,
-            "log_progress_active": context.log.progress_active if context else False,
-            "paused": context.paused if context else False,
-            "notifications": notifications,
-            "notifications_guid": notification_manager.guid,
-            "notifications_version": len(notification_manager.updates),
-        }
+        _listing_version += 1
+        _listing = (signature, _listing_version, ctxs, tasks)
+        return _listing_version, ctxs, tasks
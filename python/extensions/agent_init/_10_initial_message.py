@@ -4,6 +4,8 @@ from python.helpers.extension import Extension
 
 
 class InitialMessage(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         """
@@ -4,6 +4,8 @@ from python.helpers.extension import Extension
 
 
 class LoadProfileSettings(Extension):
+    STATELESS = True
+
     
     async def execute(self, **kwargs) -> None:
 
@@ -8,6 +8,8 @@ import math
 
 
 class LogForStream(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), text: str = "", **kwargs):
         # create log message and store it in loop data temporary params
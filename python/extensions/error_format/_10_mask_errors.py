@@ -3,6 +3,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class MaskErrorSecrets(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         # Get error data from kwargs
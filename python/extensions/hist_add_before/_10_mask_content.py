@@ -3,6 +3,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class MaskHistoryContent(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         # Get content data from kwargs
@@ -6,6 +6,8 @@ import os, re
 LEN_MIN = 500
 
 class SaveToolCallFile(Extension):
+    STATELESS = True
+
     async def execute(self, data: dict[str, Any] | None = None, **kwargs):
         if not data:
             return
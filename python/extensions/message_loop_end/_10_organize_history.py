@@ -6,6 +6,8 @@ DATA_NAME_TASK = "_organize_history_task"
 
 
 class OrganizeHistory(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # is there a running task? if yes, skip this round, the wait extension will double check the context size
         task = self.agent.get_data(DATA_NAME_TASK)
@@ -4,6 +4,8 @@ from python.helpers import persist_chat
 
 
 class SaveChat(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # Skip saving BACKGROUND contexts as they should be ephemeral
         if self.agent.context.type == AgentContextType.BACKGROUND:
@@ -11,6 +11,8 @@ DATA_NAME_ITER = "_recall_memories_iter"
 
 
 class RecallMemories(Extension):
+    STATELESS = True
+
 
     # INTERVAL = 3
     # HISTORY = 10000
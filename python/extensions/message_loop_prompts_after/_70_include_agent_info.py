@@ -2,6 +2,8 @@ from python.helpers.extension import Extension
 from agent import LoopData
 
 class IncludeAgentInfo(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         
         # read prompt
@@ -4,6 +4,8 @@ from python.helpers import projects
 
 
 class IncludeProjectExtras(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
 
         # active project
@@ -5,6 +5,8 @@ from python.extensions.message_loop_prompts_after._50_recall_memories import DAT
 from python.helpers import settings
 
 class RecallWait(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
 
         set = settings.get_settings()
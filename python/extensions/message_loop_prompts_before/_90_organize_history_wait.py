@@ -5,6 +5,8 @@ import asyncio
 
 
 class OrganizeHistoryWait(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
 
         # sync action only required if the history is too large, otherwise leave it in background
@@ -4,6 +4,8 @@ from agent import Agent, LoopData
 DATA_NAME_ITER_NO = "iteration_no"
 
 class IterationNo(Extension):
+    STATELESS = True
+
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # total iteration number
         no = self.agent.get_data(DATA_NAME_ITER_NO) or 0
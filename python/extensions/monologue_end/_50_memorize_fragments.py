@@ -9,6 +9,8 @@ from python.tools.memory_load import DEFAULT_THRESHOLD as DEFAULT_MEMORY_THRESHO
 
 
 class MemorizeMemories(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # try:
@@ -5,6 +5,8 @@ import asyncio
 
 
 class MemoryInit(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         db = await memory.Memory.get(self.agent)
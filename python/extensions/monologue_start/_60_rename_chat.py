@@ -5,6 +5,8 @@ import asyncio
 
 
 class RenameChat(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         asyncio.create_task(self.change_name())
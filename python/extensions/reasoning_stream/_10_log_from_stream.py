@@ -8,6 +8,8 @@ import math
 from python.extensions.before_main_llm_call._10_log_for_stream import build_heading, build_default_heading
 
 class LogFromStream(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), text: str = "", **kwargs):
 
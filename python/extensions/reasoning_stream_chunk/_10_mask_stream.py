@@ -3,6 +3,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class MaskReasoningStreamChunk(Extension):
+    STATELESS = True
+
     async def execute(self, **kwargs):
         # Get stream data and agent from kwargs
         stream_data = kwargs.get("stream_data")
@@ -4,6 +4,8 @@ from python.helpers.strings import replace_file_includes
 
 
 class ReplaceIncludeAlias(Extension):
+    STATELESS = True
+
     async def execute(
         self,
         loop_data=None,
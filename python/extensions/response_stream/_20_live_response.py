@@ -7,6 +7,8 @@ from python.helpers import log
 
 
 class LiveResponse(Extension):
+    STATELESS = True
+
 
     async def execute(
         self,
@@ -4,6 +4,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class MaskResponseStreamChunk(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         # Get stream data and agent from kwargs
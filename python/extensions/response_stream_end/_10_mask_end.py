@@ -3,6 +3,8 @@ from python.helpers.secrets import SecretsManager
 
 
 class MaskResponseStreamEnd(Extension):
+    STATELESS = True
+
     async def execute(self, **kwargs):
         # Get agent and finalize the streaming filter
         agent = kwargs.get("agent")
@@ -7,6 +7,8 @@ from python.helpers import projects
 
 
 class SystemPrompt(Extension):
+    STATELESS = True
+
 
     async def execute(
         self,
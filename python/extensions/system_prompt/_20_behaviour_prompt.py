@@ -5,6 +5,8 @@ from python.helpers import files, memory
 
 
 class BehaviourPrompt(Extension):
+    STATELESS = True
+
 
     async def execute(self, system_prompt: list[str]=[], loop_data: LoopData = LoopData(), **kwargs):
         prompt = read_rules(self.agent)
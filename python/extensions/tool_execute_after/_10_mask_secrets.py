@@ -4,6 +4,8 @@ from python.helpers.tool import Response
 
 
 class MaskToolSecrets(Extension):
+    STATELESS = True
+
 
     async def execute(self, response: Response | None = None, **kwargs):
         if not response:
@@ -3,6 +3,8 @@ from python.helpers.extension import Extension
 
 
 class ReplaceLastToolOutput(Extension):
+    STATELESS = True
+
     async def execute(self, tool_args: dict[str, Any] | None = None, tool_name: str = "", **kwargs):
         if not tool_args:
             return
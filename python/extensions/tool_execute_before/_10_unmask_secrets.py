@@ -3,6 +3,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class UnmaskToolSecrets(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         # Get tool args from kwargs
@@ -17,6 +17,8 @@ last_notification_time = datetime.datetime.fromtimestamp(0)
 notification_cooldown_seconds = 60 * 60 * 24
 
 class UpdateCheck(Extension):
+    STATELESS = True
+
 
     async def execute(self, loop_data: LoopData = LoopData(), text: str = "", **kwargs):
         try:
@@ -3,6 +3,8 @@ from python.helpers.secrets import get_secrets_manager
 
 
 class MaskToolSecrets(Extension):
+    STATELESS = True
+
 
     async def execute(self, **kwargs):
         # model call data
@@ -1,3 +1,4 @@
+import asyncio
 import zipfile
 import json
 import os
@@ -9,7 +10,7 @@ from typing import List, Dict, Any, Optional
 from pathspec import PathSpec
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
-from python.helpers import files, runtime, git
+from python.helpers import files, runtime, git, memory_persistence
 from python.helpers.print_style import PrintStyle
 
 
@@ -360,6 +361,9 @@ class BackupService:
             "include_hidden": include_hidden
         }
 
+        # write pending memory changes so the archive contains them
+        await asyncio.to_thread(memory_persistence.flush_all)
+
         # Get matched files
         matched_files = await self.test_patterns(metadata, max_files=50000)
 
@@ -617,6 +621,9 @@ class BackupService:
     ) -> Dict[str, Any]:
         """Restore files from backup archive"""
 
+        # pending memory writes must not overwrite restored files later
+        await asyncio.to_thread(memory_persistence.flush_all)
+
         # Save uploaded file temporarily
         temp_dir = tempfile.mkdtemp()
         temp_file = os.path.join(temp_dir, "backup.zip")
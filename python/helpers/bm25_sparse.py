@@ -0,0 +1,167 @@
+"""
+Deterministic BM25 sparse vectors for hybrid search in Qdrant.
+
+Terms are hashed to stable 32-bit indices, so sparse vectors stored in Qdrant
+keep matching queries after a restart. Code identifiers are split into their
+parts (PlayerController -> playercontroller, player, controller). Documents are
+encoded with BM25 term-frequency saturation, queries with the IDF of their
+terms. Both come from a document-frequency table that is updated on every
+upsert and persisted as JSON, the dot product of the two is the BM25 score.
+"""
+
+import atexit
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+K1 = 1.2
+B = 0.75
+SAVE_INTERVAL = 5  # seconds between writes of a changed frequency table
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "with",
+})
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+# PascalCase, camelCase and acronyms: HTTPServerURL -> HTTP, Server, URL
+_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms of a text, identifiers are kept whole and split into their parts."""
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        lower = word.lower()
+        if len(lower) > 1 and lower not in STOPWORDS:
+            tokens.append(lower)
+        parts = _PART_RE.findall(word)
+        if len(parts) > 1:
+            for part in parts:
+                part = part.lower()
+                if len(part) > 1 and part not in STOPWORDS:
+                    tokens.append(part)
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def term_index(term: str) -> int:
+    """Stable sparse vector index of a term, unlike hash() it does not change between processes."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class DocumentFrequencies:
+    """Document count, total length and per-term document frequencies of a collection."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.doc_count = 0
+        self.total_length = 0
+        self.df: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self.doc_count = data.get("doc_count", 0)
+            self.total_length = data.get("total_length", 0)
+            self.df = {int(idx): count for idx, count in data.get("df", {}).items()}
+
+    def add(self, documents: Iterable[List[int]]):
+        """Count tokenized documents (lists of term indices). Re-upserted documents are counted again."""
+        with self._lock:
+            for indices in documents:
+                self.doc_count += 1
+                self.total_length += len(indices)
+                for idx in set(indices):
+                    self.df[idx] = self.df.get(idx, 0) + 1
+            self._dirty = True
+        if time.monotonic() - self._saved_at > SAVE_INTERVAL:
+            self.save()
+
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+
+    def idf(self, idx: int) -> float:
+        df = self.df.get(idx, 0)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({
+                "doc_count": self.doc_count,
+                "total_length": self.total_length,
+                "df": self.df,
+            })
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class BM25SparseEncoder:
+    """Encodes documents and queries into {index: weight} sparse vectors."""
+
+    def __init__(self, stats_path: Optional[str] = None, k1: float = K1, b: float = B):
+        self.stats = DocumentFrequencies(stats_path)
+        self.k1 = k1
+        self.b = b
+
+    def encode_documents(self, texts: List[str], update: bool = True) -> List[Dict[int, float]]:
+        """Encode documents being upserted, counting them in the frequency table first."""
+        docs = [[term_index(t) for t in tokenize(text)] for text in texts]
+        if update:
+            self.stats.add(docs)
+        avg_length = self.stats.avg_length()
+        return [self._document_vector(indices, avg_length) for indices in docs]
+
+    def encode_document(self, text: str, update: bool = True) -> Dict[int, float]:
+        return self.encode_documents([text], update)[0]
+
+    def encode_query(self, text: str) -> Dict[int, float]:
+        return {idx: self.stats.idf(idx) for idx in {term_index(t) for t in tokenize(text)}}
+
+    def _document_vector(self, indices: List[int], avg_length: float) -> Dict[int, float]:
+        counts: Dict[int, int] = {}
+        for idx in indices:
+            counts[idx] = counts.get(idx, 0) + 1
+        norm = self.k1 * (1 - self.b + self.b * len(indices) / avg_length)
+        return {idx: tf * (self.k1 + 1) / (tf + norm) for idx, tf in counts.items()}
+
+    def save(self):
+        self.stats.save()
+
+
+_encoders: Dict[str, BM25SparseEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(stats_path: str) -> BM25SparseEncoder:
+    """Shared encoder per frequency table, stores writing the same collection count into one table."""
+    path = os.path.abspath(stats_path)
+    with _encoders_lock:
+        encoder = _encoders.get(path)
+        if encoder is None:
+            encoder = _encoders[path] = BM25SparseEncoder(path)
+        return encoder
@@ -25,6 +25,7 @@ class DirtyJson:
         self.current_char = None
         self.result = None
         self.stack = []
+        self.stream: "DirtyJsonStream | None" = None
 
     @staticmethod
     def parse_string(json_string):
@@ -52,10 +53,12 @@ class DirtyJson:
         return self.result
 
     def feed(self, chunk):
-        self.json_string += chunk
-        if not self.current_char and self.json_string:
-            self.current_char = self.json_string[0]
-        self._parse()
+        # resumable parsing is implemented by DirtyJsonStream
+        if self.stream is None:
+            self.stream = DirtyJsonStream()
+            self.stream.feed(self.json_string)
+        self.result = self.stream.feed(chunk)
+        self.json_string = self.stream.text
         return self.result
 
     def _advance(self, count=1):
@@ -333,3 +336,458 @@ class DirtyJson:
         chars = ["{", "[", '"']
         indices = [input_str.find(char) for char in chars if input_str.find(char) != -1]
         return min(indices) if indices else 0
+
+
+_STREAM_ESCAPES = {
+    '"': '"',
+    "'": "'",
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_STREAM_LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+_STREAM_QUOTES = ('"', "'", "`")
+_STREAM_NUMBER_CHARS = "0123456789-+.eE"
+
+# container frame states
+_KEY, _COLON, _VALUE, _AFTER, _AFTER_COMMA = range(5)
+
+
+class _Frame:
+    __slots__ = ("container", "state", "key")
+
+    def __init__(self, container, state):
+        self.container = container
+        self.state = state
+        self.key = None
+
+
+class _Token:
+    __slots__ = ("kind", "parts", "quote", "escape", "is_key", "slot")
+
+    def __init__(self, kind, is_key=False, quote=None):
+        self.kind = kind  # string, multiline, number, literal, unquoted
+        self.parts: list[str] = []
+        self.quote = quote
+        self.escape = None  # None, "\\" or "u" + collected hex digits
+        self.is_key = is_key
+        self.slot = None  # list index for array values
+
+
+class DirtyJsonStream:
+    """
+    Resumable variant of DirtyJson for text that arrives in chunks.
+    Keeps the container stack and the token in progress between feeds, so each feed only
+    processes new characters. The result is live and grows in place, the value being parsed
+    (e.g. a long string) is exposed in its partial form after each feed.
+    Semantics follow DirtyJson.parse for the input seen so far.
+    """
+
+    def __init__(self):
+        self.result = None
+        self.text = ""  # all text fed so far
+        self._buf = ""  # unconsumed tail of input, usually just a few chars of lookahead
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._has_root = False
+        self._stack: list[_Frame] = []
+        self._token: _Token | None = None
+        self._comment = None  # None, "line" or "block"
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return self.result
+        self.text += chunk
+        if self._done:
+            return self.result
+
+        if not self._started:
+            # wait for the first structural char like DirtyJson.get_start_pos does
+            start = _find_start(chunk)
+            if start == -1:
+                return self.result
+            self._started = True
+            chunk = chunk[start:]
+
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        self._run()
+        self._expose_token()
+        return self.result
+
+    def update(self, full_text: str):
+        """Feed the whole accumulated text, only the part not seen yet is parsed. Restarts if the text was rewritten."""
+        if full_text.startswith(self.text):
+            return self.feed(full_text[len(self.text) :])
+        self.__init__()
+        return self.feed(full_text)
+
+    # state machine
+
+    def _peek(self, n: int) -> str | None:
+        # lookahead of n chars after current, None if not available yet
+        end = self._pos + 1 + n
+        if end > len(self._buf):
+            return None
+        return self._buf[self._pos + 1 : end]
+
+    def _run(self):
+        buf = self._buf
+        while self._pos < len(buf) and not self._done:
+            if self._token:
+                if not self._step_token():
+                    return
+                continue
+            if self._comment:
+                if not self._step_comment():
+                    return
+                continue
+            if not self._step_structure():
+                return
+
+    def _skip_ws(self) -> bool | None:
+        # True when a whitespace or comment was consumed, None when lookahead is missing
+        char = self._buf[self._pos]
+        if char.isspace():
+            self._pos += 1
+            return True
+        if char == "/":
+            nxt = self._peek(1)
+            if nxt is None:
+                return None
+            if nxt in ("/", "*"):
+                self._comment = "line" if nxt == "/" else "block"
+                self._pos += 2
+                return True
+        return False
+
+    def _step_comment(self) -> bool:
+        buf = self._buf
+        if self._comment == "line":
+            end = buf.find("\n", self._pos)
+            if end == -1:
+                self._pos = len(buf)
+                return False
+            self._pos = end + 1
+        else:
+            end = buf.find("*/", self._pos)
+            if end == -1:
+                # keep a trailing '*' for the next feed
+                self._pos = len(buf) - 1 if buf.endswith("*") else len(buf)
+                return False
+            self._pos = end + 2
+        self._comment = None
+        return True
+
+    def _step_structure(self) -> bool:
+        skipped = self._skip_ws()
+        if skipped is None:
+            return False
+        if skipped:
+            return True
+
+        char = self._buf[self._pos]
+        frame = self._stack[-1] if self._stack else None
+
+        if frame is None:  # root value
+            return self._start_value(char)
+
+        if isinstance(frame.container, dict):
+            if frame.state == _KEY:
+                if char == "}":
+                    return self._close_object()
+                if char in ('"', "'"):
+                    self._token = _Token("string", is_key=True, quote=char)
+                    self._pos += 1
+                elif char in (":", ",", "]"):
+                    self._set_key(frame, "")
+                else:
+                    self._token = _Token("unquoted", is_key=True)
+                return True
+            if frame.state == _COLON:
+                if char == ":":
+                    self._pos += 1
+                frame.state = _VALUE
+                return True
+            if frame.state == _VALUE:
+                return self._start_value(char)
+            # after value
+            if char == ",":
+                self._pos += 1
+            frame.state = _KEY
+            return True
+
+        # array
+        if frame.state == _AFTER:
+            if char == ",":
+                self._pos += 1
+                frame.state = _AFTER_COMMA
+            elif char == "]":
+                self._pos += 1
+                self._stack.pop()
+                self._value_done_parent()
+            else:
+                # DirtyJson ends the array on unexpected chars
+                self._stack.pop()
+                self._value_done_parent()
+            return True
+        if char == "]":
+            self._pos += 1
+            self._stack.pop()
+            self._value_done_parent()
+            return True
+        return self._start_value(char)
+
+    def _close_object(self) -> bool:
+        nxt = self._peek(1)
+        if nxt is None:
+            return False
+        self._pos += 2 if nxt == "}" else 1
+        self._stack.pop()
+        self._value_done_parent()
+        return True
+
+    def _start_value(self, char: str) -> bool:
+        if char == "{":
+            nxt = self._peek(2) or self._peek(1)
+            if nxt is None or nxt == "{":
+                return False
+            # same as DirtyJson, "{{" skips one more char after the braces
+            self._pos += 3 if nxt[0] == "{" else 1
+            obj = {}
+            self._place_value(obj)
+            self._stack.append(_Frame(obj, _KEY))
+            return True
+        if char == "[":
+            self._pos += 1
+            arr = []
+            self._place_value(arr)
+            self._stack.append(_Frame(arr, _VALUE))
+            return True
+        if char in _STREAM_QUOTES:
+            # triple quotes need two chars of lookahead, a different next char is enough to decide
+            nxt = self._peek(1)
+            if nxt == char:
+                nxt = self._peek(2)
+            if nxt is None:
+                return False
+            if nxt == char * 2:
+                self._token = _Token("multiline", quote=char)
+                self._pos += 3
+            else:
+                self._token = _Token("string", quote=char)
+                self._pos += 1
+        elif char.isdigit() or char in ("-", "+"):
+            self._token = _Token("number")
+        elif char.lower() in ("t", "f", "n", "u"):
+            self._token = _Token("literal")
+        else:
+            self._token = _Token("unquoted")
+        self._reserve_slot(self._token)
+        return True
+
+    def _step_token(self) -> bool:
+        token = self._token
+        assert token
+        buf = self._buf
+        kind = token.kind
+
+        if kind == "string":
+            while self._pos < len(buf):
+                if token.escape is not None:
+                    if not self._step_escape(token):
+                        return True  # string ended inside a broken unicode escape
+                    continue
+                # copy plain run of chars at once
+                end = self._pos
+                quote = token.quote
+                while end < len(buf) and buf[end] != quote and buf[end] != "\\":
+                    end += 1
+                if end > self._pos:
+                    token.parts.append(buf[self._pos : end])
+                    self._pos = end
+                if self._pos >= len(buf):
+                    break
+                if buf[self._pos] == "\\":
+                    token.escape = "\\"
+                    self._pos += 1
+                else:
+                    self._pos += 1  # closing quote
+                    self._finish_token("".join(token.parts))
+                    return True
+            return False
+
+        if kind == "multiline":
+            quote = token.quote
+            while self._pos < len(buf):
+                end = buf.find(quote, self._pos)
+                if end == -1:
+                    token.parts.append(buf[self._pos :])
+                    self._pos = len(buf)
+                    return False
+                if end > self._pos:
+                    token.parts.append(buf[self._pos : end])
+                    self._pos = end
+                nxt = self._peek(2)
+                if nxt is None:
+                    return False
+                if nxt == quote * 2:
+                    self._pos += 3
+                    self._finish_token("".join(token.parts).strip())
+                    return True
+                token.parts.append(quote)
+                self._pos += 1
+            return False
+
+        if kind == "number":
+            while self._pos < len(buf) and buf[self._pos] in _STREAM_NUMBER_CHARS:
+                token.parts.append(buf[self._pos])
+                self._pos += 1
+            if self._pos >= len(buf):
+                return False
+            number = "".join(token.parts)
+            try:
+                value = int(number)
+            except ValueError:
+                value = float(number)
+            self._finish_token(value)
+            return True
+
+        if kind == "literal":
+            while self._pos < len(buf):
+                word = ("".join(token.parts) + buf[self._pos]).lower()
+                candidates = [lit for lit in _STREAM_LITERALS if lit.startswith(word)]
+                if not candidates:
+                    # not a literal after all, continue as unquoted string
+                    token.kind = "unquoted"
+                    return True
+                token.parts.append(buf[self._pos])
+                self._pos += 1
+                if word in _STREAM_LITERALS:
+                    self._finish_token(_STREAM_LITERALS[word])
+                    return True
+            return False
+
+        # unquoted key or value
+        stops = (":", ",", "}", "]")
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if char in stops or (token.is_key and char.isspace()):
+                if not token.is_key:
+                    self._pos += 1  # DirtyJson consumes the terminator of unquoted values
+                text = "".join(token.parts)
+                self._finish_token(text if token.is_key else text.strip())
+                return True
+            token.parts.append(char)
+            self._pos += 1
+        return False
+
+    def _step_escape(self, token: _Token) -> bool:
+        char = self._buf[self._pos]
+        if token.escape == "\\":
+            self._pos += 1
+            if char in _STREAM_ESCAPES:
+                token.parts.append(_STREAM_ESCAPES[char])
+                token.escape = None
+            elif char == "u":
+                token.escape = "u"
+            else:
+                token.escape = None  # unknown escapes are dropped
+            return True
+        # collecting \uXXXX
+        digits = token.escape[1:]  # type: ignore
+        if not char.isalnum():
+            # DirtyJson ends the string here and keeps the literal escape
+            token.escape = None
+            self._finish_token("".join(token.parts) + "\\u" + digits)
+            return False
+        digits += char
+        self._pos += 1
+        if len(digits) < 4:
+            token.escape = "u" + digits
+            return True
+        token.escape = None
+        try:
+            token.parts.append(chr(int(digits, 16)))
+        except ValueError:
+            token.parts.append("\\u" + digits)
+        return True
+
+    def _finish_token(self, value):
+        token = self._token
+        assert token
+        self._token = None
+        if token.is_key:
+            self._set_key(self._stack[-1], value)
+            return
+        self._set_slot(token, value)
+        self._value_done_parent()
+
+    def _set_key(self, frame: _Frame, key):
+        frame.key = key
+        frame.container[key] = None
+        frame.state = _COLON
+
+    def _reserve_slot(self, token: _Token):
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and isinstance(frame.container, list):
+            frame.container.append(None)
+            token.slot = len(frame.container) - 1
+
+    def _set_slot(self, token: _Token, value):
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            self.result = value
+        elif isinstance(frame.container, list):
+            frame.container[token.slot] = value  # type: ignore
+        else:
+            frame.container[frame.key] = value
+
+    def _place_value(self, value):
+        # containers are placed right away and filled in place
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            self.result = value
+        elif isinstance(frame.container, list):
+            frame.container.append(value)
+        else:
+            frame.container[frame.key] = value
+
+    def _value_done_parent(self):
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            self._done = True
+        else:
+            frame.state = _AFTER
+
+    def _expose_token(self):
+        # show the value being parsed in its partial form
+        token = self._token
+        if not token or token.is_key:
+            return
+        if token.kind in ("string", "multiline", "unquoted"):
+            text = "".join(token.parts)
+            if token.parts:
+                token.parts[:] = [text]  # keep joins linear
+            value = text.strip() if token.kind != "string" else text
+        elif token.kind == "number":
+            try:
+                value = int("".join(token.parts))
+            except ValueError:
+                try:
+                    value = float("".join(token.parts))
+                except ValueError:
+                    return
+        else:
+            return
+        self._set_slot(token, value)
+
+
+def _find_start(text: str) -> int:
+    indices = [i for i in (text.find("{"), text.find("["), text.find('"')) if i != -1]
+    return min(indices) if indices else -1
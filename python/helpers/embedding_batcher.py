@@ -0,0 +1,106 @@
+"""
+Micro-batching of concurrent embedding requests.
+
+Agents embed queries one by one from many contexts, each context on its own thread
+and event loop. An EmbeddingBatcher collects texts from all of them on a worker
+thread, waits at most max_wait for more, and embeds up to max_batch_size texts in
+one embed_documents call (one forward pass locally, one HTTP request for APIs).
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+MAX_BATCH_SIZE = 32
+MAX_WAIT = 0.005  # seconds to wait for more texts after the first one
+
+EmbedDocuments = Callable[[List[str]], List[List[float]]]
+
+
+class EmbeddingBatcher:
+
+    def __init__(
+        self,
+        embed_documents: EmbedDocuments,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = MAX_WAIT,
+        name: str = "embedding-batcher",
+    ):
+        self.embed_documents = embed_documents
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.SimpleQueue[tuple[str, Future]]" = queue.SimpleQueue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # totals for monitoring, batches vs texts shows how much was coalesced
+        self.batches = 0
+        self.texts = 0
+
+    def submit(self, text: str) -> "Future[List[float]]":
+        future: "Future[List[float]]" = Future()
+        self._queue.put((text, future))
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._worker.start()
+        return future
+
+    async def embed(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_sync(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._embed_batch(batch)
+
+    def _embed_batch(self, batch: List[tuple]):
+        # identical texts are embedded once
+        waiting: Dict[str, List[Future]] = {}
+        for text, future in batch:
+            if future.set_running_or_notify_cancel():
+                waiting.setdefault(text, []).append(future)
+        if not waiting:
+            return
+        texts = list(waiting)
+        try:
+            vectors = self.embed_documents(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        except BaseException as e:
+            for futures in waiting.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.texts += len(texts)
+        for text, vector in zip(texts, vectors):
+            for future in waiting[text]:
+                future.set_result(vector)
+
+
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: str, embed_documents: EmbedDocuments, **kwargs) -> EmbeddingBatcher:
+    """Batcher shared by all embedders of the same model, created with the first embed_documents."""
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = EmbeddingBatcher(embed_documents, name=f"embed:{key[:40]}", **kwargs)
+        return batcher
@@ -1,12 +1,20 @@
 from abc import abstractmethod
+from dataclasses import dataclass
+import os
+import time
 from typing import Any
-from python.helpers import extract_tools, files 
+from weakref import WeakKeyDictionary
+from python.helpers import extract_tools, files
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from agent import Agent
 
 class Extension:
 
+    # extensions are instantiated for every call unless they declare themselves stateless,
+    # stateless ones keep no per-call state on self and are instantiated once per agent
+    STATELESS: bool = False
+
     def __init__(self, agent: "Agent|None", **kwargs):
         self.agent: "Agent" = agent # type: ignore < here we ignore the type check as there are currently no extensions without an agent
         self.kwargs = kwargs
@@ -16,15 +24,87 @@ class Extension:
         pass
 
 
+@dataclass
+class ExtensionTiming:
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
 async def call_extensions(extension_point: str, agent: "Agent|None" = None, **kwargs) -> Any:
 
+    profile = agent.config.profile if agent else ""
+    classes = await _get_pipeline(extension_point, profile)
+
+    # call extensions
+    for cls in classes:
+        extension = _get_instance(cls, agent)
+        start = time.perf_counter()
+        try:
+            await extension.execute(**kwargs)
+        finally:
+            _record_timing(extension_point, cls, time.perf_counter() - start)
+
+
+def get_extension_timings() -> dict[str, dict[str, Any]]:
+    """Cumulative latency per extension, keyed by 'extension_point/file', slowest first"""
+    result = {
+        key: {
+            "calls": t.calls,
+            "total_time": t.total_time,
+            "avg_time": t.total_time / t.calls if t.calls else 0.0,
+            "max_time": t.max_time,
+        }
+        for key, t in _timings.items()
+    }
+    return dict(sorted(result.items(), key=lambda x: x[1]["total_time"], reverse=True))
+
+
+def reset_extension_timings():
+    _timings.clear()
+
+
+def _get_file_from_module(module_name: str) -> str:
+    return module_name.split(".")[-1]
+
+
+def _get_mtime(folder: str) -> int:
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@dataclass
+class _Pipeline:
+    mtimes: tuple[int, ...]
+    classes: list[type[Extension]]
+
+
+_pipelines: dict[tuple[str, str], _Pipeline] = {}
+_instances: "WeakKeyDictionary[Agent, dict[type[Extension], Extension]]" = WeakKeyDictionary()
+_timings: dict[str, ExtensionTiming] = {}
+
+
+async def _get_pipeline(extension_point: str, profile: str) -> list[type[Extension]]:
+    # merged and sorted extension classes, rebuilt only when one of the folders changes
+    folders = [files.get_abs_path("python/extensions", extension_point)]
+    if profile:
+        folders.append(files.get_abs_path("agents", profile, "extensions", extension_point))
+    mtimes = tuple(_get_mtime(folder) for folder in folders)
+
+    key = (extension_point, profile)
+    pipeline = _pipelines.get(key)
+    if pipeline and pipeline.mtimes == mtimes:
+        return pipeline.classes
+
     # get default extensions
-    defaults = await _get_extensions("python/extensions/" + extension_point)
+    defaults = await _get_extensions(folders[0], mtimes[0])
     classes = defaults
 
     # get agent extensions
-    if agent and agent.config.profile:
-        agentics = await _get_extensions("agents/" + agent.config.profile + "/extensions/" + extension_point)
+    if profile:
+        agentics = await _get_extensions(folders[1], mtimes[1])
         if agentics:
             # merge them, agentics overwrite defaults
             unique = {}
@@ -34,27 +114,51 @@ async def call_extensions(extension_point: str, agent: "Agent|None" = None, **kw
             # sort by name
             classes = sorted(unique.values(), key=lambda cls: _get_file_from_module(cls.__module__))
 
-    # call extensions
-    for cls in classes:
-        await cls(agent=agent).execute(**kwargs)
+    _pipelines[key] = _Pipeline(mtimes=mtimes, classes=classes)
+    return classes
 
 
-def _get_file_from_module(module_name: str) -> str:
-    return module_name.split(".")[-1]
+def _get_instance(cls: type[Extension], agent: "Agent|None") -> Extension:
+    if agent is None or not cls.STATELESS:
+        return cls(agent=agent)
+    instances = _instances.get(agent)
+    if instances is None:
+        instances = {}
+        _instances[agent] = instances
+    extension = instances.get(cls)
+    if extension is None:
+        extension = cls(agent=agent)
+        instances[cls] = extension
+    return extension
 
-_cache: dict[str, list[type[Extension]]] = {}
-async def _get_extensions(folder:str):
+
+def _record_timing(extension_point: str, cls: type[Extension], elapsed: float):
+    key = extension_point + "/" + _get_file_from_module(cls.__module__)
+    timing = _timings.get(key)
+    if timing is None:
+        timing = ExtensionTiming()
+        _timings[key] = timing
+    timing.calls += 1
+    timing.total_time += elapsed
+    if elapsed > timing.max_time:
+        timing.max_time = elapsed
+
+
+_cache: dict[str, tuple[int, list[type[Extension]]]] = {}
+async def _get_extensions(folder: str, mtime: int | None = None):
     global _cache
     folder = files.get_abs_path(folder)
-    if folder in _cache:
-        classes = _cache[folder]
+    if mtime is None:
+        mtime = _get_mtime(folder)
+    cached = _cache.get(folder)
+    if cached and cached[0] == mtime:
+        classes = cached[1]
     else:
-        if not files.exists(folder):
+        if not mtime:
             return []
         classes = extract_tools.load_classes_from_folder(
             folder, "*", Extension
         )
-        _cache[folder] = classes
+        _cache[folder] = (mtime, classes)
 
     return classes
-
@@ -0,0 +1,213 @@
+import math
+import pickle
+import threading
+from typing import Any
+
+from python.helpers import faiss_monkey_patch
+from python.helpers.print_style import PrintStyle
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+BUILD_CHUNK = 10000  # vectors copied from the flat index at once while building
+
+DEFAULT_ANN_CONFIG = {
+    "index_type": "flat",  # flat | hnsw | ivfpq
+    "min_vectors": 50000,  # approximate search is only used above this size
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 80,
+    "hnsw_ef_search": 64,
+    "ivf_nlist": 0,  # 0 = 4 * sqrt(n)
+    "ivf_nprobe": 16,
+    "pq_m": 64,  # sub-quantizers, reduced to a divisor of the dimension
+    "train_size": 100000,
+    "refine_factor": 4,  # ANN candidates per result, re-scored exactly on the flat index
+    "rebuild_ratio": 0.2,  # rebuild when this share of ANN entries was deleted
+}
+
+
+class AnnIndex:
+    """
+    Inner product index that answers searches from an approximate structure (HNSW or IVF-PQ).
+    The flat index stays the source of truth for vectors, positions and removals,
+    so langchain FAISS keeps working with it unchanged. Candidates from the approximate
+    structure are re-scored on the flat vectors, scores stay exact for relevance thresholds.
+    """
+
+    def __init__(self, flat: Any, config: dict, saved: tuple | None = None):
+        self.flat = flat
+        self.config = {**DEFAULT_ANN_CONFIG, **config}
+        self.ann: Any = None
+        self.positions = np.empty(0, dtype=np.int64)  # ann label -> flat position, -1 if deleted
+        self.deleted = 0
+        self.restored = saved is not None  # loaded from index.ann instead of built
+        self._lock = threading.RLock()
+        if saved:
+            self.ann, self.positions, self.deleted = saved
+        elif self.flat.ntotal >= self.config["min_vectors"]:
+            self.build()
+
+    def __getattr__(self, name: str):
+        # d, ntotal, reconstruct, metric_type... come from the flat index
+        return getattr(self.flat, name)
+
+    def add(self, x: np.ndarray):
+        with self._lock:
+            start = self.flat.ntotal
+            self.flat.add(x)
+            if self.ann is None:
+                if self.flat.ntotal >= self.config["min_vectors"]:
+                    self.build()
+                return
+            self.positions = np.concatenate(
+                [self.positions, np.arange(start, self.flat.ntotal, dtype=np.int64)]
+            )
+            self.ann.add(x)
+
+    def remove_ids(self, ids: Any) -> int:
+        with self._lock:
+            removed = np.unique(np.asarray(ids, dtype=np.int64))
+            count = self.flat.remove_ids(removed)
+            if self.ann is None:
+                return count
+            # the flat index compacts positions, labels in the ANN structure stay
+            pos = self.positions
+            gone = np.isin(pos, removed)
+            self.positions = np.where(gone, -1, pos - np.searchsorted(removed, pos))
+            self.deleted += int(np.count_nonzero(gone & (pos >= 0)))
+            if self.flat.ntotal < self.config["min_vectors"]:
+                self.ann, self.positions, self.deleted = None, self.positions[:0], 0
+            elif self.deleted > self.config["rebuild_ratio"] * self.ann.ntotal:
+                self.build()
+            return count
+
+    def reset(self):
+        with self._lock:
+            self.flat.reset()
+            self.ann, self.positions, self.deleted = None, self.positions[:0], 0
+
+    def search(self, x: np.ndarray, k: int, *args, **kwargs):
+        # add, remove_ids and build replace the structure and compact positions, search one consistent state
+        with self._lock:
+            return self._search(x, k, *args, **kwargs)
+
+    def _search(self, x: np.ndarray, k: int, *args, **kwargs):
+        ann, positions = self.ann, self.positions
+        if ann is None or k <= 0:
+            return self.flat.search(x, k, *args, **kwargs)
+
+        live = max(1, ann.ntotal - self.deleted)
+        fetch = min(ann.ntotal, math.ceil(k * self.config["refine_factor"] * ann.ntotal / live))
+        _, labels = ann.search(x, fetch)
+
+        scores = np.full((len(x), k), -np.inf, dtype=np.float32)
+        result = np.full((len(x), k), -1, dtype=np.int64)
+        for row, row_labels in enumerate(labels):
+            cand = positions[row_labels[row_labels >= 0]]
+            cand = np.unique(cand[cand >= 0])
+            if not len(cand):
+                continue
+            exact = self.flat.reconstruct_batch(cand) @ x[row]
+            top = np.argsort(-exact)[:k]
+            scores[row, : len(top)] = exact[top]
+            result[row, : len(top)] = cand[top]
+        return scores, result
+
+    def build(self):
+        with self._lock:
+            n, d = self.flat.ntotal, self.flat.d
+            ann = create_ann(d, n, self.config)
+            if not ann.is_trained:
+                rnd = np.random.default_rng(0)
+                size = min(n, int(self.config["train_size"]))
+                sample = np.sort(rnd.choice(n, size=size, replace=False))
+                ann.train(self.flat.reconstruct_batch(sample))
+            for start in range(0, n, BUILD_CHUNK):
+                ann.add(self.flat.reconstruct_n(start, min(BUILD_CHUNK, n - start)))
+            self.ann = ann
+            self.positions = np.arange(n, dtype=np.int64)
+            self.deleted = 0
+
+
+def create_ann(d: int, n: int, config: dict) -> Any:
+    index_type = config["index_type"]
+    if index_type == "hnsw":
+        ann = faiss.index_factory(d, f"HNSW{config['hnsw_m']}", faiss.METRIC_INNER_PRODUCT)
+        ann.hnsw.efConstruction = config["hnsw_ef_construction"]
+        ann.hnsw.efSearch = config["hnsw_ef_search"]
+        return ann
+    if index_type == "ivfpq":
+        nlist = config["ivf_nlist"] or int(4 * math.sqrt(n))
+        nlist = max(1, min(nlist, n // 39 or 1))  # faiss wants ~39 training points per list
+        pq_m = max(m for m in range(1, min(config["pq_m"], d) + 1) if d % m == 0)
+        pq_bits = max(4, min(8, int(math.log2(max(2, n // 39)))))  # 2^bits centroids per sub-quantizer
+        ann = faiss.index_factory(d, f"IVF{nlist},PQ{pq_m}x{pq_bits}", faiss.METRIC_INNER_PRODUCT)
+        ann.nprobe = config["ivf_nprobe"]
+        ann.do_polysemous_training = False  # only useful for hamming filtering, slow to train
+        return ann
+    raise ValueError(f"Unknown FAISS index type: {index_type}")
+
+
+def wrap(flat: Any, config: dict | None, ann_data: bytes | None = None) -> Any:
+    """Return flat as is for the flat index type, otherwise an AnnIndex around it, restoring a saved ANN structure when it matches"""
+    config = {**DEFAULT_ANN_CONFIG, **(config or {})}
+    index_type = (config.get("index_type") or "flat").lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type: {index_type}")
+    config["index_type"] = index_type
+    if isinstance(flat, AnnIndex):
+        flat = flat.flat
+    if index_type == "flat":
+        return flat
+
+    # builds from the flat vectors when nothing matching was saved and the index is large enough
+    return AnnIndex(flat, config, _load_ann(ann_data, flat, config))
+
+
+def serialize(index: Any) -> dict[str, bytes]:
+    """Files for the memory folder, index.faiss stays a plain flat index readable by FAISS.load_local"""
+    if not isinstance(index, AnnIndex):
+        return {"index.faiss": faiss.serialize_index(index).tobytes(), "index.ann": b""}
+    with index._lock:
+        ann_data = b""
+        if index.ann is not None:
+            ann_data = pickle.dumps(
+                {
+                    "signature": _signature(index.config),
+                    "ntotal": index.flat.ntotal,
+                    "index": faiss.serialize_index(index.ann),
+                    "positions": index.positions,
+                    "deleted": index.deleted,
+                }
+            )
+        return {"index.faiss": faiss.serialize_index(index.flat).tobytes(), "index.ann": ann_data}
+
+
+def _signature(config: dict) -> dict:
+    # parameters that change the built structure, search parameters can change freely
+    keys = ["index_type", "hnsw_m", "hnsw_ef_construction", "ivf_nlist", "pq_m"]
+    return {key: config[key] for key in keys}
+
+
+def _load_ann(data: bytes | None, flat: Any, config: dict):
+    if not data:
+        return None
+    try:
+        saved = pickle.loads(data)
+        if saved["signature"] != _signature(config) or saved["ntotal"] != flat.ntotal:
+            return None
+        positions = saved["positions"]
+        ann = faiss.deserialize_index(saved["index"])
+        deleted = saved["deleted"]
+    except (pickle.UnpicklingError, EOFError, KeyError, TypeError, ValueError, RuntimeError) as e:
+        # a damaged index.ann only costs a rebuild from the flat vectors
+        PrintStyle().warning(f"Saved ANN index could not be loaded, rebuilding it: {e}")
+        return None
+    if np.count_nonzero(positions >= 0) != flat.ntotal or ann.ntotal != len(positions):
+        return None
+    if config["index_type"] == "hnsw":
+        ann.hnsw.efSearch = config["hnsw_ef_search"]
+    else:
+        ann.nprobe = config["ivf_nprobe"]
+        ann.do_polysemous_training = False  # only useful for hamming filtering, slow to train
+    return ann, positions, deleted
@@ -32,23 +32,9 @@ def load_plugin_variables(
     if backup_dirs is None:
         backup_dirs = []
 
-    try:
-        # Create filename and directories list
-        plugin_filename = basename(file, ".md") + ".py"
-        directories = [dirname(file)] + backup_dirs
-        plugin_file = find_file_in_dirs(plugin_filename, directories)
-    except FileNotFoundError:
-        plugin_file = None
-
-    if plugin_file and exists(plugin_file):
-
-        from python.helpers import extract_tools
-
-        classes = extract_tools.load_classes_from_file(
-            plugin_file, VariablesPlugin, one_per_file=False
-        )
-        for cls in classes:
-            return cls().get_variables(file, backup_dirs, **kwargs)  # type: ignore < abstract class here is ok, it is always a subclass
+    _plugin_file, plugin = _find_variables_plugin(file, backup_dirs)
+    if plugin:
+        return plugin().get_variables(file, backup_dirs, **kwargs)  # type: ignore < abstract class here is ok, it is always a subclass
 
         # load python code and extract variables variables from it
         # module = None
@@ -77,6 +63,102 @@ def load_plugin_variables(
     return {}
 
 
+def _find_variables_plugin(file: str, backup_dirs: list[str]):
+    # returns (plugin file, VariablesPlugin subclass) of a .md file, both None if it has none
+    try:
+        # Create filename and directories list
+        plugin_filename = basename(file, ".md") + ".py"
+        directories = [dirname(file)] + backup_dirs
+        plugin_file = find_file_in_dirs(plugin_filename, directories)
+    except FileNotFoundError:
+        plugin_file = None
+
+    if plugin_file and exists(plugin_file):
+
+        from python.helpers import extract_tools
+
+        classes = extract_tools.load_classes_from_file(
+            plugin_file, VariablesPlugin, one_per_file=False
+        )
+        for cls in classes:
+            return plugin_file, cls
+        return plugin_file, None
+    return None, None
+
+
+class PromptTemplate:
+    # resolved path, content and variables plugin of a prompt file
+    def __init__(self, path: str, content: str, plugin: type[VariablesPlugin] | None, watched: list[str], signature: tuple):
+        self.path = path
+        self.content = content
+        self.is_json = is_full_json_template(content)
+        self.body = remove_code_fences(content)
+        self.plugin = plugin
+        self.watched = watched
+        self.signature = signature
+
+    def variables(self, file: str, directories: list[str], **kwargs) -> dict[str, Any]:
+        if not self.plugin:
+            return {}
+        return self.plugin().get_variables(file, directories, **kwargs) or {}  # type: ignore
+
+
+# templates by (file, directories, encoding, plugin lookup), checked against mtimes on every use
+_prompt_templates: dict[tuple, PromptTemplate] = {}
+_prompt_template_stats = {"loads": 0, "hits": 0}
+
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_prompt_template(
+    _filename: str, _directories: list[str], _encoding="utf-8", _plugin_beside_file=False
+) -> PromptTemplate:
+    """
+    Cached prompt file found in the first of the directories that has it.
+    Its variables plugin is looked up in the directories, after the folder of the found file
+    when _plugin_beside_file is set. A template is reloaded when the file or its plugin
+    changes, or when files are added to or removed from a searched directory.
+    """
+    key = (_filename, tuple(_directories), _encoding, _plugin_beside_file)
+    template = _prompt_templates.get(key)
+    if template and template.signature == tuple(_mtime(p) for p in template.watched):
+        _prompt_template_stats["hits"] += 1
+        return template
+
+    watched = [get_abs_path(d) for d in dict.fromkeys([""] + _directories)]
+    signature = [_mtime(p) for p in watched]
+    absolute_path = find_file_in_dirs(_filename, _directories)
+    signature.append(_mtime(absolute_path))
+    with open(absolute_path, "r", encoding=_encoding) as f:
+        content = f.read()
+    plugin_ref = absolute_path if _plugin_beside_file else _filename
+    plugin_file, plugin = (
+        _find_variables_plugin(plugin_ref, _directories) if plugin_ref.endswith(".md") else (None, None)
+    )
+    watched.append(absolute_path)
+    if plugin_file:
+        watched.append(plugin_file)
+        signature.append(_mtime(plugin_file))
+
+    template = PromptTemplate(absolute_path, content, plugin, watched, tuple(signature))
+    _prompt_templates[key] = template
+    _prompt_template_stats["loads"] += 1
+    return template
+
+
+def prompt_template_stats() -> dict[str, int]:
+    return {**_prompt_template_stats, "cached": len(_prompt_templates)}
+
+
+def clear_prompt_templates():
+    _prompt_templates.clear()
+
+
 from python.helpers.strings import sanitize_string
 
 
@@ -86,19 +168,13 @@ def parse_file(
     if _directories is None:
         _directories = []
 
-    # Find the file in the directories
-    absolute_path = find_file_in_dirs(_filename, _directories)
-
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
-
-    is_json = is_full_json_template(content)
-    content = remove_code_fences(content)
-    variables = load_plugin_variables(absolute_path, _directories, **kwargs) or {}  # type: ignore
+    # Find the file in the directories, read it and its variables plugin, cached by mtime
+    template = get_prompt_template(_filename, _directories, _encoding, _plugin_beside_file=True)
+    absolute_path = template.path
+    content = template.body
+    variables = template.variables(absolute_path, _directories, **kwargs)
     variables.update(kwargs)
-    if is_json:
+    if template.is_json:
         content = replace_placeholders_json(content, **variables)
         obj = json.loads(content)
         # obj = replace_placeholders_dict(obj, **variables)
@@ -127,15 +203,11 @@ def read_prompt_file(
         _file = os.path.basename(_file)
         _directories = [folder_path] + _directories
 
-    # Find the file in the directories
-    absolute_path = find_file_in_dirs(_file, _directories)
+    # Find the file in the directories, read it and its variables plugin, cached by mtime
+    template = get_prompt_template(_file, _directories, _encoding)
+    content = template.content
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
-
-    variables = load_plugin_variables(_file, _directories, **kwargs) or {}  # type: ignore
+    variables = template.variables(_file, _directories, **kwargs)
     variables.update(kwargs)
 
     # Replace placeholders with values from kwargs
@@ -310,6 +382,25 @@ def write_file(relative_path: str, content: str, encoding: str = "utf-8"):
         f.write(content)
 
 
+def append_file(relative_path: str, content: str, encoding: str = "utf-8"):
+    abs_path = get_abs_path(relative_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    content = sanitize_string(content, encoding)
+    with open(abs_path, "a", encoding=encoding) as f:
+        f.write(content)
+
+
+def write_file_atomic(relative_path: str, content: str, encoding: str = "utf-8"):
+    # write to a sibling temp file and rename over the target so readers never see a partial file
+    abs_path = get_abs_path(relative_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    content = sanitize_string(content, encoding)
+    tmp_path = abs_path + ".tmp"
+    with open(tmp_path, "w", encoding=encoding) as f:
+        f.write(content)
+    os.replace(tmp_path, abs_path)
+
+
 def write_file_bin(relative_path: str, content: bytes):
     abs_path = get_abs_path(relative_path)
     os.makedirs(os.path.dirname(abs_path), exist_ok=True)
@@ -326,6 +417,12 @@ def write_file_base64(relative_path: str, content: str):
         f.write(data)
 
 
+def delete_file(relative_path: str):
+    abs_path = get_abs_path(relative_path)
+    if os.path.exists(abs_path):
+        os.remove(abs_path)
+
+
 def delete_dir(relative_path: str):
     # ensure deletion of directory without propagating errors
     abs_path = get_abs_path(relative_path)
@@ -2,8 +2,10 @@ from abc import abstractmethod
 import asyncio
 from collections import OrderedDict
 from collections.abc import Mapping
+from dataclasses import dataclass
 import json
 import math
+import time
 from typing import Coroutine, Literal, TypedDict, cast, Union, Dict, List, Any
 from python.helpers import messages, tokens, settings, call_llm
 from enum import Enum
@@ -17,6 +19,8 @@ HISTORY_BULK_RATIO = 0.2
 TOPIC_COMPRESS_RATIO = 0.65
 LARGE_MESSAGE_TO_TOPIC_RATIO = 0.25
 RAW_MESSAGE_OUTPUT_TEXT_TRIM = 100
+COMPRESS_CONCURRENCY = 4  # max parallel utility model calls during one compression
+SUMMARY_SIZE_ESTIMATE = 0.2  # expected summary size relative to source, used for planning
 
 
 class RawMessage(TypedDict):
@@ -39,6 +43,17 @@ class OutputMessage(TypedDict):
     content: MessageContent
 
 
+@dataclass
+class CompressionStats:
+    calls: int = 0
+    serial_time: float = 0.0  # sum of individual summarization durations
+    wall_time: float = 0.0
+
+    @property
+    def saved_time(self) -> float:
+        return max(0.0, self.serial_time - self.wall_time)
+
+
 class Record:
     def __init__(self):
         pass
@@ -130,18 +145,31 @@ class Topic(Record):
         self.history = history
         self.summary: str = ""
         self.messages: list[Message] = []
+        self._tokens: int | None = None  # cached total, None when invalidated
 
     def get_tokens(self):
-        if self.summary:
-            return tokens.approximate_tokens(self.summary)
-        else:
-            return sum(msg.get_tokens() for msg in self.messages)
+        if self._tokens is None:
+            if self.summary:
+                self._tokens = tokens.approximate_tokens(self.summary)
+            else:
+                self._tokens = sum(msg.get_tokens() for msg in self.messages)
+        return self._tokens
+
+    def invalidate_tokens(self):
+        self._tokens = None
+        self.history._topics_tokens = None  # the history total includes this topic
+
+    def set_summary(self, summary: str):
+        self.summary = summary
+        self.invalidate_tokens()
 
     def add_message(
         self, ai: bool, content: MessageContent, tokens: int = 0
     ) -> Message:
         msg = Message(ai=ai, content=content, tokens=tokens)
         self.messages.append(msg)
+        if self._tokens is not None and not self.summary:
+            self._tokens += msg.get_tokens()
         return msg
 
     def output(self) -> list[OutputMessage]:
@@ -152,17 +180,12 @@ class Topic(Record):
             return msgs
 
     async def summarize(self):
-        self.summary = await self.summarize_messages(self.messages)
+        self.set_summary(await self.summarize_messages(self.messages))
         return self.summary
 
     async def compress_large_messages(self) -> bool:
-        set = settings.get_settings()
-        msg_max_size = (
-            set["chat_model_ctx_length"]
-            * set["chat_model_ctx_history"]
-            * CURRENT_TOPIC_RATIO
-            * LARGE_MESSAGE_TO_TOPIC_RATIO
-        )
+        topic_max_size = _get_ctx_size_for_history() * CURRENT_TOPIC_RATIO
+        msg_max_size = topic_max_size * LARGE_MESSAGE_TO_TOPIC_RATIO
         large_msgs = []
         for m in (m for m in self.messages if not m.summary):
             # TODO refactor this
@@ -173,7 +196,11 @@ class Topic(Record):
             if tok > msg_max_size:
                 large_msgs.append((m, tok, leng, out))
         large_msgs.sort(key=lambda x: x[1], reverse=True)
+        # truncation is local, so do all that the topic budget needs in one pass
+        compressed = False
         for msg, tok, leng, out in large_msgs:
+            if compressed and self.get_tokens() <= topic_max_size:
+                break
             trim_to_chars = leng * (msg_max_size / tok)
             # raw messages will be replaced as a whole, they would become invalid when truncated
             if _is_raw_message(out[0]["content"]):
@@ -191,8 +218,9 @@ class Topic(Record):
                 )
                 msg.set_summary(_json_dumps(trunc))
 
-            return True
-        return False
+            self.invalidate_tokens()
+            compressed = True
+        return compressed
 
     async def compress(self) -> bool:
         compress = await self.compress_large_messages()
@@ -211,13 +239,14 @@ class Topic(Record):
             )
             sum_msg = Message(False, sum_msg_content)
             self.messages[1 : cnt_to_sum + 1] = [sum_msg]
+            self.invalidate_tokens()
             return True
         return False
 
     async def summarize_messages(self, messages: list[Message]):
         # FIXME: vision bytes are sent to utility LLM, send summary instead
         msg_txt = [m.output_text() for m in messages]
-        summary = await self.history.agent.call_utility_model(
+        summary = await self.history.call_summary_model(
             system=self.history.agent.read_prompt("fw.topic_summary.sys.md"),
             message=self.history.agent.read_prompt(
                 "fw.topic_summary.msg.md", content=msg_txt
@@ -247,12 +276,23 @@ class Bulk(Record):
         self.history = history
         self.summary: str = ""
         self.records: list[Record] = []
+        self._tokens: int | None = None  # cached total, None when invalidated
 
     def get_tokens(self):
-        if self.summary:
-            return tokens.approximate_tokens(self.summary)
-        else:
-            return sum([r.get_tokens() for r in self.records])
+        if self._tokens is None:
+            if self.summary:
+                self._tokens = tokens.approximate_tokens(self.summary)
+            else:
+                self._tokens = sum([r.get_tokens() for r in self.records])
+        return self._tokens
+
+    def invalidate_tokens(self):
+        self._tokens = None
+        self.history._bulks_tokens = None  # the history total includes this bulk
+
+    def set_summary(self, summary: str):
+        self.summary = summary
+        self.invalidate_tokens()
 
     def output(
         self, human_label: str = "user", ai_label: str = "ai"
@@ -267,11 +307,13 @@ class Bulk(Record):
         return False
 
     async def summarize(self):
-        self.summary = await self.history.agent.call_utility_model(
-            system=self.history.agent.read_prompt("fw.topic_summary.sys.md"),
-            message=self.history.agent.read_prompt(
-                "fw.topic_summary.msg.md", content=self.output_text()
-            ),
+        self.set_summary(
+            await self.history.call_summary_model(
+                system=self.history.agent.read_prompt("fw.topic_summary.sys.md"),
+                message=self.history.agent.read_prompt(
+                    "fw.topic_summary.msg.md", content=self.output_text()
+                ),
+            )
         )
         return self.summary
 
@@ -296,10 +338,15 @@ class History(Record):
         from agent import Agent
 
         self.counter = 0
+        self.version = 0  # bumped on every structural change (compression), used by chat journal
         self.bulks: list[Bulk] = []
         self.topics: list[Topic] = []
         self.current = Topic(history=self)
         self.agent: Agent = agent
+        self._bulks_tokens: int | None = None  # cached totals, None when invalidated
+        self._topics_tokens: int | None = None
+        self._compress_slots: asyncio.Semaphore | None = None
+        self.compress_stats = CompressionStats()  # stats of the last compression
 
     def get_tokens(self) -> int:
         return (
@@ -314,10 +361,19 @@ class History(Record):
         return total > limit
 
     def get_bulks_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.bulks)
+        if self._bulks_tokens is None:
+            self._bulks_tokens = sum(record.get_tokens() for record in self.bulks)
+        return self._bulks_tokens
 
     def get_topics_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.topics)
+        if self._topics_tokens is None:
+            self._topics_tokens = sum(record.get_tokens() for record in self.topics)
+        return self._topics_tokens
+
+    def invalidate_tokens(self):
+        self._bulks_tokens = None
+        self._topics_tokens = None
+        self.current.invalidate_tokens()
 
     def get_current_topic_tokens(self) -> int:
         return self.current.get_tokens()
@@ -330,6 +386,8 @@ class History(Record):
 
     def new_topic(self):
         if self.current.messages:
+            if self._topics_tokens is not None:
+                self._topics_tokens += self.current.get_tokens()
             self.topics.append(self.current)
             self.current = Topic(history=self)
 
@@ -346,6 +404,7 @@ class History(Record):
         history.bulks = [Bulk.from_dict(b, history=history) for b in data["bulks"]]
         history.topics = [Topic.from_dict(t, history=history) for t in data["topics"]]
         history.current = Topic.from_dict(data["current"], history=history)
+        history.invalidate_tokens()
         return history
 
     def to_dict(self):
@@ -363,64 +422,95 @@ class History(Record):
 
     async def compress(self):
         compressed = False
-        while True:
-            curr, hist, bulk = (
-                self.get_current_topic_tokens(),
-                self.get_topics_tokens(),
-                self.get_bulks_tokens(),
-            )
-            total = _get_ctx_size_for_history()
-            ratios = [
-                (curr, CURRENT_TOPIC_RATIO, "current_topic"),
-                (hist, HISTORY_TOPIC_RATIO, "history_topic"),
-                (bulk, HISTORY_BULK_RATIO, "history_bulk"),
-            ]
-            ratios = sorted(ratios, key=lambda x: (x[0] / total) / x[1], reverse=True)
-            compressed_part = False
-            for ratio in ratios:
-                if ratio[0] > ratio[1] * total:
-                    over_part = ratio[2]
-                    if over_part == "current_topic":
-                        compressed_part = await self.current.compress()
-                    elif over_part == "history_topic":
-                        compressed_part = await self.compress_topics()
-                    else:
-                        compressed_part = await self.compress_bulks()
-                    if compressed_part:
-                        break
-
-            if compressed_part:
+        stats = CompressionStats()
+        self.compress_stats = stats
+        self._compress_slots = asyncio.Semaphore(COMPRESS_CONCURRENCY)
+        start = time.perf_counter()
+        try:
+            while True:
+                total = _get_ctx_size_for_history()
+                # current topic and older history are independent, compress them side by side
+                parts: list[Coroutine[Any, Any, bool]] = []
+                if self.get_current_topic_tokens() > total * CURRENT_TOPIC_RATIO:
+                    parts.append(self.current.compress())
+                if (
+                    self.get_topics_tokens() > total * HISTORY_TOPIC_RATIO
+                    or self.get_bulks_tokens() > total * HISTORY_BULK_RATIO
+                ):
+                    parts.append(self.compress_history(total))
+                if not parts:
+                    break
+
+                results = await asyncio.gather(*parts)
+                if not any(results):
+                    break
                 compressed = True
-                continue
-            else:
-                return compressed
+                self.version += 1
+                self.invalidate_tokens()
+        finally:
+            self._compress_slots = None
+            stats.wall_time = time.perf_counter() - start
+
+        if compressed and stats.calls > 1:
+            self._log_compression(stats)
+        return compressed
 
-    async def compress_topics(self) -> bool:
-        # summarize topics one by one
-        for topic in self.topics:
-            if not topic.summary:
-                await topic.summarize()
+    async def compress_history(self, total: int | None = None) -> bool:
+        # topics first, they feed bulks when there is nothing left to summarize
+        total = total or _get_ctx_size_for_history()
+        if self.get_topics_tokens() > total * HISTORY_TOPIC_RATIO:
+            if await self.compress_topics(total * HISTORY_TOPIC_RATIO):
                 return True
+        if self.get_bulks_tokens() > total * HISTORY_BULK_RATIO:
+            return await self.compress_bulks()
+        return False
 
-        # move oldest topic to bulks and summarize
+    def plan_topics_compression(self, limit: float) -> list[Topic]:
+        # oldest unsummarized topics whose expected summaries bring topics under limit
+        excess = self.get_topics_tokens() - limit
+        planned: list[Topic] = []
         for topic in self.topics:
+            if excess <= 0:
+                break
+            if not topic.summary:
+                planned.append(topic)
+                excess -= topic.get_tokens() * (1 - SUMMARY_SIZE_ESTIMATE)
+        return planned
+
+    async def compress_topics(self, limit: float | None = None) -> bool:
+        if limit is None:
+            limit = _get_ctx_size_for_history() * HISTORY_TOPIC_RATIO
+
+        # summarize all topics the budget requires at once
+        planned = self.plan_topics_compression(limit)
+        if planned:
+            await asyncio.gather(*[topic.summarize() for topic in planned])
+            self._topics_tokens = None
+            return True
+
+        # everything is summarized already, move oldest topics to bulks
+        moved = False
+        while self.topics and (not moved or self.get_topics_tokens() > limit):
+            topic = self.topics.pop(0)
             bulk = Bulk(history=self)
             bulk.records.append(topic)
             if topic.summary:
-                bulk.summary = topic.summary
+                bulk.set_summary(topic.summary)
             else:
                 await bulk.summarize()
             self.bulks.append(bulk)
-            self.topics.remove(topic)
-            return True
-        return False
+            self._bulks_tokens = None
+            self._topics_tokens = None
+            moved = True
+        return moved
 
     async def compress_bulks(self):
         # merge bulks if possible
         compressed = await self.merge_bulks_by(BULK_MERGE_COUNT)
         # remove oldest bulk if necessary
-        if not compressed:
+        if not compressed and self.bulks:
             self.bulks.pop(0)
+            self._bulks_tokens = None
             return True
         return compressed
 
@@ -436,6 +526,7 @@ class History(Record):
             ]
         )
         self.bulks = bulks
+        self._bulks_tokens = None
         return True
 
     async def merge_bulks(self, bulks: list[Bulk]) -> Bulk:
@@ -444,6 +535,34 @@ class History(Record):
         await bulk.summarize()
         return bulk
 
+    async def call_summary_model(self, system: str, message: str) -> str:
+        # all summarizations go through here to respect the concurrency cap and collect timings
+        slots = self._compress_slots
+        if not slots:
+            return await self.agent.call_utility_model(system=system, message=message)
+        async with slots:
+            start = time.perf_counter()
+            try:
+                return await self.agent.call_utility_model(
+                    system=system, message=message
+                )
+            finally:
+                self.compress_stats.calls += 1
+                self.compress_stats.serial_time += time.perf_counter() - start
+
+    def _log_compression(self, stats: CompressionStats):
+        self.agent.context.log.log(
+            type="util",
+            heading=f"History compressed with {stats.calls} parallel summaries",
+            update_progress="none",
+            kvps={
+                "summaries": stats.calls,
+                "wall_time": f"{stats.wall_time:.2f}s",
+                "serial_time": f"{stats.serial_time:.2f}s",
+                "saved_time": f"{stats.saved_time:.2f}s",
+            },
+        )
+
 
 def deserialize_history(json_data: str, agent) -> History:
     history = History(agent=agent)
@@ -8,7 +8,7 @@ from collections import OrderedDict  # Import OrderedDict
 from python.helpers.strings import truncate_text_by_ratio
 import copy
 from typing import TypeVar
-from python.helpers.secrets import get_secrets_manager
+from python.helpers.secrets import SecretsMatcher, get_secrets_manager
 
 
 if TYPE_CHECKING:
@@ -41,6 +41,7 @@ RESPONSE_CONTENT_MAX_LEN: int = 250_000
 KEY_MAX_LEN: int = 60
 VALUE_MAX_LEN: int = 5000
 PROGRESS_MAX_LEN: int = 120
+CONTENT_MARKS_MAX: int = 64  # append-only content versions kept per item for delta output
 
 
 def _truncate_heading(text: str | None) -> str:
@@ -131,6 +132,9 @@ class LogItem:
     kvps: Optional[OrderedDict] = None  # Use OrderedDict for kvps
     id: Optional[str] = None  # Add id field
     guid: str = ""
+    version: int = 0  # log version of the last update
+    # (log version, content length) since the last non-append content change, oldest first
+    content_marks: list[tuple[int, int]] = field(default_factory=list, repr=False)
 
     def __post_init__(self):
         self.guid = self.log.guid
@@ -172,16 +176,31 @@ class LogItem:
             prev = self.kvps.get(k, "") if self.kvps else ""
             self.update(**{k: prev + v})
 
-    def output(self):
-        return {
+    def output(self, since: int | None = None):
+        """
+        Item as sent to the client. With since (the log version the client has), content
+        that only grew since then is sent as the appended text with its offset in content_from.
+        """
+        content = self.content
+        content_from = 0
+        if since is not None and self.content_marks and self.content_marks[0][0] <= since:
+            for version, length in reversed(self.content_marks):
+                if version <= since:
+                    content_from = length
+                    content = content[length:]
+                    break
+        out = {
             "no": self.no,
             "id": self.id,  # Include id in output
             "type": self.type,
             "heading": self.heading,
-            "content": self.content,
+            "content": content,
             "temp": self.temp,
             "kvps": self.kvps,
         }
+        if content_from:
+            out["content_from"] = content_from
+        return out
 
 
 class Log:
@@ -189,7 +208,9 @@ class Log:
     def __init__(self):
         self.context: "AgentContext|None" = None # set from outside
         self.guid: str = str(uuid.uuid4())
-        self.updates: list[int] = []
+        # incremented on every item update, items are kept in the journal once in order of their last update
+        self.version: int = 0
+        self.journal: OrderedDict[int, int] = OrderedDict()
         self.logs: list[LogItem] = []
         self.set_initial_progress()
 
@@ -262,6 +283,13 @@ class Log:
         if content is not None:
             content = self._mask_recursive(content)
             content = _truncate_content(content, item.type)
+            if item.content_marks and content.startswith(item.content):
+                # streamed chunk, the client can append it
+                item.content_marks.append((self.version + 1, len(content)))
+                if len(item.content_marks) > CONTENT_MARKS_MAX:
+                    del item.content_marks[0]
+            else:
+                item.content_marks = [(self.version + 1, len(content))]
             item.content = content
         if kvps is not None:
             kvps = OrderedDict(copy.deepcopy(kvps))
@@ -275,9 +303,25 @@ class Log:
             kwargs = self._mask_recursive(kwargs)
             item.kvps.update(kwargs)
 
-        self.updates += [item.no]
+        self.mark_updated(item.no)
         self._update_progress_from_item(item)
 
+    def mark_updated(self, no: int):
+        self.version += 1
+        self.logs[no].version = self.version
+        self.journal[no] = self.version
+        self.journal.move_to_end(no)
+
+    def changed_since(self, version: int) -> list[LogItem]:
+        """Items updated after the given log version, in log order."""
+        changed = []
+        for no, item_version in reversed(self.journal.items()):
+            if item_version <= version:
+                break
+            changed.append(self.logs[no])
+        changed.sort(key=lambda item: item.no)
+        return changed
+
     def set_progress(self, progress: str, no: int = 0, active: bool = True):
         progress = self._mask_recursive(progress)
         progress = _truncate_progress(progress)
@@ -290,24 +334,20 @@ class Log:
     def set_initial_progress(self):
         self.set_progress("Waiting for input", 0, False)
 
-    def output(self, start=None, end=None):
+    def output(self, start=None, deltas: bool = False):
+        """
+        Items updated after log version start. With deltas, streamed content is sent
+        as appended text only, see LogItem.output.
+        """
         if start is None:
             start = 0
-        if end is None:
-            end = len(self.updates)
-
-        out = []
-        seen = set()
-        for update in self.updates[start:end]:
-            if update not in seen:
-                out.append(self.logs[update].output())
-                seen.add(update)
-
-        return out
+        since = start if deltas else None
+        return [item.output(since) for item in self.changed_since(start)]
 
     def reset(self):
         self.guid = str(uuid.uuid4())
-        self.updates = []
+        self.version = 0
+        self.journal = OrderedDict()
         self.logs = []
         self.set_initial_progress()
 
@@ -332,14 +372,19 @@ class Log:
             # if self_id != current_id:
             #     print(f"Context ID mismatch: {self_id} != {current_id}")
 
-            if isinstance(obj, str):
-                return secrets_mgr.mask_values(obj)
-            elif isinstance(obj, dict):
-                return {k: self._mask_recursive(v) for k, v in obj.items()}  # type: ignore
-            elif isinstance(obj, list):
-                return [self._mask_recursive(item) for item in obj]  # type: ignore
-            else:
-                return obj
+            # one compiled matcher for the whole object
+            return _mask_with(secrets_mgr.get_matcher(), obj)
         except Exception as _e:
             # If masking fails, return original object
-            return obj
\ No newline at end of file
+            return obj
+
+
+def _mask_with(matcher: SecretsMatcher, obj: T) -> T:
+    if isinstance(obj, str):
+        return matcher.mask(obj)  # type: ignore
+    elif isinstance(obj, dict):
+        return {k: _mask_with(matcher, v) for k, v in obj.items()}  # type: ignore
+    elif isinstance(obj, list):
+        return [_mask_with(matcher, item) for item in obj]  # type: ignore
+    else:
+        return obj
\ No newline at end of file
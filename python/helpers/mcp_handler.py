@@ -39,6 +39,7 @@ from anyio.streams.memory import (
 
 from pydantic import BaseModel, Field, Discriminator, Tag, PrivateAttr
 from python.helpers import dirty_json
+from python.helpers.mcp_session_pool import MCPSessionPool, POOL_SIZE, MAX_IN_FLIGHT, READ_TIMEOUT
 from python.helpers.print_style import PrintStyle
 from python.helpers.tool import Tool, Response
 
@@ -218,6 +219,8 @@ class MCPServerRemote(BaseModel):
     headers: dict[str, Any] | None = Field(default_factory=dict[str, Any])
     init_timeout: int = Field(default=0)
     tool_timeout: int = Field(default=0)
+    pool_size: int = Field(default=POOL_SIZE, description="Pooled sessions kept open")
+    max_concurrency: int = Field(default=MAX_IN_FLIGHT, description="Concurrent in-flight calls")
     verify: bool = Field(default=True, description="Verify SSL certificates")
     disabled: bool = Field(default=False)
 
@@ -247,13 +250,22 @@ class MCPServerRemote(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_pool_stats(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_pool_stats()  # type: ignore
+
+    def close(self):
+        with self.__lock:
+            self.__client.close()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # the lock is not held while awaiting, the session pool bounds concurrency
+        return await client.call_tool(tool_name, input_data)  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerRemote":
         with self.__lock:
@@ -267,6 +279,8 @@ class MCPServerRemote(BaseModel):
                     "headers",
                     "init_timeout",
                     "tool_timeout",
+                    "pool_size",
+                    "max_concurrency",
                     "disabled",
                     "verify",
                 ]:
@@ -280,6 +294,7 @@ class MCPServerRemote(BaseModel):
             return asyncio.run(self.__on_update())
 
     async def __on_update(self) -> "MCPServerRemote":
+        self.__client.close()  # type: ignore # sessions of the previous config
         await self.__client.update_tools()  # type: ignore
         return self
 
@@ -297,6 +312,8 @@ class MCPServerLocal(BaseModel):
     )
     init_timeout: int = Field(default=0)
     tool_timeout: int = Field(default=0)
+    pool_size: int = Field(default=POOL_SIZE, description="Pooled sessions kept open")
+    max_concurrency: int = Field(default=MAX_IN_FLIGHT, description="Concurrent in-flight calls")
     verify: bool = Field(default=True, description="Verify SSL certificates")
     disabled: bool = Field(default=False)
 
@@ -326,13 +343,22 @@ class MCPServerLocal(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_pool_stats(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_pool_stats()  # type: ignore
+
+    def close(self):
+        with self.__lock:
+            self.__client.close()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # the lock is not held while awaiting, the session pool bounds concurrency
+        return await client.call_tool(tool_name, input_data)  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerLocal":
         with self.__lock:
@@ -348,6 +374,8 @@ class MCPServerLocal(BaseModel):
                     "encoding_error_handler",
                     "init_timeout",
                     "tool_timeout",
+                    "pool_size",
+                    "max_concurrency",
                     "disabled",
                 ]:
                     if key == "name":
@@ -357,6 +385,7 @@ class MCPServerLocal(BaseModel):
             return asyncio.run(self.__on_update())
 
     async def __on_update(self) -> "MCPServerLocal":
+        self.__client.close()  # type: ignore # sessions of the previous config
         await self.__client.update_tools()  # type: ignore
         return self
 
@@ -465,6 +494,13 @@ class MCPConfig(BaseModel):
                 "servers": servers_data
             }  # Prepare data for re-initialization or update
 
+            # close pooled sessions of the servers being replaced
+            for server in instance.servers:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+
             # Option 1: Re-initialize the existing instance (if __init__ is idempotent for other fields)
             instance.__init__(servers_list=servers_data)
 
@@ -638,6 +674,8 @@ class MCPConfig(BaseModel):
                 error = server.get_error()
                 # get log bool
                 has_log = server.get_log() != ""
+                # session pool hits/misses and call latency
+                pool = server.get_pool_stats()
 
                 # add server status to result
                 result.append(
@@ -647,6 +685,7 @@ class MCPConfig(BaseModel):
                         "error": error,
                         "tool_count": tool_count,
                         "has_log": has_log,
+                        "pool": pool,
                     }
                 )
 
@@ -773,10 +812,17 @@ class MCPConfig(BaseModel):
             raise ValueError(f"Tool {tool_name} not found")
         server_name_part, tool_name_part = tool_name.split(".")
         with self.__lock:
-            for server in self.servers:
-                if server.name == server_name_part and server.has_tool(tool_name_part):
-                    return await server.call_tool(tool_name_part, input_data)
+            server = next(
+                (
+                    s
+                    for s in self.servers
+                    if s.name == server_name_part and s.has_tool(tool_name_part)
+                ),
+                None,
+            )
+        if not server:
             raise ValueError(f"Tool {tool_name} not found")
+        return await server.call_tool(tool_name_part, input_data)
 
 
 T = TypeVar("T")
@@ -785,7 +831,7 @@ T = TypeVar("T")
 class MCPClientBase(ABC):
     # server: Union[MCPServerLocal, MCPServerRemote] # Defined in __init__
     # tools: List[dict[str, Any]] # Defined in __init__
-    # No self.session, self.exit_stack, self.stdio, self.write as persistent instance fields
+    # Sessions are kept open in self.pool, see python/helpers/mcp_session_pool.py
 
     __lock: ClassVar[threading.Lock] = threading.Lock()
 
@@ -795,6 +841,7 @@ class MCPClientBase(ABC):
         self.error: str = ""
         self.log: List[str] = []
         self.log_file: Optional[TextIO] = None
+        self.pool: Optional[MCPSessionPool] = None
 
     # Protected method
     @abstractmethod
@@ -807,68 +854,66 @@ class MCPClientBase(ABC):
         """Create stdio/write streams using the provided exit_stack."""
         ...
 
+    def _get_pool(self) -> MCPSessionPool:
+        with self.__lock:
+            if self.pool is None:
+                self.pool = MCPSessionPool(
+                    self.server.name,
+                    self._open_session,
+                    size=self.server.pool_size,
+                    max_in_flight=self.server.max_concurrency,
+                )
+            return self.pool
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        with self.__lock:
+            pool = self.pool
+        return pool.get_stats() if pool else {}
+
+    def close(self):
+        """Close pooled sessions, the next operation opens a new pool"""
+        with self.__lock:
+            pool, self.pool = self.pool, None
+        if pool:
+            pool.close()
+
+    async def _open_session(self, exit_stack: AsyncExitStack) -> ClientSession:
+        """Create transport and initialized session, both closed with exit_stack"""
+        set = settings.get_settings()
+        stdio, write = await self._create_stdio_transport(exit_stack)
+        session = await exit_stack.enter_async_context(
+            ClientSession(
+                stdio,  # type: ignore
+                write,  # type: ignore
+                read_timeout_seconds=timedelta(
+                    seconds=self.server.init_timeout or set["mcp_client_init_timeout"]
+                ),
+            )
+        )
+        await session.initialize()
+        return session
+
     async def _execute_with_session(
         self,
         coro_func: Callable[[ClientSession], Awaitable[T]],
-        read_timeout_seconds=60,
     ) -> T:
         """
-        Manages the lifecycle of an MCP session for a single operation.
-        Creates a temporary session, executes coro_func with it, and ensures cleanup.
+        Executes coro_func with a pooled session of this server.
+        Sessions stay open between operations, broken ones are replaced on next use.
         """
         operation_name = coro_func.__name__  # For logging
-        # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Creating new session for operation '{operation_name}'...")
-        # Store the original exception outside the async block
-        original_exception = None
         try:
-            async with AsyncExitStack() as temp_stack:
-                try:
-
-                    stdio, write = await self._create_stdio_transport(temp_stack)
-                    # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name} - {operation_name}): Transport created. Initializing session...")
-                    session = await temp_stack.enter_async_context(
-                        ClientSession(
-                            stdio,  # type: ignore
-                            write,  # type: ignore
-                            read_timeout_seconds=timedelta(
-                                seconds=read_timeout_seconds
-                            ),
-                        )
-                    )
-                    await session.initialize()
-
-                    result = await coro_func(session)
-
-                    return result
-                except Exception as e:
-                    # Store the original exception and raise a dummy exception
-                    excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
-                    if excs:
-                        original_exception = excs[0]
-                    else:
-                        original_exception = e
-                    # Create a dummy exception to break out of the async block
-                    raise RuntimeError("Dummy exception to break out of async block")
+            return await self._get_pool().run(coro_func)
         except Exception as e:
-            # Check if this is our dummy exception
-            if original_exception is not None:
-                e = original_exception
-            # We have the original exception stored
+            excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
+            if excs:
+                e = excs[0]
             PrintStyle(
                 background_color="#AA4455", font_color="white", padding=False
             ).print(
                 f"MCPClientBase ({self.server.name} - {operation_name}): Error during operation: {type(e).__name__}: {e}"
             )
             raise e  # Re-raise the original exception
-        # finally:
-        #     PrintStyle(font_color="cyan").print(
-        #         f"MCPClientBase ({self.server.name} - {operation_name}): Session and transport will be closed by AsyncExitStack."
-        #     )
-        # This line should ideally be unreachable if the try/except/finally logic within the 'async with' is exhaustive.
-        # Adding it to satisfy linters that might not fully trace the raise/return paths through async context managers.
-        raise RuntimeError(
-            f"MCPClientBase ({self.server.name} - {operation_name}): _execute_with_session exited 'async with' block unexpectedly."
-        )
 
     async def update_tools(self) -> "MCPClientBase":
         # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Starting 'update_tools' operation...")
@@ -889,12 +934,7 @@ class MCPClientBase(ABC):
             )
 
         try:
-            set = settings.get_settings()
-            await self._execute_with_session(
-                list_tools_op,
-                read_timeout_seconds=self.server.init_timeout
-                or set["mcp_client_init_timeout"],
-            )
+            await self._execute_with_session(list_tools_op)
         except Exception as e:
             # e = eg.exceptions[0]
             error_text = errors.format_error(e, 0, 0)
@@ -944,11 +984,16 @@ class MCPClientBase(ABC):
 
         async def call_tool_op(current_session: ClientSession):
             set = settings.get_settings()
+            tool_timeout = self.server.tool_timeout or set["mcp_client_tool_timeout"]
             # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Executing 'call_tool' for '{tool_name}' via MCP session...")
-            response: CallToolResult = await current_session.call_tool(
-                tool_name,
-                input_data,
-                read_timeout_seconds=timedelta(seconds=set["mcp_client_tool_timeout"]),
+            # the transport read timeout is long for pooled sessions, the call is bounded here
+            response: CallToolResult = await asyncio.wait_for(
+                current_session.call_tool(
+                    tool_name,
+                    input_data,
+                    read_timeout_seconds=timedelta(seconds=tool_timeout),
+                ),
+                timeout=tool_timeout,
             )
             # PrintStyle(font_color="green").print(f"MCPClientBase ({self.server.name}): Tool '{tool_name}' call successful via session.")
             return response
@@ -980,6 +1025,10 @@ class MCPClientBase(ABC):
 
 class MCPClientLocal(MCPClientBase):
     def __del__(self):
+        # no lock here, __del__ may run while it is held
+        pool = getattr(self, "pool", None)
+        if pool is not None:
+            pool.close()
         # close the log file if it exists
         if hasattr(self, "log_file") and self.log_file is not None:
             try:
@@ -1073,7 +1122,6 @@ class MCPClientRemote(MCPClientBase):
 
         # Use lower timeouts for faster failure detection
         init_timeout = min(server.init_timeout or set["mcp_client_init_timeout"], 5)
-        tool_timeout = min(server.tool_timeout or set["mcp_client_tool_timeout"], 10)
 
         client_factory = CustomHTTPClientFactory(verify=server.verify)
         # Check if this is a streaming HTTP type
@@ -1084,7 +1132,8 @@ class MCPClientRemote(MCPClientBase):
                     url=server.url,
                     headers=server.headers,
                     timeout=timedelta(seconds=init_timeout),
-                    sse_read_timeout=timedelta(seconds=tool_timeout),
+                    # pooled sessions idle between calls, tool calls have their own timeout
+                    sse_read_timeout=timedelta(seconds=READ_TIMEOUT),
                     httpx_client_factory=client_factory,
                 )
             )
@@ -1102,7 +1151,8 @@ class MCPClientRemote(MCPClientBase):
                     url=server.url,
                     headers=server.headers,
                     timeout=init_timeout,
-                    sse_read_timeout=tool_timeout,
+                    # pooled sessions idle between calls, tool calls have their own timeout
+                    sse_read_timeout=READ_TIMEOUT,
                     httpx_client_factory=client_factory,
                 )
             )
@@ -0,0 +1,303 @@
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TypeVar
+
+import anyio
+from mcp import ClientSession
+
+from python.helpers.print_style import PrintStyle
+
+T = TypeVar("T")
+
+POOL_SIZE = 2  # sessions (stdio processes / remote connections) per server
+MAX_IN_FLIGHT = 4  # concurrent operations per server
+IDLE_TIMEOUT = 300  # seconds before an unused session is closed
+HEALTH_INTERVAL = 30  # seconds between keep-alive pings of idle sessions
+PING_TIMEOUT = 5
+# read timeout of pooled transports, an idle session sees a health ping well within it
+READ_TIMEOUT = HEALTH_INTERVAL * 2 + PING_TIMEOUT
+CONNECT_ATTEMPTS = 2
+BACKOFF_START = 0.5
+BACKOFF_MAX = 30
+
+# sessions are bound to the event loop and task that opened them (anyio task groups),
+# callers come from different loops, so all sessions live on one dedicated loop thread
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=run, name="mcp-sessions", daemon=True).start()
+            ready.wait()
+            _loop = loop
+        return _loop
+
+
+def _unwrap(e: BaseException) -> BaseException:
+    # anyio task groups raise ExceptionGroups, the first one is the interesting one
+    excs = getattr(e, "exceptions", None)
+    return _unwrap(excs[0]) if excs else e
+
+
+@dataclass
+class PoolStats:
+    calls: int = 0
+    errors: int = 0
+    hits: int = 0
+    misses: int = 0
+    opened: int = 0
+    discarded: int = 0
+    connect_errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+class _PooledSession:
+    def __init__(self):
+        self.session: ClientSession = None  # type: ignore
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self.closed = False
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def open(self, factory: Callable[[AsyncExitStack], Awaitable[ClientSession]]):
+        ready = asyncio.get_running_loop().create_future()
+
+        async def run():
+            # transport and session are entered and exited by this one task
+            try:
+                async with AsyncExitStack() as stack:
+                    self.session = await factory(stack)
+                    ready.set_result(None)
+                    await self._stop.wait()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(_unwrap(e))
+            finally:
+                self.closed = True
+
+        self._task = asyncio.create_task(run())
+        await ready
+
+    async def close(self):
+        self.closed = True
+        self._stop.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, PING_TIMEOUT)
+            except BaseException:
+                pass
+
+
+class MCPSessionPool:
+    """
+    Keeps initialized MCP sessions of one server open between operations.
+    Operations from any event loop are executed on the pool loop, reusing the least busy session,
+    new sessions are opened up to size, failed connections back off exponentially.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[AsyncExitStack], Awaitable[ClientSession]],
+        size: int = POOL_SIZE,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.stats = PoolStats()
+        self._sessions: list[_PooledSession] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._open_lock: asyncio.Lock | None = None
+        self._health_task: asyncio.Task | None = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._last_error: BaseException | None = None
+        self._in_flight = 0
+        self._closed = False
+
+    async def run(self, op: Callable[[ClientSession], Awaitable[T]]) -> T:
+        loop = _get_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await self._run(op)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._run(op), loop))
+
+    def close(self):
+        """Close all sessions, busy ones after their current operation"""
+        self._closed = True
+        if _loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close(), _loop)
+
+    def get_stats(self) -> dict[str, Any]:
+        s = self.stats
+        return {
+            "sessions": sum(1 for p in self._sessions if not p.closed),
+            "in_flight": self._in_flight,
+            "calls": s.calls,
+            "errors": s.errors,
+            "hits": s.hits,
+            "misses": s.misses,
+            "opened": s.opened,
+            "discarded": s.discarded,
+            "connect_errors": s.connect_errors,
+            "avg_ms": round(s.total_time / s.calls * 1000, 1) if s.calls else 0.0,
+            "max_ms": round(s.max_time * 1000, 1),
+        }
+
+    async def _run(self, op: Callable[[ClientSession], Awaitable[T]]) -> T:
+        if self._closed:
+            raise ConnectionError(f"MCP session pool of '{self.name}' is closed")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._open_lock = asyncio.Lock()
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+        start = time.perf_counter()
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                for attempt in range(2):
+                    pooled = await self._acquire()
+                    pooled.in_use += 1
+                    failed = False
+                    try:
+                        result = await op(pooled.session)
+                        self._record(time.perf_counter() - start, False)
+                        return result
+                    except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                        # transport died while idle, the request was never sent, retry on a new session
+                        failed = True
+                        if attempt:
+                            raise
+                    except Exception:
+                        failed = True
+                        raise
+                    finally:
+                        pooled.in_use -= 1
+                        pooled.last_used = time.monotonic()
+                        # a failed operation may have broken the connection, keep the session only if it still answers
+                        if (self._closed and not pooled.in_use) or (
+                            failed and not await self._is_healthy(pooled)
+                        ):
+                            await self._discard(pooled)
+                raise RuntimeError("unreachable")
+            except BaseException:
+                self._record(time.perf_counter() - start, True)
+                raise
+            finally:
+                self._in_flight -= 1
+
+    def _live(self) -> list[_PooledSession]:
+        self._sessions = [p for p in self._sessions if not p.closed]
+        return self._sessions
+
+    def _pick(self, opening: bool) -> _PooledSession | None:
+        live = self._live()
+        best = min(live, key=lambda p: p.in_use, default=None)
+        if best and (best.in_use == 0 or len(live) >= self.size or opening):
+            self.stats.hits += 1
+            return best
+        return None
+
+    async def _acquire(self) -> _PooledSession:
+        assert self._open_lock
+        # share busy sessions while another one is being opened
+        pooled = self._pick(self._open_lock.locked())
+        if pooled:
+            return pooled
+        async with self._open_lock:
+            pooled = self._pick(False)
+            if pooled:
+                return pooled
+            self.stats.misses += 1
+            return await self._open()
+
+    async def _open(self) -> _PooledSession:
+        if self._retry_at > time.monotonic() and self._last_error:
+            # still backing off after failed connects, fail fast instead of hammering the server
+            raise self._last_error
+        for attempt in range(CONNECT_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(self._backoff)
+            pooled = _PooledSession()
+            try:
+                await pooled.open(self.factory)
+            except Exception as e:
+                self.stats.connect_errors += 1
+                self._last_error = e
+                self._backoff = min(BACKOFF_MAX, self._backoff * 2 or BACKOFF_START)
+                self._retry_at = time.monotonic() + self._backoff
+                continue
+            self._backoff = self._retry_at = 0.0
+            self._last_error = None
+            self.stats.opened += 1
+            self._sessions.append(pooled)
+            return pooled
+        raise self._last_error  # type: ignore
+
+    async def _is_healthy(self, pooled: _PooledSession) -> bool:
+        if pooled.closed:
+            return False
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, pooled: _PooledSession):
+        if pooled in self._sessions:
+            self._sessions.remove(pooled)
+            self.stats.discarded += 1
+        await pooled.close()
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            now = time.monotonic()
+            for pooled in list(self._live()):
+                if pooled.in_use:
+                    continue
+                if now - pooled.last_used > IDLE_TIMEOUT:
+                    await self._discard(pooled)
+                elif not await self._is_healthy(pooled):
+                    PrintStyle(font_color="orange").print(
+                        f"MCPSessionPool ({self.name}): session failed health check, reconnecting on next use."
+                    )
+                    await self._discard(pooled)
+
+    async def _close(self):
+        if self._health_task:
+            self._health_task.cancel()
+        for pooled in list(self._live()):
+            if not pooled.in_use:
+                await self._discard(pooled)
+
+    def _record(self, elapsed: float, failed: bool):
+        self.stats.calls += 1
+        self.stats.total_time += elapsed
+        if elapsed > self.stats.max_time:
+            self.stats.max_time = elapsed
+        if failed:
+            self.stats.errors += 1
@@ -1,8 +1,9 @@
+import asyncio
 from datetime import datetime
 from typing import Any, List, Sequence
 from langchain.storage import InMemoryByteStore, LocalFileStore
 from langchain.embeddings import CacheBackedEmbeddings
-from python.helpers import guids
+from python.helpers import faiss_ann, guids, memory_persistence
 
 # from langchain_chroma import Chroma
 from langchain_community.vectorstores import FAISS
@@ -18,7 +19,7 @@ from langchain_community.vectorstores.utils import (
 )
 from langchain_core.embeddings import Embeddings
 
-import os, json
+import os, json, pickle
 
 import numpy as np
 
@@ -52,6 +53,19 @@ class MyFaiss(FAISS):
     def get_all_docs(self):
         return self.docstore._dict  # type: ignore
 
+    def serialize(self) -> dict[str, bytes]:
+        # same files as save_local, produced in memory so they can be written atomically
+        # index.faiss is always the flat index, an ANN structure goes to index.ann
+        return {
+            **faiss_ann.serialize(self.index),
+            "index.pkl": pickle.dumps((self.docstore, self.index_to_docstore_id)),
+        }
+
+    def save_local(self, folder_path: str, index_name: str = "index") -> None:
+        # faiss.write_index cannot handle the ANN wrapper, write through serialize instead
+        data = {index_name + os.path.splitext(name)[1]: content for name, content in self.serialize().items()}
+        memory_persistence.write_files(folder_path, data)
+
 
 class Memory:
 
@@ -123,6 +137,8 @@ class Memory:
     @staticmethod
     async def reload(agent: Agent):
         memory_subdir = get_agent_memory_subdir(agent)
+        # the snapshot can take a while on large indexes, keep it off the event loop
+        await asyncio.to_thread(memory_persistence.flush, memory_subdir)
         if Memory.index.get(memory_subdir):
             del Memory.index[memory_subdir]
         return await Memory.get(agent)
@@ -136,6 +152,7 @@ class Memory:
     ) -> tuple[Any, bool]:
 
         cfg = get_memory_config()
+        faiss_cfg = cfg.get("faiss", {}) or {}
         backend = (cfg.get("backend") or "faiss").lower()
         use_qdrant = backend in ["qdrant", "hybrid"]
         fallback_to_faiss = cfg.get("fallback_to_faiss", True)
@@ -188,6 +205,7 @@ class Memory:
                     limit=qcfg.get("limit", 20),
                     timeout=qcfg.get("timeout", 10),
                     searchable_payload_keys=qcfg.get("searchable_payload_keys", []),
+                    sparse_stats_path=os.path.join(db_dir, "bm25.json"),
                 )
                 return store, True
             except Exception as e:
@@ -231,9 +249,21 @@ class Memory:
                 docs = db.get_all_docs()
                 db = None
 
+            # approximate search structure, restored from index.ann or built from the flat vectors
+            if db:
+                ann_file = files.get_abs_path(db_dir, "index.ann")
+                ann_data = files.read_file_bin(ann_file) if files.exists(ann_file) else None
+                db.index = faiss_ann.wrap(db.index, faiss_cfg, ann_data)
+                if isinstance(db.index, faiss_ann.AnnIndex) and db.index.ann is not None and not db.index.restored:
+                    # migrated existing store, save the built structure so it is not rebuilt on next start
+                    PrintStyle.standard(f"Built {faiss_cfg.get('index_type')} index for {db.index.ntotal} vectors")
+                    Memory._save_db_file(db, memory_subdir)
+
         # DB not loaded, create one
         if not db:
-            index = faiss.IndexFlatIP(len(embedder.embed_query("example")))
+            index = faiss_ann.wrap(
+                faiss.IndexFlatIP(len(embedder.embed_query("example"))), faiss_cfg
+            )
 
             db = MyFaiss(
                 embedding_function=embedder,
@@ -304,17 +334,30 @@ class Memory:
         # preload knowledge folders
         index = self._preload_knowledge_folders(log_item, kn_dirs, index)
 
+        # collect all changes first so the index is written once
+        changed: list[str] = []
+        removed = False
         for file in index:
             if index[file]["state"] in ["changed", "removed"] and index[file].get(
                 "ids", []
             ):  # for knowledge files that have been changed or removed and have IDs
-                await self.delete_documents_by_ids(
-                    index[file]["ids"]
-                )  # remove original version
+                if await self.delete_documents_by_ids(
+                    index[file]["ids"], persist=False
+                ):  # remove original version
+                    removed = True
             if index[file]["state"] == "changed":
-                index[file]["ids"] = await self.insert_documents(
-                    index[file]["documents"]
-                )  # insert new version
+                changed.append(file)
+
+        # insert new versions in one bulk operation
+        docs = [doc for file in changed for doc in index[file]["documents"]]
+        ids = await self.insert_documents_bulk(docs, persist=False)
+        pos = 0
+        for file in changed:
+            count = len(index[file]["documents"])
+            index[file]["ids"] = ids[pos : pos + count]
+            pos += count
+        if removed or docs:
+            self._save_db()  # persist, unchanged knowledge leaves the index as it is
 
         # remove index where state="removed"
         index = {k: v for k, v in index.items() if v["state"] != "removed"}
@@ -404,9 +447,20 @@ class Memory:
 
         while True:
             # Perform similarity search with score
-            docs = await self.search_similarity_threshold(
-                query, limit=k, threshold=threshold, filter=filter
-            )
+            if self.backend == "qdrant":
+                # deletes match by meaning only, hybrid keyword hits must never remove memories
+                docs = await self.db.asearch(
+                    query,
+                    search_type="similarity_score_threshold",
+                    k=k,
+                    score_threshold=threshold,
+                    filter=filter,
+                    hybrid=False,
+                )
+            else:
+                docs = await self.search_similarity_threshold(
+                    query, limit=k, threshold=threshold, filter=filter
+                )
             removed += docs
 
             # Extract document IDs and filter based on score
@@ -418,7 +472,7 @@ class Memory:
                 # fnd = self.db.get(where={"id": {"$in": document_ids}})
                 # if fnd["ids"]: self.db.delete(ids=fnd["ids"])
                 # tot += len(fnd["ids"])
-                await self.db.adelete(ids=document_ids)
+                await self._delete_ids(document_ids)
                 tot += len(document_ids)
 
             # If fewer than K document IDs, break the loop
@@ -429,16 +483,16 @@ class Memory:
             self._save_db()  # persist
         return removed
 
-    async def delete_documents_by_ids(self, ids: list[str]):
+    async def delete_documents_by_ids(self, ids: list[str], persist: bool = True):
         # aget_by_ids is not yet implemented in faiss, need to do a workaround
         rem_docs = await self.db.aget_by_ids(
             ids
         )  # existing docs to remove (prevents error)
         if rem_docs:
             rem_ids = [doc.metadata["id"] for doc in rem_docs]  # ids to remove
-            await self.db.adelete(ids=rem_ids)
+            await self._delete_ids(rem_ids)
 
-        if rem_docs:
+        if rem_docs and persist:
             self._save_db()  # persist
         return rem_docs
 
@@ -447,61 +501,126 @@ class Memory:
         ids = await self.insert_documents([doc])
         return ids[0]
 
-    async def insert_documents(self, docs: list[Document]):
-        ids = await self._generate_doc_ids(len(docs))
-        timestamp = self.get_timestamp()
+    async def insert_documents(self, docs: list[Document], persist: bool = True):
+        return await self.insert_documents_bulk(docs, persist=persist)
 
-        if ids:
-            for doc, id in zip(docs, ids):
-                doc.metadata["id"] = id  # add ids to documents metadata
-                doc.metadata["timestamp"] = timestamp  # add timestamp
-                if not doc.metadata.get("area", ""):
-                    doc.metadata["area"] = Memory.Area.MAIN.value
+    async def insert_documents_bulk(
+        self,
+        docs: list[Document],
+        batch_size: int | None = None,
+        workers: int | None = None,
+        persist: bool = True,
+    ) -> list[str]:
+        """Insert documents in concurrently embedded batches, the DB is persisted once at the end"""
+        if not docs:
+            return []
+        batch_cfg = self.cfg.get("batch", {}) or {}
+        batch_size = max(1, batch_size or batch_cfg.get("size", 100))
+        workers = max(1, workers or batch_cfg.get("workers", 4))
+
+        ids = self._generate_doc_ids(len(docs))
+        timestamp = self.get_timestamp()
+        for doc, id in zip(docs, ids):
+            doc.metadata["id"] = id  # add ids to documents metadata
+            doc.metadata["timestamp"] = timestamp  # add timestamp
+            if not doc.metadata.get("area", ""):
+                doc.metadata["area"] = Memory.Area.MAIN.value
+
+        slots = asyncio.Semaphore(workers)
+
+        async def add_batch(start: int):
+            async with slots:
+                await self._add_documents(
+                    docs[start : start + batch_size], ids[start : start + batch_size]
+                )
 
-            await self.db.aadd_documents(documents=docs, ids=ids)
-            self._save_db()  # persist
+        try:
+            # let every batch settle before persisting, a failed batch does not stop the others
+            results = await asyncio.gather(
+                *[add_batch(start) for start in range(0, len(docs), batch_size)],
+                return_exceptions=True,
+            )
+        finally:
+            if persist:
+                self._save_db()  # persist whatever got in
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
         return ids
 
     async def update_documents(self, docs: list[Document]):
         ids = [doc.metadata["id"] for doc in docs]
-        await self.db.adelete(ids=ids)  # delete originals
-        ins = await self.db.aadd_documents(documents=docs, ids=ids)  # add updated
+        ins = await self._add_documents(docs, ids, replace=True)  # originals replaced by updated
         self._save_db()  # persist
         return ins
 
+    async def _add_documents(
+        self, docs: list[Document], ids: list[str], replace: bool = False
+    ) -> list[str]:
+        if not isinstance(self.db, MyFaiss):
+            if replace:
+                await self.db.adelete(ids=ids)
+            return await self.db.aadd_documents(documents=docs, ids=ids)
+        # embed first, only the index and docstore update holds the store against snapshots
+        texts = [doc.page_content for doc in docs]
+        embeddings = await self.db.embedding_function.aembed_documents(texts)  # type: ignore
+        async with memory_persistence.awriting(self.memory_subdir):
+            if replace:
+                self.db.delete(ids=ids)
+            return self.db.add_embeddings(
+                list(zip(texts, embeddings)),
+                metadatas=[doc.metadata for doc in docs],
+                ids=ids,
+            )
+
+    async def _delete_ids(self, ids: list[str]):
+        if not isinstance(self.db, MyFaiss):
+            await self.db.adelete(ids=ids)
+            return
+        async with memory_persistence.awriting(self.memory_subdir):
+            self.db.delete(ids=ids)
+
     def _save_db(self):
         if getattr(self.db, "is_qdrant", False):
             return
-        Memory._save_db_file(self.db, self.memory_subdir)
+        cfg = self.cfg.get("persistence", {}) or {}
+        delay = float(cfg.get("flush_delay_seconds", 0) or 0)
+        if delay <= 0 or not hasattr(self.db, "serialize"):
+            Memory._save_db_file(self.db, self.memory_subdir)
+            return
+        # write-behind, the flusher thread writes the index once changes settle
+        memory_persistence.mark_dirty(
+            self.memory_subdir,
+            abs_db_dir(self.memory_subdir),
+            self.db.serialize,
+            delay=delay,
+            max_delay=float(cfg.get("max_delay_seconds", delay) or delay),
+        )
 
-    async def _generate_doc_ids(self, count: int) -> list[str]:
+    def _generate_doc_ids(self, count: int) -> list[str]:
+        # FAISS keeps its docstore in memory, so collisions are checked locally
+        # remote stores rely on the id space (62^10) instead of a lookup per id
+        existing = self.db.get_all_docs() if self.backend == "faiss" else {}
         ids: list[str] = []
-        for _ in range(count):
-            while True:
-                doc_id = guids.generate_id(10)  # random ID
-                if not await self._id_exists(doc_id):
-                    ids.append(doc_id)
-                    break
+        taken: set[str] = set()
+        while len(ids) < count:
+            doc_id = guids.generate_id(10)  # random ID
+            if doc_id not in taken and doc_id not in existing:
+                taken.add(doc_id)
+                ids.append(doc_id)
         return ids
 
-    async def _id_exists(self, doc_id: str) -> bool:
-        try:
-            if hasattr(self.db, "aget_by_ids"):
-                res = await self.db.aget_by_ids([doc_id])
-                return bool(res)
-            if hasattr(self.db, "get_by_ids"):
-                res = self.db.get_by_ids([doc_id] if isinstance(doc_id, str) else doc_id)
-                return bool(res)
-        except Exception:
-            return False
-        return False
-
     @staticmethod
     def _save_db_file(db: Any, memory_subdir: str):
         if getattr(db, "is_qdrant", False):
             return
         abs_dir = abs_db_dir(memory_subdir)
-        db.save_local(folder_path=abs_dir)
+        if hasattr(db, "serialize"):
+            with memory_persistence.writing(memory_subdir):
+                data = db.serialize()
+            memory_persistence.write_files(abs_dir, data)
+        else:
+            db.save_local(folder_path=abs_dir)
 
     @staticmethod
     def _get_comparator(condition: str):
@@ -552,7 +671,8 @@ def get_custom_knowledge_subdir_abs(agent: Agent) -> str:
 
 
 def reload():
-    # clear the memory index, this will force all DBs to reload
+    # write pending changes first, then clear the memory index, this will force all DBs to reload
+    memory_persistence.flush_all()
     Memory.index = {}
 
 
@@ -24,6 +24,18 @@ DEFAULT_CONFIG = {
             "consolidation_action",
         ],
     },
+    "batch": {
+        "size": 100,  # documents per embedding batch on bulk insert
+        "workers": 4,  # concurrent embedding batches
+    },
+    "faiss": {
+        "index_type": "flat",  # flat | hnsw | ivfpq, see python/helpers/faiss_ann.py for tuning keys
+        "min_vectors": 50000,  # approximate search is only used above this size
+    },
+    "persistence": {
+        "flush_delay_seconds": 2,  # quiet time before a dirty FAISS index is written, 0 writes synchronously
+        "max_delay_seconds": 10,  # upper bound for continuously modified indexes
+    },
 }
 
 
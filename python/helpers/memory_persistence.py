@@ -0,0 +1,193 @@
+import asyncio
+import atexit
+import os
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable
+
+from python.helpers.print_style import PrintStyle
+
+
+class _Slot:
+    def __init__(self):
+        self.cond = threading.Condition()  # guards the dirty state below
+        self.store_lock = threading.Lock()  # held by mutations of the store and by snapshots
+        self.write_lock = threading.Lock()  # one flush of the slot at a time
+        self.dirty = False
+        self.first_dirty = 0.0
+        self.last_dirty = 0.0
+        self.delay = 0.0
+        self.max_delay = 0.0
+        self.folder = ""
+        self.snapshot: Callable[[], dict[str, bytes]] | None = None
+
+
+_slots: dict[str, _Slot] = {}
+_slots_lock = threading.Lock()
+_wake = threading.Condition()
+_thread: threading.Thread | None = None
+_stats = {"scheduled": 0, "flushes": 0, "errors": 0, "write_time": 0.0}
+
+
+def _get_slot(key: str) -> _Slot:
+    with _slots_lock:
+        slot = _slots.get(key)
+        if slot is None:
+            slot = _Slot()
+            _slots[key] = slot
+        return slot
+
+
+@contextmanager
+def writing(key: str):
+    """
+    Hold the store under key for a synchronous mutation, snapshots are never taken in the middle of one.
+    The body must not await, embeddings and other I/O belong before it.
+    """
+    slot = _get_slot(key)
+    with slot.store_lock:
+        yield
+
+
+@asynccontextmanager
+async def awriting(key: str):
+    """writing() for event loop code, waits for a running snapshot on a worker thread instead of blocking the loop"""
+    lock = _get_slot(key).store_lock
+    if not lock.acquire(blocking=False):
+        acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # the worker thread still gets the lock, hand it back as soon as it does
+            acquiring.add_done_callback(lambda _: lock.release())
+            raise
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def mark_dirty(
+    key: str,
+    folder: str,
+    snapshot: Callable[[], dict[str, bytes]],
+    delay: float,
+    max_delay: float,
+):
+    """Schedule a write of snapshot() into folder, after delay seconds of quiet or max_delay at most"""
+    slot = _get_slot(key)
+    now = time.monotonic()
+    with slot.cond:
+        if not slot.dirty:
+            slot.first_dirty = now
+        slot.dirty = True
+        slot.last_dirty = now
+        slot.delay = delay
+        slot.max_delay = max(delay, max_delay)
+        slot.folder = folder
+        slot.snapshot = snapshot
+    _stats["scheduled"] += 1
+    _start_flusher()
+    with _wake:
+        _wake.notify_all()
+
+
+def is_dirty(key: str) -> bool:
+    slot = _slots.get(key)
+    return bool(slot and slot.dirty)
+
+
+def flush(key: str) -> bool:
+    """Write pending changes of key now, returns True if anything was written. Blocks, call it off the event loop."""
+    slot = _slots.get(key)
+    if not slot:
+        return False
+    with slot.write_lock:
+        # mutations are short synchronous sections, waiting for the current one is enough
+        with slot.store_lock:
+            with slot.cond:
+                if not slot.dirty or not slot.snapshot:
+                    return False
+                slot.dirty = False
+                snapshot, folder = slot.snapshot, slot.folder
+            try:
+                data = snapshot()
+            except Exception as e:
+                _failed(slot, key, e)
+                return False
+
+        start = time.perf_counter()
+        try:
+            write_files(folder, data)
+        except Exception as e:
+            _failed(slot, key, e)
+            return False
+        _stats["flushes"] += 1
+        _stats["write_time"] += time.perf_counter() - start
+        return True
+
+
+def flush_all() -> int:
+    """Write all pending changes, used on shutdown, reload and before backups"""
+    return sum(1 for key in list(_slots) if flush(key))
+
+
+def get_stats() -> dict[str, float]:
+    return {**_stats, "dirty": sum(1 for s in _slots.values() if s.dirty)}
+
+
+def write_files(folder: str, data: dict[str, bytes]):
+    """Write files through temp files and atomic renames, readers never see a partial file"""
+    os.makedirs(folder, exist_ok=True)
+    for name, content in data.items():
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(folder, name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def _failed(slot: _Slot, key: str, e: Exception):
+    _stats["errors"] += 1
+    with slot.cond:
+        slot.dirty = True
+        slot.first_dirty = slot.last_dirty = time.monotonic()
+    PrintStyle.error(f"Failed to persist memory '{key}': {e}")
+
+
+def _due_time(slot: _Slot) -> float:
+    return min(slot.last_dirty + slot.delay, slot.first_dirty + slot.max_delay)
+
+
+def _flusher():
+    while True:
+        with _wake:
+            now = time.monotonic()
+            due = [key for key, slot in list(_slots.items()) if slot.dirty and _due_time(slot) <= now]
+            if not due:
+                pending = [_due_time(s) for s in list(_slots.values()) if s.dirty]
+                _wake.wait(min(pending) - now if pending else None)
+                continue
+        # failed writes are marked dirty again from now, so they retry after their delay
+        for key in due:
+            flush(key)
+
+
+def _start_flusher():
+    global _thread
+    with _slots_lock:
+        if _thread and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_flusher, name="memory-persistence", daemon=True)
+        _thread.start()
+
+
+atexit.register(flush_all)
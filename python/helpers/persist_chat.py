@@ -1,5 +1,7 @@
 from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
+import threading
 from typing import Any
 import uuid
 from agent import Agent, AgentConfig, AgentContext, AgentContextType
@@ -13,6 +15,38 @@ CHATS_FOLDER = "tmp/chats"
 LOG_SIZE = 1000
 CHAT_FILE_NAME = "chat.json"
 
+# journaled persistence - per-iteration saves append deltas, snapshot is rewritten on compaction
+JOURNAL_ENABLED = True
+JOURNAL_FILE_NAME = "chat.journal.jsonl"
+JOURNAL_COMPACT_ENTRIES = 100  # rewrite snapshot after this many journal entries
+JOURNAL_COMPACT_RATIO = 1.0  # or when the journal grows larger than the snapshot
+
+
+@dataclass
+class _AgentMark:
+    agent: Agent
+    history: history.History
+    topic: history.Topic
+    messages: int
+    version: int
+    data: dict[str, str]  # serialized value of each data key, unchanged keys are left out of deltas
+
+
+@dataclass
+class _JournalState:
+    seq: int = 0
+    entries: int = 0
+    journal_size: int = 0
+    snapshot_size: int = 0
+    log_guid: str = ""
+    log_mark: int = 0
+    agents: list[_AgentMark] = field(default_factory=list)
+    synced: bool = False  # False until a snapshot has been written by this process
+
+
+_journals: dict[str, _JournalState] = {}
+_journal_lock = threading.RLock()
+
 
 def get_chat_folder_path(ctxid: str):
     """
@@ -35,11 +69,12 @@ def save_tmp_chat(context: AgentContext):
     if context.type == AgentContextType.BACKGROUND:
         return
 
-    path = _get_chat_file_path(context.id)
-    files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    with _journal_lock:
+        state = _journals.setdefault(context.id, _JournalState())
+        if not JOURNAL_ENABLED or not state.synced or _should_compact(state):
+            _write_snapshot(context, state)
+        else:
+            _append_journal(context, state)
 
 
 def save_tmp_chats():
@@ -55,16 +90,17 @@ def load_tmp_chats():
     """Load all contexts from the chats folder"""
     _convert_v080_chats()
     folders = files.list_files(CHATS_FOLDER, "*")
-    json_files = []
-    for folder_name in folders:
-        json_files.append(_get_chat_file_path(folder_name))
-
     ctxids = []
-    for file in json_files:
+    for folder_name in folders:
+        file = _get_chat_file_path(folder_name)
         try:
             js = files.read_file(file)
             data = json.loads(js)
+            seq = _replay_journal(data, _get_journal_file_path(folder_name))
             ctx = _deserialize_context(data)
+            with _journal_lock:
+                # keep sequence numbers monotonic so stale entries are never replayed twice
+                _journals[ctx.id] = _JournalState(seq=seq)
             ctxids.append(ctx.id)
         except Exception as e:
             print(f"Error loading chat {file}: {e}")
@@ -75,6 +111,10 @@ def _get_chat_file_path(ctxid: str):
     return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_FILE_NAME)
 
 
+def _get_journal_file_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, JOURNAL_FILE_NAME)
+
+
 def _convert_v080_chats():
     json_files = files.list_files(CHATS_FOLDER, "*.json")
     for file in json_files:
@@ -105,6 +145,8 @@ def export_json_chat(context: AgentContext):
 
 def remove_chat(ctxid):
     """Remove a chat or task context"""
+    with _journal_lock:
+        _journals.pop(ctxid, None)
     path = get_chat_folder_path(ctxid)
     files.delete_dir(path)
 
@@ -115,15 +157,214 @@ def remove_msg_files(ctxid):
     files.delete_dir(path)
 
 
-def _serialize_context(context: AgentContext):
-    # serialize agents
-    agents = []
+def _write_snapshot(context: AgentContext, state: _JournalState):
+    data = _serialize_context(context)
+    data["journal_seq"] = state.seq
+    js = _safe_json_serialize(data, ensure_ascii=False)
+    files.write_file_atomic(_get_chat_file_path(context.id), js)
+
+    # entries up to state.seq are now part of the snapshot
+    journal = _get_journal_file_path(context.id)
+    if files.exists(journal):
+        files.delete_file(journal)
+
+    state.entries = 0
+    state.journal_size = 0
+    state.snapshot_size = len(js)
+    state.synced = True
+    _mark_journal_state(context, state)
+
+
+def _append_journal(context: AgentContext, state: _JournalState):
+    state.seq += 1
+    entry = _serialize_context_delta(context, state)
+    line = _safe_json_serialize(entry, ensure_ascii=False) + "\n"
+    files.append_file(_get_journal_file_path(context.id), line)
+
+    state.entries += 1
+    state.journal_size += len(line)
+    _mark_journal_state(context, state)
+
+
+def _should_compact(state: _JournalState) -> bool:
+    return (
+        state.entries >= JOURNAL_COMPACT_ENTRIES
+        or state.journal_size > state.snapshot_size * JOURNAL_COMPACT_RATIO
+    )
+
+
+def _mark_journal_state(context: AgentContext, state: _JournalState):
+    state.log_guid = context.log.guid
+    state.log_mark = context.log.version
+    state.agents = [
+        _AgentMark(
+            agent=agent,
+            history=agent.history,
+            topic=agent.history.current,
+            messages=len(agent.history.current.messages),
+            version=agent.history.version,
+            data={k: _safe_json_serialize(v) for k, v in _agent_data(agent).items()},
+        )
+        for agent in _iter_agents(context)
+    ]
+
+
+def _iter_agents(context: AgentContext):
     agent = context.agent0
     while agent:
-        agents.append(_serialize_agent(agent))
+        yield agent
         agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
 
 
+def _agent_data(agent: Agent) -> dict[str, Any]:
+    return {k: v for k, v in agent.data.items() if not k.startswith("_")}
+
+
+def _serialize_context_delta(context: AgentContext, state: _JournalState):
+    agents = []
+    for i, agent in enumerate(_iter_agents(context)):
+        hist = agent.history
+        mark = state.agents[i] if i < len(state.agents) else None
+        entry: dict[str, Any] = {"number": agent.number}
+        data = _agent_data(agent)
+        if mark and mark.agent is agent:
+            # same agent in this position, replay merges changed keys onto its previous data
+            entry["data_changed"] = {
+                k: v for k, v in data.items() if mark.data.get(k) != _safe_json_serialize(v)
+            }
+            removed = [k for k in mark.data if k not in data]
+            if removed:
+                entry["data_removed"] = removed
+        else:
+            entry["data"] = data
+        if (
+            mark
+            and mark.agent is agent
+            and mark.history is hist
+            and mark.topic is hist.current
+            and mark.version == hist.version
+            and len(hist.current.messages) >= mark.messages
+        ):
+            # only new messages in the current topic
+            entry["counter"] = hist.counter
+            entry["messages"] = [
+                m.to_dict() for m in hist.current.messages[mark.messages :]
+            ]
+        else:
+            # new agent, new topic or compressed history - store it whole
+            entry["history"] = hist.serialize()
+        agents.append(entry)
+
+    log = context.log
+    if log.guid != state.log_guid:
+        log_data = _serialize_log(log)
+        log_data["reset"] = True
+    else:
+        log_data = {
+            "guid": log.guid,
+            "items": [item.output() for item in log.changed_since(state.log_mark)],
+            "progress": log.progress,
+            "progress_no": log.progress_no,
+        }
+
+    return {
+        "seq": state.seq,
+        **_serialize_context_meta(context),
+        "agents": agents,
+        "log": log_data,
+    }
+
+
+def _replay_journal(data: dict[str, Any], path: str) -> int:
+    """Apply journal entries newer than the snapshot onto snapshot data, returns last sequence number"""
+    seq = data.get("journal_seq", 0)
+    if not files.exists(path):
+        return seq
+
+    histories: dict[int, dict[str, Any]] = {}  # parsed agent histories by position
+    for line in files.read_file(path).splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn write at the end of the journal
+        if entry.get("seq", 0) <= seq:
+            continue  # already included in snapshot
+        seq = entry["seq"]
+        _apply_journal_entry(data, entry, histories)
+
+    for i, hist in histories.items():
+        data["agents"][i]["history"] = history._json_dumps(hist)
+    return seq
+
+
+def _apply_journal_entry(
+    data: dict[str, Any], entry: dict[str, Any], histories: dict[int, dict[str, Any]]
+):
+    for key, value in entry.items():
+        if key not in ("seq", "id", "agents", "log"):
+            data[key] = value
+
+    prev_agents = data.get("agents", [])
+    agents = []
+    for i, ag in enumerate(entry.get("agents", [])):
+        if "history" in ag:
+            histories.pop(i, None)
+            hist_json = ag["history"]
+        else:
+            hist = histories.get(i)
+            if hist is None:
+                prev = prev_agents[i].get("history", "") if i < len(prev_agents) else ""
+                hist = json.loads(prev) if prev else _empty_history_dict()
+                histories[i] = hist
+            hist["counter"] = ag.get("counter", hist.get("counter", 0))
+            hist["current"]["messages"].extend(ag.get("messages", []))
+            hist_json = ""  # filled from parsed histories after replay
+        if "data" in ag:
+            agent_data = ag["data"]
+        else:
+            agent_data = dict(prev_agents[i].get("data", {})) if i < len(prev_agents) else {}
+            agent_data.update(ag.get("data_changed", {}))
+            for key in ag.get("data_removed", []):
+                agent_data.pop(key, None)
+        agents.append({"number": ag["number"], "data": agent_data, "history": hist_json})
+    for i in list(histories):
+        if i >= len(agents):
+            del histories[i]
+    data["agents"] = agents
+
+    log_delta = entry.get("log", {})
+    log = data.setdefault("log", {"guid": "", "logs": []})
+    if log_delta.get("reset") or log_delta.get("guid") != log.get("guid"):
+        log["guid"] = log_delta.get("guid", "")
+        log["logs"] = log_delta.get("logs", log_delta.get("items", []))
+    else:
+        items = {item["no"]: item for item in log.get("logs", [])}
+        for item in log_delta.get("items", []):
+            items[item["no"]] = item
+        log["logs"] = [items[no] for no in sorted(items)][-LOG_SIZE:]
+    log["progress"] = log_delta.get("progress", log.get("progress", ""))
+    log["progress_no"] = log_delta.get("progress_no", log.get("progress_no", 0))
+
+
+def _empty_history_dict() -> dict[str, Any]:
+    return {
+        "_cls": "History",
+        "counter": 0,
+        "bulks": [],
+        "topics": [],
+        "current": {"_cls": "Topic", "summary": "", "messages": []},
+    }
+
+
+def _serialize_context(context: AgentContext):
+    return {
+        **_serialize_context_meta(context),
+        "agents": [_serialize_agent(agent) for agent in _iter_agents(context)],
+        "log": _serialize_log(context.log),
+    }
+
+
+def _serialize_context_meta(context: AgentContext):
     data = {k: v for k, v in context.data.items() if not k.startswith("_")}
     output_data = {k: v for k, v in context.output_data.items() if not k.startswith("_")}
 
@@ -141,18 +382,16 @@ def _serialize_context(context: AgentContext):
             if context.last_message
             else datetime.fromtimestamp(0).isoformat()
         ),
-        "agents": agents,
         "streaming_agent": (
             context.streaming_agent.number if context.streaming_agent else 0
         ),
-        "log": _serialize_log(context.log),
         "data": data,
         "output_data": output_data,
     }
 
 
 def _serialize_agent(agent: Agent):
-    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
+    data = _agent_data(agent)
 
     history = agent.history.serialize()
 
@@ -273,7 +512,7 @@ def _deserialize_log(data: dict[str, Any]) -> "Log":
                 temp=item_data.get("temp", False),
             )
         )
-        log.updates.append(i)
+        log.mark_updated(i)
         i += 1
 
     return log
@@ -1,10 +1,12 @@
 import asyncio
 import uuid
-from typing import Any, List, Sequence
+from typing import Any, Dict, List, Sequence
 from simpleeval import simple_eval
 
 from langchain_core.documents import Document
 
+from python.helpers import bm25_sparse
+
 
 try:
     from qdrant_client import AsyncQdrantClient
@@ -13,6 +15,89 @@ except Exception:  # pragma: no cover - keep import-safe when qdrant is missing
     AsyncQdrantClient = None  # type: ignore
     qmodels = None  # type: ignore
 
+SPARSE_VECTOR = "sparse"
+HYBRID_PREFETCH = 2  # candidates fetched per retriever, as a multiple of the limit
+
+
+def to_sparse_vector(vector: Dict[int, float]):
+    return qmodels.SparseVector(indices=list(vector.keys()), values=list(vector.values()))
+
+
+async def hybrid_query(
+    client,
+    collection_name: str,
+    dense: List[float],
+    sparse: Dict[int, float],
+    limit: int,
+    query_filter=None,
+    score_threshold: float | None = None,
+    dense_using: str | None = None,
+    sparse_using: str = SPARSE_VECTOR,
+):
+    """
+    Dense and BM25 sparse search fused server-side with reciprocal rank fusion.
+    Results keep the fused order but carry their dense cosine similarity as score,
+    like a dense-only search, since fused scores are rank based. score_threshold
+    is checked against that similarity, keyword-only hits below it are dropped.
+    """
+    if not sparse:
+        res = await client.query_points(
+            collection_name=collection_name,
+            query=dense,
+            using=dense_using,
+            query_filter=query_filter,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_vectors=False,
+        )
+        return res.points
+
+    prefetch_limit = limit * HYBRID_PREFETCH
+    res = await client.query_points(
+        collection_name=collection_name,
+        prefetch=[
+            qmodels.Prefetch(
+                query=dense,
+                using=dense_using,
+                filter=query_filter,
+                limit=prefetch_limit,
+                score_threshold=score_threshold,
+            ),
+            qmodels.Prefetch(
+                query=to_sparse_vector(sparse),
+                using=sparse_using,
+                filter=query_filter,
+                limit=prefetch_limit,
+            ),
+        ],
+        query=qmodels.FusionQuery(fusion=qmodels.Fusion.RRF),
+        # with a threshold some fused points are dropped below, fetch spare ones
+        limit=limit if score_threshold is None else prefetch_limit,
+        with_vectors=False,
+    )
+    points = res.points
+    if not points:
+        return points
+
+    # re-score the fused points by dense similarity only, keep the fused order
+    dense_res = await client.query_points(
+        collection_name=collection_name,
+        query=dense,
+        using=dense_using,
+        query_filter=qmodels.Filter(must=[qmodels.HasIdCondition(has_id=[p.id for p in points])]),
+        limit=len(points),
+        score_threshold=score_threshold,
+        with_payload=False,
+        with_vectors=False,
+    )
+    similarity = {p.id: p.score for p in dense_res.points}
+    result = []
+    for point in points:
+        if point.id in similarity:
+            point.score = similarity[point.id]
+            result.append(point)
+    return result[:limit]
+
 
 class QdrantStore:
     """
@@ -32,6 +117,7 @@ class QdrantStore:
         limit: int = 20,
         timeout: int = 10,
         searchable_payload_keys: list[str] | None = None,
+        sparse_stats_path: str | None = None,
     ):
         if AsyncQdrantClient is None:
             raise RuntimeError(
@@ -46,6 +132,11 @@ class QdrantStore:
         self.limit = limit
         self.searchable_payload_keys = searchable_payload_keys or []
         self._collection_ready = False
+        # BM25 document frequencies of the collection, hybrid search needs them persisted
+        self.sparse_encoder = (
+            bm25_sparse.get_encoder(sparse_stats_path) if prefer_hybrid and sparse_stats_path else None
+        )
+        self._hybrid = False
 
     def _to_uuid(self, id_str: str) -> str:
         """Convert any string ID to a deterministic UUID."""
@@ -61,16 +152,24 @@ class QdrantStore:
         if self._collection_ready:
             return
 
-        dim = len(await asyncio.to_thread(self.embedder.embed_query, "example"))
+        dim = len(await self.embedder.aembed_query("example"))
         try:
-            await self.client.get_collection(self.collection)
+            info = await self.client.get_collection(self.collection)
+            # collections created before hybrid search have no sparse vectors, they stay dense only
+            self._hybrid = bool(
+                self.sparse_encoder and SPARSE_VECTOR in (info.config.params.sparse_vectors or {})
+            )
         except Exception:
             await self.client.create_collection(
                 collection_name=self.collection,
                 vectors_config=qmodels.VectorParams(
                     size=dim, distance=qmodels.Distance.COSINE
                 ),
+                sparse_vectors_config=(
+                    {SPARSE_VECTOR: qmodels.SparseVectorParams()} if self.sparse_encoder else None
+                ),
             )
+            self._hybrid = self.sparse_encoder is not None
         
         # Create payload indexes for searchable keys
         for key in self.searchable_payload_keys:
@@ -87,12 +186,14 @@ class QdrantStore:
 
     async def aadd_documents(self, documents: list[Document], ids: Sequence[str]):
         await self._ensure_collection()
-        vectors = await asyncio.to_thread(
-            self.embedder.embed_documents, [d.page_content for d in documents]
+        vectors = await self.embedder.aembed_documents([d.page_content for d in documents])
+        sparse = (
+            self.sparse_encoder.encode_documents([d.page_content for d in documents])
+            if self._hybrid else [None] * len(documents)
         )
 
         points = []
-        for doc, vec, pid in zip(documents, vectors, ids):
+        for doc, vec, sparse_vec, pid in zip(documents, vectors, sparse, ids):
             payload = dict(doc.metadata or {})
             payload["text"] = doc.page_content
             # Store original ID in payload for reference
@@ -104,7 +205,7 @@ class QdrantStore:
             points.append(
                 qmodels.PointStruct(
                     id=point_id,
-                    vector=vec,
+                    vector={"": vec, SPARSE_VECTOR: to_sparse_vector(sparse_vec)} if sparse_vec is not None else vec,
                     payload=payload,
                 )
             )
@@ -151,9 +252,10 @@ class QdrantStore:
         k: int = 10,
         score_threshold: float | None = None,
         filter=None,
+        hybrid: bool = True,
     ):
         await self._ensure_collection()
-        qvec = await asyncio.to_thread(self.embedder.embed_query, query)
+        qvec = await self.embedder.aembed_query(query)
         
         q_filter = None
         if isinstance(filter, str):
@@ -164,15 +266,26 @@ class QdrantStore:
         if filter and not q_filter:
             limit = k * 10
 
-        res = await self.client.search(
-            collection_name=self.collection,
-            query_vector=qvec,
-            limit=limit,
-            score_threshold=score_threshold,
-            with_vectors=False,
-            query_filter=q_filter,
-            # query_filter=None,  # placeholder until we add filter parsing
-        )
+        if self._hybrid and hybrid:
+            res = await hybrid_query(
+                self.client,
+                self.collection,
+                qvec,
+                self.sparse_encoder.encode_query(query),
+                limit,
+                query_filter=q_filter,
+                score_threshold=score_threshold,
+            )
+        else:
+            res = await self.client.search(
+                collection_name=self.collection,
+                query_vector=qvec,
+                limit=limit,
+                score_threshold=score_threshold,
+                with_vectors=False,
+                query_filter=q_filter,
+                # query_filter=None,  # placeholder until we add filter parsing
+            )
         docs: List[Document] = []
         for point in res:
             payload = dict(point.payload or {})
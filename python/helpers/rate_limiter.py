@@ -1,57 +1,236 @@
+"""
+Sliding-window rate limiting shared by all agents calling the same model.
+
+Usage is kept per key (requests, input, output) as a queue of time slots with a
+running total, so adding, expiring and reading a total are O(1) amortized.
+Callers that must wait are served in FIFO order. Whoever wakes first admits
+waiters from the front of the queue while their usage fits, so admission never
+depends on another waiter's event loop running: limiters are module-level and
+waited on from several threads and loops, some of which may be blocked in
+synchronous code. The head of the queue sleeps until the exact moment enough
+usage leaves the window, the others sleep a little longer and are normally
+admitted by the head before their own timers fire.
+"""
+
 import asyncio
+import bisect
+import threading
 import time
-from typing import Callable, Awaitable
+from collections import deque
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+RESOLUTION = 0.1  # seconds, usage added within one slot is merged into a single entry
+CALLBACK_INTERVAL = 1.0  # seconds between callback notifications while waiting
+FOLLOWER_GRACE = RESOLUTION  # extra sleep of waiters behind the head, which admits them when it can
+WAIT_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120)  # upper bounds of the wait time histogram
+
+Callback = Callable[[str, str, int, int], Awaitable[bool]]
+
+
+class _Window:
+    """Usage of one key, time slots in arrival order with their running sum."""
+
+    def __init__(self):
+        self.slots: Deque[List[float]] = deque()  # [slot start, value]
+        self.total = 0
+
+    def add(self, now: float, value: int):
+        if self.slots and now - self.slots[-1][0] < RESOLUTION:
+            self.slots[-1][1] += value
+        else:
+            self.slots.append([now, value])
+        self.total += value
+
+    def expire(self, cutoff: float):
+        slots = self.slots
+        while slots and slots[0][0] <= cutoff:
+            self.total -= slots.popleft()[1]
+
+    def free_at(self, needed: int, timeframe: float) -> float:
+        """Time when at least `needed` of the usage will have left the window."""
+        freed = 0
+        for start, value in self.slots:
+            freed += value
+            if freed >= needed:
+                return start + timeframe
+        return self.slots[-1][0] + timeframe if self.slots else 0.0
+
+
+class _KeyMetrics:
+    def __init__(self):
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.histogram = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record(self, seconds: float):
+        self.waits += 1
+        self.wait_seconds += seconds
+        self.histogram[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+
+class _Waiter:
+    def __init__(self, amounts: Dict[str, int]):
+        self.amounts = amounts
+        self.admitted: Future = Future()  # completed by whichever thread admits it
+        self.blocked_keys: set[str] = set()
 
 
 class RateLimiter:
     def __init__(self, seconds: int = 60, **limits: int):
         self.timeframe = seconds
         self.limits = {key: value if isinstance(value, (int, float)) else 0 for key, value in (limits or {}).items()}
-        self.values = {key: [] for key in self.limits.keys()}
-        self._lock = asyncio.Lock()
+        self.values: Dict[str, _Window] = {key: _Window() for key in self.limits.keys()}
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._block: Optional[Tuple[str, int, int, float]] = None  # what holds up the head of the queue
+        self._metrics: Dict[str, _KeyMetrics] = {}
+        self.admitted = 0
 
     def add(self, **kwargs: int):
-        now = time.time()
-        for key, value in kwargs.items():
-            if not key in self.values:
-                self.values[key] = []
-            self.values[key].append((now, value))
+        now = time.monotonic()
+        with self._lock:
+            self._add(now, kwargs)
+
+    def _add(self, now: float, amounts: Dict[str, int]):
+        for key, value in amounts.items():
+            window = self.values.get(key)
+            if window is None:
+                window = self.values[key] = _Window()
+            window.add(now, value)
+
+    def _expire(self, now: float):
+        cutoff = now - self.timeframe
+        for window in self.values.values():
+            window.expire(cutoff)
 
     async def cleanup(self):
-        async with self._lock:
-            now = time.time()
-            cutoff = now - self.timeframe
-            for key in self.values:
-                self.values[key] = [(t, v) for t, v in self.values[key] if t > cutoff]
+        with self._lock:
+            self._expire(time.monotonic())
 
     async def get_total(self, key: str) -> int:
-        async with self._lock:
-            if not key in self.values:
-                return 0
-            return sum(value for _, value in self.values[key])
-
-    async def wait(
-        self,
-        callback: Callable[[str, str, int, int], Awaitable[bool]] | None = None,
-    ):
-        while True:
-            await self.cleanup()
-            should_wait = False
-
-            for key, limit in self.limits.items():
-                if limit <= 0:  # Skip if no limit set
-                    continue
+        with self._lock:
+            self._expire(time.monotonic())
+            window = self.values.get(key)
+            return window.total if window else 0
+
+    def _blocked(self, now: float, amounts: Dict[str, int]) -> Optional[Tuple[str, int, int, float]]:
+        """First key over its limit with (total, limit, wake-up time), or None when the amounts fit."""
+        self._expire(now)
+        for key, limit in self.limits.items():
+            if limit <= 0:  # Skip if no limit set
+                continue
+            window = self.values.get(key)
+            if not window or not window.slots:
+                continue  # an empty window admits anything, even a single request above the limit
+            total = window.total
+            if total + amounts.get(key, 0) > limit:
+                needed = total + amounts.get(key, 0) - limit
+                return key, total, limit, window.free_at(needed, self.timeframe)
+        return None
 
-                total = await self.get_total(key)
-                if total > limit:
-                    if callback:
+    def _dispatch(self, now: float) -> Optional[Tuple[str, int, int, float]]:
+        """Admit waiters from the front of the queue while they fit, returns what blocks the head."""
+        while self._waiters:
+            waiter = self._waiters[0]
+            blocked = self._blocked(now, waiter.amounts)
+            if blocked:
+                waiter.blocked_keys.add(blocked[0])
+                self._block = blocked
+                return blocked
+            self._add(now, waiter.amounts)
+            self._waiters.popleft()
+            waiter.admitted.set_result(None)
+        self._block = None
+        return None
+
+    async def acquire(self, callback: Callback | None = None, **amounts: int):
+        """Wait in FIFO order until the amounts fit under the limits, then count them.
+
+        The callback is notified while waiting and can return True to stop waiting.
+        """
+        waiter = _Waiter(amounts)
+        started = time.monotonic()
+        with self._lock:
+            self._waiters.append(waiter)
+            self._dispatch(started)
+        admitted = asyncio.wrap_future(waiter.admitted)
+        notified = 0.0
+        try:
+            while not waiter.admitted.done():
+                now = time.monotonic()
+                with self._lock:
+                    blocked = self._block or self._dispatch(now)
+                    is_head = bool(self._waiters) and self._waiters[0] is waiter
+                if not blocked:
+                    continue
+                key, total, limit, wake_at = blocked
+                waiter.blocked_keys.add(key)
+                delay = max(wake_at - now, 0.0) + (0.0 if is_head else FOLLOWER_GRACE)
+                if callback:
+                    if now - notified >= CALLBACK_INTERVAL:
+                        notified = now
                         msg = f"Rate limit exceeded for {key} ({total}/{limit}), waiting..."
-                        should_wait = not await callback(msg, key, total, limit)
-                    else:
-                        should_wait = True
-                    break
+                        if await callback(msg, key, total, limit):
+                            self._admit_now(waiter)
+                            break
+                    delay = min(delay, max(notified + CALLBACK_INTERVAL - time.monotonic(), 0.0))
+                try:
+                    await asyncio.wait_for(asyncio.shield(admitted), timeout=delay)
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self._dispatch(time.monotonic())
+        finally:
+            self._leave(waiter)
+        waited = time.monotonic() - started
+        with self._lock:
+            self.admitted += 1
+            for key in waiter.blocked_keys:
+                self._metrics.setdefault(key, _KeyMetrics()).record(waited)
+
+    def _admit_now(self, waiter: _Waiter):
+        # the callback chose not to wait, count the usage out of turn
+        with self._lock:
+            if waiter.admitted.done():
+                return
+            self._waiters.remove(waiter)
+            self._add(time.monotonic(), waiter.amounts)
+            waiter.admitted.set_result(None)
+            self._dispatch(time.monotonic())
+
+    def _leave(self, waiter: _Waiter):
+        # cancelled or failed while queued, the waiters behind may fit now
+        with self._lock:
+            if waiter.admitted.done():
+                return
+            waiter.admitted.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._dispatch(time.monotonic())
+
+    async def wait(self, callback: Callback | None = None):
+        """Wait until usage already added is back under the limits."""
+        await self.acquire(callback)
 
-            if not should_wait:
-                break
+    def metrics(self) -> dict:
+        """Current usage per key and how long callers had to wait for it."""
+        with self._lock:
+            self._expire(time.monotonic())
+            keys = {}
+            for key in set(self.limits) | set(self.values) | set(self._metrics):
+                window = self.values.get(key)
+                stats = self._metrics.get(key) or _KeyMetrics()
+                keys[key] = {
+                    "usage": window.total if window else 0,
+                    "limit": self.limits.get(key, 0),
+                    "waits": stats.waits,
+                    "wait_seconds": stats.wait_seconds,
+                    "wait_histogram": {
+                        **{f"<={bound}s": count for bound, count in zip(WAIT_BUCKETS, stats.histogram)},
+                        f">{WAIT_BUCKETS[-1]}s": stats.histogram[-1],
+                    },
+                }
+            return {"keys": keys, "admitted": self.admitted, "waiting": len(self._waiters)}
 
-            await asyncio.sleep(1)
@@ -35,6 +35,127 @@ class EnvLine:
     )
 
 
+class SecretsMatcher:
+    """Compiled multi-pattern matcher of secret values, built once per secrets version.
+
+    Values are stored in a trie that is compiled two ways:
+    - a regex whose nested alternation mirrors the trie, used to replace values in bulk
+      (leftmost-longest, scanned by the C regex engine in one pass)
+    - an Aho-Corasick automaton (goto and failure links), used by streaming filters to
+      carry the longest secret prefix seen across chunks without rescanning them
+    Long texts are searched per value with str.find instead, which beats the regex scan when
+    many values start with common characters, and resolved to the same leftmost-longest matches.
+    """
+
+    LONG_TEXT = 65536
+
+    def __init__(self, key_to_value: Dict[str, str], min_length: int = 1):
+        # Map value -> key for placeholder construction, the first key wins for shared values
+        self.value_to_key: Dict[str, str] = {}
+        for key, value in key_to_value.items():
+            if isinstance(value, str) and value and len(value.strip()) >= min_length:
+                self.value_to_key.setdefault(value, key)
+
+        # Trie as goto table, node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[bool] = [False]
+        self.depth: List[int] = [0]
+        for value in self.value_to_key:
+            node = 0
+            for ch in value:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._terminal.append(False)
+                    self.depth.append(self.depth[node] + 1)
+                node = nxt
+            self._terminal[node] = True
+
+        # Failure links: longest proper suffix of a node that is also a node, breadth first
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                queue.append(child)
+
+        self.regex: Optional[re.Pattern] = (
+            re.compile(self._trie_pattern(0)) if self.value_to_key else None
+        )
+
+    def _trie_pattern(self, node: int) -> str:
+        # single-child chains become literals, so nesting only grows with branching
+        literal = ""
+        while len(self._goto[node]) == 1 and not self._terminal[node]:
+            ch, node = next(iter(self._goto[node].items()))
+            literal += ch
+        if literal:
+            return re.escape(literal) + self._trie_pattern(node)
+        branches = [re.escape(ch) + self._trie_pattern(child) for ch, child in sorted(self._goto[node].items())]
+        if not branches:
+            return ""
+        group = "(?:" + "|".join(branches) + ")" if len(branches) > 1 else branches[0]
+        # greedy optional continuation prefers the longest value
+        return f"(?:{group})?" if self._terminal[node] else group
+
+    def sub(self, text: str, placeholder: str = "§§secret({key})") -> Tuple[str, int]:
+        """Replace values with placeholders, returns the text and the end of the last match in the input."""
+        if not self.regex or not text:
+            return text, 0
+        parts: List[str] = []
+        pos = 0
+        for start, value in self._matches(text):
+            parts.append(text[pos:start])
+            parts.append(alias_for_key(self.value_to_key[value], placeholder))
+            pos = start + len(value)
+        if not pos:
+            return text, 0
+        parts.append(text[pos:])
+        return "".join(parts), pos
+
+    def _matches(self, text: str):
+        # (start, value) of leftmost-longest non-overlapping matches
+        if len(text) <= self.LONG_TEXT:
+            for match in self.regex.finditer(text):  # type: ignore
+                yield match.start(), match.group()
+            return
+        found: List[Tuple[int, int, str]] = []
+        for value in self.value_to_key:
+            start = text.find(value)
+            while start != -1:
+                found.append((start, -len(value), value))
+                start = text.find(value, start + 1)
+        found.sort()
+        end = 0
+        for start, _, value in found:
+            if start >= end:
+                yield start, value
+                end = start + len(value)
+
+    def mask(self, text: str, placeholder: str = "§§secret({key})") -> str:
+        return self.sub(text, placeholder)[0]
+
+    def advance(self, state: int, text: str) -> int:
+        """Feed text to the automaton, the new state is the longest suffix that is a secret prefix."""
+        goto, fail = self._goto, self._fail
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+        return state
+
+    def shorten(self, state: int, max_depth: int) -> int:
+        """Longest suffix state of at most max_depth characters."""
+        while self.depth[state] > max_depth:
+            state = self._fail[state]
+        return state
+
+
 class StreamingSecretsFilter:
     """Stateful streaming filter that masks secrets on the fly.
 
@@ -44,63 +165,46 @@ class StreamingSecretsFilter:
     - On finalize(), any unresolved partial is masked with '***'.
     """
 
-    def __init__(self, key_to_value: Dict[str, str], min_trigger: int = 3):
+    def __init__(
+        self,
+        key_to_value: Dict[str, str],
+        min_trigger: int = 3,
+        matcher: Optional[SecretsMatcher] = None,
+    ):
         self.min_trigger = max(1, int(min_trigger))
-        # Map value -> key for placeholder construction
-        self.value_to_key: Dict[str, str] = {
-            v: k for k, v in key_to_value.items() if isinstance(v, str) and v
-        }
-        # Only keep non-empty values
-        self.secret_values: List[str] = [v for v in self.value_to_key.keys() if v]
-        # Precompute all prefixes for quick suffix matching
-        self.prefixes: Set[str] = set()
-        for v in self.secret_values:
-            for i in range(self.min_trigger, len(v) + 1):
-                self.prefixes.add(v[:i])
-        self.max_len: int = max((len(v) for v in self.secret_values), default=0)
+        self.matcher = matcher or SecretsMatcher(key_to_value, min_length=0)
+        # Automaton state, its depth is the length of the secret prefix ending the stream
+        self.state = 0
 
         # Internal buffer of pending text that is not safe to flush yet
         self.pending: str = ""
 
-    def _replace_full_values(self, text: str) -> str:
-        """Replace all full secret values with placeholders in the given text."""
-        # Sort by length desc to avoid partial overlaps
-        for val in sorted(self.secret_values, key=len, reverse=True):
-            if not val:
-                continue
-            key = self.value_to_key.get(val, "")
-            if key:
-                text = text.replace(val, alias_for_key(key))
-        return text
-
-    def _longest_suffix_prefix(self, text: str) -> int:
-        """Return length of longest suffix of text that is a known secret prefix.
-        Returns 0 if none found (or only shorter than min_trigger)."""
-        max_check = min(len(text), self.max_len)
-        for length in range(max_check, self.min_trigger - 1, -1):
-            suffix = text[-length:]
-            if suffix in self.prefixes:
-                return length
-        return 0
-
     def process_chunk(self, chunk: str) -> str:
         if not chunk:
             return ""
 
-        self.pending += chunk
+        buffer = self.pending + chunk
 
         # Replace any full secret occurrences first
-        self.pending = self._replace_full_values(self.pending)
+        text, last_end = self.matcher.sub(buffer)
+
+        # Continue the automaton from the previous chunk, or restart after the last replaced value
+        if last_end:
+            state = self.matcher.advance(0, buffer[last_end:])
+        else:
+            state = self.matcher.advance(self.state, chunk)
+        # Only text still in the buffer can be held back
+        self.state = self.matcher.shorten(state, len(buffer) - last_end)
 
         # Determine the longest suffix that could still form a secret
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
+        hold_len = self.matcher.depth[self.state]
+        if hold_len >= self.min_trigger:
             # Flush everything except the hold suffix
-            emit = self.pending[:-hold_len]
-            self.pending = self.pending[-hold_len:]
+            emit = text[:-hold_len]
+            self.pending = text[-hold_len:]
         else:
             # Safe to flush everything
-            emit = self.pending
+            emit = text
             self.pending = ""
 
         return emit
@@ -108,17 +212,10 @@ class StreamingSecretsFilter:
     def finalize(self) -> str:
         """Flush any remaining buffered text. If pending contains an unresolved partial
         (i.e., a prefix of a secret >= min_trigger), mask it with *** to avoid leaks."""
-        if not self.pending:
-            return ""
-
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
-            safe = self.pending[:-hold_len]
-            # Mask unresolved partial
-            result = safe + "***"
-        else:
-            result = self.pending
+        # pending only ever holds an unresolved partial
+        result = "***" if self.pending else ""
         self.pending = ""
+        self.state = 0
         return result
 
 
@@ -146,6 +243,8 @@ class SecretsManager:
         self._raw_snapshots: Dict[str, str] = {}
         self._secrets_cache = None
         self._last_raw_text = None
+        # compiled matchers of the cached secrets by minimum value length
+        self._matchers: Dict[int, SecretsMatcher] = {}
 
     def read_secrets_raw(self) -> str:
         """Read raw secrets file content from local filesystem (same system)."""
@@ -256,7 +355,16 @@ class SecretsManager:
 
     def create_streaming_filter(self) -> "StreamingSecretsFilter":
         """Create a streaming-aware secrets filter snapshotting current secret values."""
-        return StreamingSecretsFilter(self.load_secrets())
+        return StreamingSecretsFilter(self.load_secrets(), matcher=self.get_matcher(0))
+
+    def get_matcher(self, min_length: int = 4) -> SecretsMatcher:
+        """Compiled matcher of secret values at least min_length long, rebuilt when secrets change."""
+        with self._lock:
+            matcher = self._matchers.get(min_length)
+            if matcher is None:
+                matcher = SecretsMatcher(self.load_secrets(), min_length)
+                self._matchers[min_length] = matcher
+            return matcher
 
     def replace_placeholders(self, text: str) -> str:
         """Replace secret placeholders with actual values"""
@@ -302,17 +410,8 @@ class SecretsManager:
         if not text:
             return text
 
-        secrets = self.load_secrets()
-        result = text
-
-        # Sort by length (longest first) to avoid partial replacements
-        for key, value in sorted(
-            secrets.items(), key=lambda x: len(x[1]), reverse=True
-        ):
-            if value and len(value.strip()) >= min_length:
-                result = result.replace(value, alias_for_key(key, placeholder))
-
-        return result
+        # Longest value wins where values overlap
+        return self.get_matcher(min_length).mask(text, placeholder)
 
     def get_masked_secrets(self) -> str:
         """Get content with values masked for frontend display (preserves comments and unrecognized lines)"""
@@ -351,6 +450,7 @@ class SecretsManager:
             self._secrets_cache = None
             self._raw_snapshots = {}
             self._last_raw_text = None
+            self._matchers = {}
 
     @classmethod
     def _invalidate_all_caches(cls):
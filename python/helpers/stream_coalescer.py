@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+class StreamCoalescer:
+    """
+    Buffers streamed model chunks and passes them to the handler in batches.
+    A batch is flushed when the time window elapses or the buffered text exceeds max_chars.
+    Chunks waiting for the window are flushed by a timer, even if no further chunk arrives.
+    The first chunk is always passed through immediately so the stream start is not delayed.
+    Batches are passed in order, errors raised by the handler from the timer surface on the next add or flush.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str], Awaitable[None]],
+        window_ms: int = 0,
+        max_chars: int = 0,
+    ):
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_chars = max_chars
+        self.pending: list[str] = []
+        self.pending_chars = 0
+        self.full = ""
+        self.last_flush = 0.0
+        self.started = False
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._error: Exception | None = None
+
+    async def add(self, chunk: str, full: str):
+        self._raise_error()
+        self.pending.append(chunk)
+        self.pending_chars += len(chunk)
+        self.full = full
+
+        if (
+            not self.started
+            or self.window <= 0
+            or (self.max_chars and self.pending_chars >= self.max_chars)
+            or time.monotonic() - self.last_flush >= self.window
+        ):
+            await self.flush()
+        elif not self._timer:
+            delay = self.last_flush + self.window - time.monotonic()
+            self._timer = asyncio.create_task(self._flush_later(delay))
+
+    async def flush(self):
+        self.cancel()
+        await self._flush()
+        self._raise_error()
+
+    def cancel(self):
+        """Stop a pending timer flush, buffered chunks stay for the next flush."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            chunk = "".join(self.pending)
+            self.pending.clear()
+            self.pending_chars = 0
+            self.started = True
+            self.last_flush = time.monotonic()
+            await self.handler(chunk, self.full)
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        # from here on the flush is not cancelled, a concurrent flush waits for it
+        self._timer = None
+        try:
+            await self._flush()
+        except Exception as e:
+            self._error = e
+
+    def _raise_error(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise error
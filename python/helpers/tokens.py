@@ -1,8 +1,17 @@
+import math
+from functools import lru_cache
 from typing import Literal
 import tiktoken
 
 APPROX_BUFFER = 1.1
 TRIM_BUFFER = 0.8
+CHARS_PER_TOKEN = 4  # typical for English text and code with cl100k_base
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name="cl100k_base") -> tiktoken.Encoding:
+    # encodings are immutable and thread-safe, load each one once per process
+    return tiktoken.get_encoding(encoding_name)
 
 
 def count_tokens(text: str, encoding_name="cl100k_base") -> int:
@@ -10,7 +19,7 @@ def count_tokens(text: str, encoding_name="cl100k_base") -> int:
         return 0
 
     # Get the encoding
-    encoding = tiktoken.get_encoding(encoding_name)
+    encoding = get_encoding(encoding_name)
 
     # Encode the text and count the tokens
     tokens = encoding.encode(text, disallowed_special=())
@@ -25,6 +34,12 @@ def approximate_tokens(
     return int(count_tokens(text) * APPROX_BUFFER)
 
 
+def estimate_tokens(text: str | list[str]) -> int:
+    # length based estimate for accounting, no tokenizer pass
+    chars = len(text) if isinstance(text, str) else sum(len(t) for t in text)
+    return math.ceil(chars / CHARS_PER_TOKEN * APPROX_BUFFER)  # short stream deltas still count
+
+
 def trim_to_tokens(
     text: str,
     max_tokens: int,
@@ -0,0 +1,117 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from python.helpers import extract_tools, files
+
+if TYPE_CHECKING:
+    from python.helpers.tool import Tool
+
+DEFAULT_TOOLS_FOLDER = "python/tools"
+
+
+@dataclass
+class _ToolEntry:
+    mtime: int
+    cls: "type[Tool] | None"
+
+
+@dataclass
+class _FolderIndex:
+    mtime: int
+    tools: dict[str, str] = field(default_factory=dict)  # tool name -> file path
+
+
+_folders: dict[str, _FolderIndex] = {}
+_entries: dict[str, _ToolEntry] = {}
+_stats = {"lookups": 0, "hits": 0, "loads": 0, "reloads": 0, "not_found": 0, "errors": 0}
+_lock = threading.RLock()
+
+
+def get_tool_folders(profile: str = "") -> list[str]:
+    folders = [files.get_abs_path(DEFAULT_TOOLS_FOLDER)]
+    if profile:
+        # agent tools first, defaults as backup
+        folders.insert(0, files.get_abs_path("agents", profile, "tools"))
+    return folders
+
+
+def get_tool_class(name: str, profile: str = "") -> "type[Tool] | None":
+    """Resolve tool class by name, profile tools overwrite defaults. Files are only re-imported when their mtime changes."""
+    with _lock:
+        _stats["lookups"] += 1
+        for folder in get_tool_folders(profile):
+            path = _get_folder_index(folder).tools.get(name)
+            if path:
+                cls = _get_class(path)
+                if cls:
+                    return cls
+        _stats["not_found"] += 1
+        return None
+
+
+def index_tools(profile: str = "") -> int:
+    """Import all tools of default and profile folders ahead of first use, returns number of resolved classes"""
+    with _lock:
+        count = 0
+        for folder in get_tool_folders(profile):
+            for path in _get_folder_index(folder).tools.values():
+                if _get_class(path):
+                    count += 1
+        return count
+
+
+def get_stats() -> dict[str, int]:
+    with _lock:
+        return {**_stats, "cached": len(_entries)}
+
+
+def clear_cache():
+    with _lock:
+        _folders.clear()
+        _entries.clear()
+
+
+def _get_mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _get_folder_index(folder: str) -> _FolderIndex:
+    # folder mtime changes when tool files are added, removed or renamed
+    mtime = _get_mtime(folder) or 0
+    index = _folders.get(folder)
+    if index and index.mtime == mtime:
+        return index
+
+    index = _FolderIndex(mtime=mtime)
+    if mtime:
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.endswith(".py"):
+                index.tools[file_name[:-3]] = os.path.join(folder, file_name)
+    _folders[folder] = index
+    return index
+
+
+def _get_class(path: str) -> "type[Tool] | None":
+    from python.helpers.tool import Tool
+
+    mtime = _get_mtime(path)
+    entry = _entries.get(path)
+    if entry and entry.mtime == mtime:
+        _stats["hits"] += 1
+        return entry.cls
+
+    _stats["reloads" if entry else "loads"] += 1
+    try:
+        classes = extract_tools.load_classes_from_file(path, Tool)  # type: ignore[arg-type]
+        cls = classes[0] if classes else None
+    except Exception:
+        _stats["errors"] += 1
+        cls = None
+    # failed imports are cached too, a fixed file gets a new mtime
+    _entries[path] = _ToolEntry(mtime=mtime or 0, cls=cls)
+    return cls
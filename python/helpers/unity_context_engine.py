@@ -11,9 +11,10 @@ This module provides advanced context-aware retrieval with:
 
 import asyncio
 import re
+import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 import json
 import logging
@@ -23,12 +24,17 @@ from langchain_core.documents import Document
 from python.helpers.unity_qdrant_enhanced import (
     UnityQdrantEnhanced, UnityCollectionType, UnitySearchResult, UnityQueryContext
 )
+from python.helpers.unity_memory_cache import LRUCache, collection_tag, project_tag
 from python.unity_memory.unity_schema import (
     EntityType, RelationshipType, UnityQueryBuilder
 )
 
 logger = logging.getLogger(__name__)
 
+CACHE_TTL = 300  # seconds, cached contexts are also dropped when their collections are written
+CACHE_MAX_ENTRIES = 200
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 
 class QueryIntent(Enum):
     """Detected intent of user queries."""
@@ -81,6 +87,7 @@ class RetrievalContext:
     related_errors: List[Dict[str, Any]]
     related_solutions: List[Dict[str, Any]]
     related_tasks: List[Dict[str, Any]]
+    timings: Dict[str, float] = field(default_factory=dict)  # milliseconds per retrieval stage
 
 
 class UnityContextEngine:
@@ -145,6 +152,9 @@ class UnityContextEngine:
         llm_callback: Optional[callable] = None,
         max_context_items: int = 50,
         multi_hop_depth: int = 2,
+        cache_ttl: float = CACHE_TTL,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
     ):
         self.qdrant = qdrant
         self.project_id = project_id
@@ -152,9 +162,14 @@ class UnityContextEngine:
         self.max_context_items = max_context_items
         self.multi_hop_depth = multi_hop_depth
 
-        # Cache for recent queries
-        self._query_cache: Dict[str, RetrievalContext] = {}
-        self._entity_cache: Dict[str, UnitySearchResult] = {}
+        # Cache for recent queries, invalidated by writes to the collections they read
+        self._query_cache = LRUCache(
+            max_size=cache_max_entries, default_ttl=cache_ttl, max_bytes=cache_max_bytes
+        )
+        self._entity_cache = LRUCache(
+            max_size=cache_max_entries, default_ttl=cache_ttl, max_bytes=cache_max_bytes // 4
+        )
+        qdrant.add_write_listener(self._on_write)
 
     async def get_context(
         self,
@@ -171,30 +186,49 @@ class UnityContextEngine:
         This is the main entry point for intelligent retrieval.
         """
         # Check cache
-        cache_key = f"{query}:{self.project_id}"
-        if cache_key in self._query_cache:
-            return self._query_cache[cache_key]
+        cache_key = json.dumps([
+            query, self.project_id, asdict(unity_context) if unity_context else None,
+            include_code, include_errors, include_tasks, max_results,
+        ], default=str)
+        cached = await self._query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        async def timed(stage: str, coro):
+            stage_start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = round((time.perf_counter() - stage_start) * 1000, 1)
 
         # Analyze query
-        analysis = await self._analyze_query(query)
+        analysis = await timed("analysis", self._analyze_query(query))
+
+        async def no_results():
+            return []
+
+        async def related():
+            # errors, solutions and tasks search the raw query, embed it once for all of them
+            include_debug = include_errors and analysis.intent in [QueryIntent.DEBUG_ERROR, QueryIntent.GENERAL]
+            if not (include_debug or include_tasks):
+                return [], [], []
+            embedding = await timed("embedding", self.qdrant.embed_query(query))
+            return await asyncio.gather(
+                timed("errors", self._find_related_errors(query, analysis, embedding)) if include_debug else no_results(),
+                timed("solutions", self._find_related_solutions(query, analysis, embedding)) if include_debug else no_results(),
+                timed("tasks", self._find_related_tasks(query, analysis, embedding)) if include_tasks else no_results(),
+            )
 
-        # Build context chain with multi-hop reasoning
-        context_chain = await self._build_context_chain(
-            analysis, unity_context, max_results
+        # Build context chain with multi-hop reasoning, concurrently with the independent
+        # lookups of related errors and solutions (when debugging) and tasks
+        context_chain, (related_errors, related_solutions, related_tasks) = await asyncio.gather(
+            timed("context_chain", self._build_context_chain(analysis, unity_context, max_results)),
+            related(),
         )
 
-        # Get related errors and solutions if debugging
-        related_errors = []
-        related_solutions = []
-        if include_errors and analysis.intent in [QueryIntent.DEBUG_ERROR, QueryIntent.GENERAL]:
-            related_errors = await self._find_related_errors(query, analysis)
-            related_solutions = await self._find_related_solutions(query, analysis)
-
-        # Get related tasks
-        related_tasks = []
-        if include_tasks:
-            related_tasks = await self._find_related_tasks(query, analysis)
-
         # Generate summary and recommendations
         summary = self._generate_context_summary(
             analysis, context_chain, related_errors, related_solutions
@@ -211,13 +245,49 @@ class UnityContextEngine:
             related_errors=related_errors,
             related_solutions=related_solutions,
             related_tasks=related_tasks,
+            timings=timings,
         )
+        timings["total"] = round((time.perf_counter() - start) * 1000, 1)
 
         # Cache result
-        self._query_cache[cache_key] = result
+        searched = set(self._select_collections(analysis.intent))
+        searched.update([UnityCollectionType.GAMEOBJECTS, UnityCollectionType.RELATIONSHIPS])
+        if related_errors or related_solutions:
+            searched.update([UnityCollectionType.ERRORS, UnityCollectionType.SOLUTIONS])
+        if include_tasks:
+            searched.add(UnityCollectionType.TASKS)
+        for r in context_chain.all_results():
+            try:
+                searched.add(UnityCollectionType(r.collection))
+            except ValueError:
+                pass
+        await self._query_cache.set(cache_key, result, tags=self._cache_tags(searched))
 
         return result
 
+    def _cache_tags(self, collection_types) -> List[str]:
+        tags = [project_tag(self.project_id)]
+        for ct in collection_types:
+            tags.append(collection_tag(ct.value))
+            tags.append(collection_tag(ct.value, self.project_id))
+        return tags
+
+    async def _on_write(self, collection_types: List[UnityCollectionType], project_id: Optional[str]):
+        """Drop cached contexts that read from collections that were just written."""
+        if project_id is not None and project_id != self.project_id:
+            return
+        tags = [collection_tag(ct.value, project_id) for ct in collection_types]
+        await self._query_cache.invalidate(*tags)
+        # entity contexts follow relationships into any collection
+        await self._entity_cache.invalidate(project_tag(self.project_id))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit rates and sizes of the context caches."""
+        return {
+            "query_cache": self._query_cache.stats(),
+            "entity_cache": self._entity_cache.stats(),
+        }
+
     async def _analyze_query(self, query: str) -> QueryAnalysis:
         """Analyze query to understand intent and extract entities."""
         query_lower = query.lower()
@@ -556,6 +626,7 @@ class UnityContextEngine:
         self,
         query: str,
         analysis: QueryAnalysis,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """Find errors related to the query."""
         # Check if query contains error message
@@ -571,6 +642,7 @@ class UnityContextEngine:
             project_id=self.project_id,
             limit=5,
             filters={"error_type": error_type} if error_type else None,
+            query_embedding=query_embedding,
         )
 
         return [
@@ -587,6 +659,7 @@ class UnityContextEngine:
         self,
         query: str,
         analysis: QueryAnalysis,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """Find solutions related to the query."""
         results = await self.qdrant.search_unity(
@@ -594,6 +667,7 @@ class UnityContextEngine:
             collection_types=[UnityCollectionType.SOLUTIONS],
             project_id=self.project_id,
             limit=5,
+            query_embedding=query_embedding,
         )
 
         return [
@@ -610,6 +684,7 @@ class UnityContextEngine:
         self,
         query: str,
         analysis: QueryAnalysis,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """Find tasks related to the query."""
         results = await self.qdrant.search_unity(
@@ -617,6 +692,7 @@ class UnityContextEngine:
             collection_types=[UnityCollectionType.TASKS],
             project_id=self.project_id,
             limit=5,
+            query_embedding=query_embedding,
         )
 
         return [
@@ -718,6 +794,11 @@ class UnityContextEngine:
         max_related: int = 20,
     ) -> Dict[str, Any]:
         """Get comprehensive context for a specific entity."""
+        cache_key = json.dumps([entity_id, include_relationships, include_usages, max_related])
+        cached = await self._entity_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Retrieve entity
         docs = await self.qdrant.aget_by_ids([entity_id])
         if not docs:
@@ -782,6 +863,7 @@ class UnityContextEngine:
                     for r in results
                 ]
 
+        await self._entity_cache.set(cache_key, result, tags=[project_tag(self.project_id)])
         return result
 
     async def find_code_pattern(
@@ -821,10 +903,10 @@ class UnityContextEngine:
 
         return examples[:max_examples]
 
-    def clear_cache(self):
+    async def clear_cache(self):
         """Clear all caches."""
-        self._query_cache.clear()
-        self._entity_cache.clear()
+        await self._query_cache.clear()
+        await self._entity_cache.clear()
 
 
 class ContextAwarePromptBuilder:
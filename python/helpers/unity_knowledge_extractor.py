@@ -11,7 +11,10 @@ Automatically parses and indexes Unity projects into Qdrant for intelligent retr
 
 import asyncio
 import hashlib
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
 import re
 import json
 import yaml
@@ -25,9 +28,17 @@ import logging
 from python.helpers.unity_qdrant_enhanced import (
     UnityQdrantEnhanced, UnityCollectionType, UnityQueryContext
 )
+from python.helpers import files, unity_yaml
+from python.helpers.unity_yaml import UnityGameObject
 
 logger = logging.getLogger(__name__)
 
+STATE_DIR = "tmp/unity"  # per-project file index for incremental extraction
+HASH_CHUNK = 1 << 20
+
+# set while extract_project runs, its parses use the process pool it shuts down at the end
+_in_extraction: ContextVar[bool] = ContextVar("unity_in_extraction", default=False)
+
 
 class UnityFileType(Enum):
     """Unity file types for extraction."""
@@ -74,20 +85,6 @@ class CSharpClass:
     is_static: bool = False
 
 
-@dataclass
-class UnityGameObject:
-    """Parsed Unity GameObject from scene/prefab."""
-    name: str
-    file_id: str
-    tag: str
-    layer: int
-    is_active: bool
-    components: List[Dict[str, Any]]
-    children_ids: List[str]
-    parent_id: Optional[str]
-    transform: Optional[Dict[str, Any]]
-
-
 class UnityKnowledgeExtractor:
     """
     Extracts and indexes Unity project knowledge into Qdrant.
@@ -127,15 +124,23 @@ class UnityKnowledgeExtractor:
         qdrant_client: UnityQdrantEnhanced,
         project_id: str,
         max_workers: int = 4,
-        batch_size: int = 50
+        batch_size: int = 50,
+        process_workers: Optional[int] = None,
     ):
         self.qdrant = qdrant_client
         self.project_id = project_id
         self.max_workers = max_workers
         self.batch_size = batch_size
+        # CPU-bound parsing runs in worker processes, 0 parses in a thread instead
+        self.process_workers = (os.cpu_count() or 1) if process_workers is None else process_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
 
         # Index tracking for incremental updates
         self._file_hashes: Dict[str, str] = {}
+        # path -> (mtime_ns, size), files with unchanged stats are not read again
+        self._file_stats: Dict[str, Tuple[int, int]] = {}
+        # state of discovered files, committed once the file is indexed
+        self._pending_state: Dict[str, Tuple[Tuple[int, int], str]] = {}
         self._extraction_progress = ExtractionProgress()
 
     async def extract_project(
@@ -164,6 +169,8 @@ class UnityKnowledgeExtractor:
         # Load existing file hashes for incremental mode
         if incremental:
             await self._load_file_hashes()
+        else:
+            self._file_hashes, self._file_stats = {}, {}
 
         # Discover all relevant files
         files_to_process = await self._discover_files(project_path)
@@ -183,7 +190,12 @@ class UnityKnowledgeExtractor:
             self._extract_assets_batch(assets, project_path, progress_callback),
         ]
 
-        await asyncio.gather(*tasks)
+        token = _in_extraction.set(True)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            _in_extraction.reset(token)
+            self.close()
 
         # Extract project settings
         await self._extract_project_settings(project_path)
@@ -194,8 +206,65 @@ class UnityKnowledgeExtractor:
         self._extraction_progress.end_time = datetime.now()
         return self._extraction_progress
 
+    def close(self):
+        """Shut down the parser worker processes, they are started again on demand."""
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _parse(self, func, path: Path):
+        """
+        Run a module-level parse function off the event loop. Worker processes are only used
+        within extract_project, which owns the pool; single files (watcher updates) parse in a thread.
+        """
+        if self.process_workers <= 0 or not _in_extraction.get():
+            return await asyncio.to_thread(func, str(path))
+        if self._pool is None:
+            # spawn, forking a process with running threads and an event loop can deadlock the workers
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, str(path))
+
+    async def _extract_batch(
+        self,
+        paths: List[Path],
+        project_path: Path,
+        extract,
+        counter: str,
+        label: str,
+        concurrency: int,
+        progress_callback: Optional[callable]
+    ):
+        """
+        Extract files with a fixed number of in-flight files. Each file is parsed in the
+        worker pool and then stored, so embedding and upserts overlap with parsing of the next files.
+        """
+        progress = self._extraction_progress
+        pending = iter(paths)
+        done = 0
+
+        async def worker():
+            nonlocal done
+            for path in pending:
+                try:
+                    await extract(path, project_path)
+                    self._commit_file_state(path)
+                    setattr(progress, counter, getattr(progress, counter) + 1)
+                    progress.processed_files += 1
+                except Exception as e:
+                    progress.errors.append(f"{label} {path}: {e}")
+                done += 1
+                if progress_callback and (done % self.batch_size == 0 or done == len(paths)):
+                    progress_callback(progress)
+
+        await asyncio.gather(*[worker() for _ in range(min(max(1, concurrency), len(paths)))])
+
     async def _discover_files(self, project_path: Path) -> List[Path]:
         """Discover all Unity files to process."""
+        return await asyncio.to_thread(self._scan_files, project_path)
+
+    def _scan_files(self, project_path: Path) -> List[Path]:
         files = []
         assets_path = project_path / "Assets"
 
@@ -205,6 +274,7 @@ class UnityKnowledgeExtractor:
         extensions = {".cs", ".unity", ".prefab", ".mat", ".asset", ".controller", ".anim"}
         exclude_dirs = {"Library", "Temp", "Logs", "obj", "Packages", ".git"}
 
+        self._pending_state = {}
         for root, dirs, filenames in os.walk(assets_path):
             # Skip excluded directories
             dirs[:] = [d for d in dirs if d not in exclude_dirs]
@@ -219,20 +289,39 @@ class UnityKnowledgeExtractor:
         return files
 
     def _should_process_file(self, file_path: Path) -> bool:
-        """Check if file has changed since last extraction."""
-        file_hash = self._compute_file_hash(file_path)
-        stored_hash = self._file_hashes.get(str(file_path))
+        """Check if file has changed since last extraction, hashing only files whose mtime or size changed."""
+        key = str(file_path)
+        try:
+            st = file_path.stat()
+        except OSError:
+            return False
+        stat = (st.st_mtime_ns, st.st_size)
+        stored_hash = self._file_hashes.get(key)
+        if stored_hash and self._file_stats.get(key) == stat:
+            return False
 
-        if stored_hash != file_hash:
-            self._file_hashes[str(file_path)] = file_hash
-            return True
-        return False
+        file_hash = self._compute_file_hash(file_path)
+        if stored_hash == file_hash:
+            # touched but unchanged, remember the new stats
+            self._file_stats[key] = stat
+            return False
+        self._pending_state[key] = (stat, file_hash)
+        return True
+
+    def _commit_file_state(self, file_path: Path):
+        """Record the stats and hash of an indexed file, failed files are retried next time."""
+        state = self._pending_state.pop(str(file_path), None)
+        if state:
+            self._file_stats[str(file_path)], self._file_hashes[str(file_path)] = state
 
     def _compute_file_hash(self, file_path: Path) -> str:
         """Compute MD5 hash of file content."""
         try:
+            md5 = hashlib.md5()
             with open(file_path, "rb") as f:
-                return hashlib.md5(f.read()).hexdigest()
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                    md5.update(chunk)
+            return md5.hexdigest()
         except Exception:
             return ""
 
@@ -245,46 +334,29 @@ class UnityKnowledgeExtractor:
         progress_callback: Optional[callable]
     ):
         """Extract all C# scripts in batches."""
-        for i in range(0, len(scripts), self.batch_size):
-            batch = scripts[i:i + self.batch_size]
-
-            tasks = [
-                self._extract_script(script, project_path)
-                for script in batch
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if isinstance(result, Exception):
-                    self._extraction_progress.errors.append(str(result))
-                else:
-                    self._extraction_progress.scripts_extracted += 1
-                    self._extraction_progress.processed_files += 1
-
-            if progress_callback:
-                progress_callback(self._extraction_progress)
+        await self._extract_batch(
+            scripts, project_path, self._extract_script, "scripts_extracted",
+            "Script", self.batch_size, progress_callback,
+        )
 
     async def _extract_script(self, script_path: Path, project_path: Path) -> str:
         """Extract and index a single C# script."""
         try:
-            content = script_path.read_text(encoding="utf-8-sig")
+            content, classes = await self._parse(_parse_script_file, script_path)
             relative_path = str(script_path.relative_to(project_path))
 
-            classes = self._parse_csharp(content)
-
             if classes:
                 return await self.qdrant.store_script(
                     file_path=relative_path,
                     content=content,
-                    classes=[self._class_to_dict(c) for c in classes],
+                    classes=classes,
                     project_id=self.project_id,
                     metadata={
                         "line_count": content.count("\n") + 1,
                         "has_unity_callbacks": any(
-                            m["name"] in self.UNITY_CALLBACKS
+                            m["is_unity_callback"]
                             for c in classes
-                            for m in c.methods
+                            for m in c["methods"]
                         ),
                         "is_editor_script": "Editor" in relative_path,
                     }
@@ -294,7 +366,8 @@ class UnityKnowledgeExtractor:
             logger.error(f"Failed to extract script {script_path}: {e}")
             raise
 
-    def _parse_csharp(self, content: str) -> List[CSharpClass]:
+    @classmethod
+    def _parse_csharp(cls, content: str) -> List[CSharpClass]:
         """Parse C# source code to extract class information."""
         classes = []
 
@@ -337,16 +410,16 @@ class UnityKnowledgeExtractor:
 
             # Extract class body
             class_start = match.end()
-            class_body = self._extract_class_body(content, class_start)
+            class_body = cls._extract_class_body(content, class_start)
 
             # Parse fields
-            fields = self._parse_fields(class_body)
+            fields = cls._parse_fields(class_body)
 
             # Parse properties
-            properties = self._parse_properties(class_body)
+            properties = cls._parse_properties(class_body)
 
             # Parse methods
-            methods = self._parse_methods(class_body)
+            methods = cls._parse_methods(class_body)
 
             classes.append(CSharpClass(
                 name=class_name,
@@ -364,7 +437,8 @@ class UnityKnowledgeExtractor:
 
         return classes
 
-    def _extract_class_body(self, content: str, start: int) -> str:
+    @classmethod
+    def _extract_class_body(cls, content: str, start: int) -> str:
         """Extract class body by matching braces."""
         brace_count = 1
         end = start
@@ -380,7 +454,8 @@ class UnityKnowledgeExtractor:
 
         return content[start:end]
 
-    def _parse_fields(self, class_body: str) -> List[Dict[str, Any]]:
+    @classmethod
+    def _parse_fields(cls, class_body: str) -> List[Dict[str, Any]]:
         """Parse class fields."""
         fields = []
 
@@ -415,7 +490,8 @@ class UnityKnowledgeExtractor:
 
         return fields
 
-    def _parse_properties(self, class_body: str) -> List[Dict[str, Any]]:
+    @classmethod
+    def _parse_properties(cls, class_body: str) -> List[Dict[str, Any]]:
         """Parse class properties."""
         properties = []
 
@@ -441,7 +517,8 @@ class UnityKnowledgeExtractor:
 
         return properties
 
-    def _parse_methods(self, class_body: str) -> List[Dict[str, Any]]:
+    @classmethod
+    def _parse_methods(cls, class_body: str) -> List[Dict[str, Any]]:
         """Parse class methods."""
         methods = []
 
@@ -462,7 +539,7 @@ class UnityKnowledgeExtractor:
 
             # Parse parameters
             params_str = match.group("params") or ""
-            params = self._parse_parameters(params_str)
+            params = cls._parse_parameters(params_str)
 
             attrs_str = match.group("attributes") or ""
             attributes = re.findall(r"\[(\w+)", attrs_str)
@@ -476,13 +553,14 @@ class UnityKnowledgeExtractor:
                 "is_virtual": "virtual" in modifiers,
                 "is_override": "override" in modifiers,
                 "is_async": "async" in modifiers,
-                "is_unity_callback": name in self.UNITY_CALLBACKS,
+                "is_unity_callback": name in cls.UNITY_CALLBACKS,
                 "attributes": attributes,
             })
 
         return methods
 
-    def _parse_parameters(self, params_str: str) -> List[Tuple[str, str]]:
+    @classmethod
+    def _parse_parameters(cls, params_str: str) -> List[Tuple[str, str]]:
         """Parse method parameters."""
         if not params_str.strip():
             return []
@@ -505,7 +583,8 @@ class UnityKnowledgeExtractor:
 
         return params
 
-    def _class_to_dict(self, cls: CSharpClass) -> Dict[str, Any]:
+    @staticmethod
+    def _class_to_dict(cls: CSharpClass) -> Dict[str, Any]:
         """Convert CSharpClass to dictionary."""
         return {
             "name": cls.name,
@@ -529,27 +608,19 @@ class UnityKnowledgeExtractor:
         project_path: Path,
         progress_callback: Optional[callable]
     ):
-        """Extract all scenes in batches."""
-        for scene_path in scenes:
-            try:
-                await self._extract_scene(scene_path, project_path)
-                self._extraction_progress.scenes_extracted += 1
-                self._extraction_progress.processed_files += 1
-
-            except Exception as e:
-                self._extraction_progress.errors.append(f"Scene {scene_path}: {e}")
-
-            if progress_callback:
-                progress_callback(self._extraction_progress)
+        """Extract all scenes, fewer at a time since scenes can be large."""
+        await self._extract_batch(
+            scenes, project_path, self._extract_scene, "scenes_extracted",
+            "Scene", self.max_workers, progress_callback,
+        )
 
     async def _extract_scene(self, scene_path: Path, project_path: Path) -> str:
         """Extract and index a Unity scene."""
         try:
-            content = scene_path.read_text(encoding="utf-8-sig")
             relative_path = str(scene_path.relative_to(project_path))
             scene_name = scene_path.stem
 
-            game_objects = self._parse_unity_yaml(content)
+            game_objects = await self._parse(unity_yaml.parse_unity_file, scene_path)
 
             # Create scene content summary
             scene_content = self._create_scene_summary(scene_name, game_objects)
@@ -571,123 +642,8 @@ class UnityKnowledgeExtractor:
             raise
 
     def _parse_unity_yaml(self, content: str) -> List[UnityGameObject]:
-        """Parse Unity YAML scene/prefab file."""
-        game_objects = []
-
-        # Unity YAML uses --- separators for documents
-        # Each document starts with a type identifier
-
-        # Simple regex-based parsing for GameObjects
-        go_pattern = r"--- !u!1 &(\d+)\s*GameObject:\s*m_ObjectHideFlags: \d+[\s\S]*?m_Name: ([^\n]+)[\s\S]*?m_TagString: ([^\n]+)[\s\S]*?m_Layer: (\d+)"
-
-        for match in re.finditer(go_pattern, content):
-            file_id = match.group(1)
-            name = match.group(2).strip()
-            tag = match.group(3).strip()
-            layer = int(match.group(4))
-
-            # Extract components for this GameObject
-            components = self._extract_components(content, file_id)
-
-            # Find parent from Transform component
-            parent_id = None
-            transform = None
-            for comp in components:
-                if comp.get("type") in ["Transform", "RectTransform"]:
-                    transform = comp
-                    parent_ref = comp.get("parent")
-                    if parent_ref:
-                        parent_id = parent_ref
-
-            game_objects.append(UnityGameObject(
-                name=name,
-                file_id=file_id,
-                tag=tag,
-                layer=layer,
-                is_active=True,
-                components=components,
-                children_ids=[],
-                parent_id=parent_id,
-                transform=transform
-            ))
-
-        # Build parent-child relationships
-        go_by_id = {go.file_id: go for go in game_objects}
-        for go in game_objects:
-            if go.parent_id and go.parent_id in go_by_id:
-                go_by_id[go.parent_id].children_ids.append(go.file_id)
-
-        return game_objects
-
-    def _extract_components(self, content: str, gameobject_id: str) -> List[Dict[str, Any]]:
-        """Extract components attached to a GameObject."""
-        components = []
-
-        # Find component references in the GameObject
-        go_section = re.search(
-            rf"--- !u!1 &{gameobject_id}[\s\S]*?(?=--- !u!|$)",
-            content
-        )
-
-        if not go_section:
-            return components
-
-        # Find component file IDs
-        comp_refs = re.findall(r"component:\s*\{fileID: (\d+)\}", go_section.group())
-
-        # Common Unity component type IDs
-        component_types = {
-            "4": "Transform",
-            "20": "Camera",
-            "23": "MeshRenderer",
-            "33": "MeshFilter",
-            "54": "Rigidbody",
-            "65": "BoxCollider",
-            "82": "AudioSource",
-            "108": "Light",
-            "114": "MonoBehaviour",
-            "135": "SphereCollider",
-            "136": "CapsuleCollider",
-            "137": "SkinnedMeshRenderer",
-            "224": "RectTransform",
-            "225": "CanvasRenderer",
-            "226": "Canvas",
-        }
-
-        for comp_id in comp_refs:
-            # Find component section
-            comp_match = re.search(
-                rf"--- !u!(\d+) &{comp_id}[\s\S]*?(?=--- !u!|$)",
-                content
-            )
-
-            if comp_match:
-                type_id = comp_match.group(1)
-                comp_type = component_types.get(type_id, f"Component_{type_id}")
-
-                comp_data = {"type": comp_type, "file_id": comp_id}
-
-                # For MonoBehaviour, try to get script reference
-                if type_id == "114":
-                    script_match = re.search(
-                        r"m_Script:\s*\{fileID: \d+, guid: ([a-f0-9]+)",
-                        comp_match.group()
-                    )
-                    if script_match:
-                        comp_data["script_guid"] = script_match.group(1)
-
-                # For Transform, get parent reference
-                if type_id in ["4", "224"]:
-                    parent_match = re.search(
-                        r"m_Father:\s*\{fileID: (\d+)\}",
-                        comp_match.group()
-                    )
-                    if parent_match and parent_match.group(1) != "0":
-                        comp_data["parent"] = parent_match.group(1)
-
-                components.append(comp_data)
-
-        return components
+        """Parse Unity YAML scene/prefab content, see python/helpers/unity_yaml.py."""
+        return unity_yaml.parse_unity_yaml(content)
 
     def _gameobject_to_dict(self, go: UnityGameObject) -> Dict[str, Any]:
         """Convert UnityGameObject to dictionary."""
@@ -742,34 +698,18 @@ class UnityKnowledgeExtractor:
         progress_callback: Optional[callable]
     ):
         """Extract all prefabs in batches."""
-        for i in range(0, len(prefabs), self.batch_size):
-            batch = prefabs[i:i + self.batch_size]
-
-            tasks = [
-                self._extract_prefab(prefab, project_path)
-                for prefab in batch
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if isinstance(result, Exception):
-                    self._extraction_progress.errors.append(str(result))
-                else:
-                    self._extraction_progress.prefabs_extracted += 1
-                    self._extraction_progress.processed_files += 1
-
-            if progress_callback:
-                progress_callback(self._extraction_progress)
+        await self._extract_batch(
+            prefabs, project_path, self._extract_prefab, "prefabs_extracted",
+            "Prefab", self.batch_size, progress_callback,
+        )
 
     async def _extract_prefab(self, prefab_path: Path, project_path: Path) -> str:
         """Extract and index a Unity prefab."""
         try:
-            content = prefab_path.read_text(encoding="utf-8-sig")
             relative_path = str(prefab_path.relative_to(project_path))
             prefab_name = prefab_path.stem
 
-            game_objects = self._parse_unity_yaml(content)
+            game_objects = await self._parse(unity_yaml.parse_unity_file, prefab_path)
 
             # Get GUID from meta file
             meta_path = prefab_path.with_suffix(prefab_path.suffix + ".meta")
@@ -817,25 +757,10 @@ class UnityKnowledgeExtractor:
         progress_callback: Optional[callable]
     ):
         """Extract all assets in batches."""
-        for i in range(0, len(assets), self.batch_size):
-            batch = assets[i:i + self.batch_size]
-
-            tasks = [
-                self._extract_asset(asset, project_path)
-                for asset in batch
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if isinstance(result, Exception):
-                    self._extraction_progress.errors.append(str(result))
-                else:
-                    self._extraction_progress.assets_extracted += 1
-                    self._extraction_progress.processed_files += 1
-
-            if progress_callback:
-                progress_callback(self._extraction_progress)
+        await self._extract_batch(
+            assets, project_path, self._extract_asset, "assets_extracted",
+            "Asset", self.batch_size, progress_callback,
+        )
 
     async def _extract_asset(self, asset_path: Path, project_path: Path) -> str:
         """Extract and index a Unity asset."""
@@ -852,24 +777,8 @@ class UnityKnowledgeExtractor:
             }
             asset_type = asset_type_map.get(asset_path.suffix, "Asset")
 
-            # Get GUID from meta file
-            meta_path = asset_path.with_suffix(asset_path.suffix + ".meta")
-            guid = ""
-            dependencies = []
-
-            if meta_path.exists():
-                meta_content = meta_path.read_text()
-                guid_match = re.search(r"guid:\s*([a-f0-9]+)", meta_content)
-                if guid_match:
-                    guid = guid_match.group(1)
-
-            # Parse asset content for dependencies
-            try:
-                content = asset_path.read_text(encoding="utf-8-sig")
-                dep_guids = re.findall(r"guid:\s*([a-f0-9]{32})", content)
-                dependencies = list(set(dep_guids) - {guid})
-            except Exception:
-                pass
+            # GUID from the meta file and referenced GUIDs from the asset content
+            guid, dependencies = await self._parse(_parse_asset_file, asset_path)
 
             return await self.qdrant.store_asset(
                 asset_path=relative_path,
@@ -928,17 +837,31 @@ class UnityKnowledgeExtractor:
 
     # ==================== FILE HASH PERSISTENCE ====================
 
+    def _state_file(self) -> str:
+        return files.get_abs_path(STATE_DIR, f"{files.safe_file_name(self.project_id)}_files.json")
+
     async def _load_file_hashes(self):
-        """Load stored file hashes for incremental updates."""
-        # In a real implementation, this would load from Qdrant or local file
-        # For now, start fresh each time
-        self._file_hashes = {}
+        """Load stored file hashes and stats for incremental updates."""
+        self._file_hashes, self._file_stats = {}, {}
+        try:
+            state = json.loads(await asyncio.to_thread(files.read_file, self._state_file()))
+            self._file_hashes = state.get("hashes", {})
+            self._file_stats = {path: tuple(stat) for path, stat in state.get("stats", {}).items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to load file hashes: {e}")
 
     async def _save_file_hashes(self):
         """Save file hashes for future incremental updates."""
+        try:
+            content = json.dumps({"hashes": self._file_hashes, "stats": self._file_stats})
+            await asyncio.to_thread(files.write_file_atomic, self._state_file(), content)
+        except Exception as e:
+            logger.error(f"Failed to save file hashes: {e}")
+
         # Store in project state collection
         try:
-            content = json.dumps(self._file_hashes)
             await self.qdrant.store_asset(
                 asset_path="__internal__/file_hashes.json",
                 asset_type="InternalState",
@@ -953,6 +876,32 @@ class UnityKnowledgeExtractor:
             logger.error(f"Failed to save file hashes: {e}")
 
 
+# Parse functions run in the extractor's worker processes, they have to be module-level to be picklable
+
+def _parse_script_file(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    content = Path(path).read_text(encoding="utf-8-sig")
+    classes = UnityKnowledgeExtractor._parse_csharp(content)
+    return content, [UnityKnowledgeExtractor._class_to_dict(c) for c in classes]
+
+
+def _parse_asset_file(path: str) -> Tuple[str, List[str]]:
+    guid = ""
+    meta_path = path + ".meta"
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8", errors="replace") as f:
+            guid_match = re.search(r"guid:\s*([a-f0-9]+)", f.read())
+        if guid_match:
+            guid = guid_match.group(1)
+
+    dependencies: List[str] = []
+    try:
+        content = Path(path).read_text(encoding="utf-8-sig")
+        dependencies = list(set(re.findall(r"guid:\s*([a-f0-9]{32})", content)) - {guid})
+    except Exception:
+        pass
+    return guid, dependencies
+
+
 class UnityKnowledgeWatcher:
     """
     Watch Unity project for changes and update knowledge base in real-time.
@@ -1017,8 +966,15 @@ class UnityKnowledgeWatcher:
         updates = list(self._pending_updates)
         self._pending_updates.clear()
 
+        extractor = self.extractor
+        if not extractor._file_hashes:
+            await extractor._load_file_hashes()
+        committed = False
         for path in updates:
             try:
+                # saves without content changes are skipped like in incremental extraction
+                if not await asyncio.to_thread(extractor._should_process_file, path):
+                    continue
                 if path.suffix == ".cs":
                     await self.extractor._extract_script(path, self.project_path)
                 elif path.suffix == ".unity":
@@ -1027,12 +983,17 @@ class UnityKnowledgeWatcher:
                     await self.extractor._extract_prefab(path, self.project_path)
                 else:
                     await self.extractor._extract_asset(path, self.project_path)
+                extractor._commit_file_state(path)
+                committed = True
 
                 logger.info(f"Updated knowledge for: {path}")
 
             except Exception as e:
                 logger.error(f"Failed to update {path}: {e}")
 
+        if committed:
+            await extractor._save_file_hashes()
+
     def stop(self):
         """Stop watching."""
         self._running = False
@@ -14,6 +14,7 @@ import hashlib
 import json
 import os
 import pickle
+import sys
 import time
 from collections import OrderedDict
 from dataclasses import dataclass, field
@@ -36,6 +37,8 @@ class CacheEntry:
     accessed_at: float
     access_count: int = 0
     ttl_seconds: Optional[float] = None
+    size: int = 0
+    tags: Tuple[str, ...] = ()
 
     def is_expired(self) -> bool:
         if self.ttl_seconds is None:
@@ -54,20 +57,65 @@ class BatchOperation:
     created_at: float = field(default_factory=time.time)
 
 
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    if _depth > 8:
+        return 0
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(v, _depth + 1) for v in value)
+    if isinstance(value, Document):
+        return size + estimate_size(value.page_content, _depth + 1) + estimate_size(value.metadata, _depth + 1)
+    if hasattr(value, "__dict__"):  # dataclasses and plain objects
+        return size + estimate_size(vars(value), _depth + 1)
+    return size
+
+
 class LRUCache:
-    """Thread-safe LRU cache with TTL support."""
+    """
+    Thread-safe LRU cache with TTL support.
+
+    Optionally bounded by the estimated size of the cached values (max_bytes).
+    Entries can carry tags, all entries with a tag are dropped by invalidate().
+    """
 
     def __init__(
         self,
         max_size: int = 1000,
         default_ttl: Optional[float] = 3600,  # 1 hour
+        max_bytes: Optional[int] = None,
+        sizer: Callable[[Any], int] = estimate_size,
     ):
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.sizer = sizer
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
         self._lock = asyncio.Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _remove(self, key: str) -> CacheEntry:
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
@@ -79,7 +127,7 @@ class LRUCache:
             entry = self._cache[key]
 
             if entry.is_expired():
-                del self._cache[key]
+                self._remove(key)
                 self._misses += 1
                 return None
 
@@ -98,36 +146,65 @@ class LRUCache:
         key: str,
         value: Any,
         ttl: Optional[float] = None,
+        tags: Optional[List[str]] = None,
     ):
         """Set value in cache."""
+        size = self.sizer(value) if self.max_bytes else 0
         async with self._lock:
             # Remove if exists (to update position)
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
 
-            # Evict oldest if at capacity
-            while len(self._cache) >= self.max_size:
-                self._cache.popitem(last=False)
+            # Values larger than the whole cache are not cached
+            if self.max_bytes and size > self.max_bytes:
+                return
 
-            self._cache[key] = CacheEntry(
+            # Evict oldest if at capacity
+            while self._cache and (
+                len(self._cache) >= self.max_size
+                or (self.max_bytes and self._bytes + size > self.max_bytes)
+            ):
+                self._remove(next(iter(self._cache)))
+                self._evictions += 1
+
+            entry = CacheEntry(
                 value=value,
                 created_at=time.time(),
                 accessed_at=time.time(),
                 ttl_seconds=ttl or self.default_ttl,
+                size=size,
+                tags=tuple(tags or ()),
             )
+            self._cache[key] = entry
+            self._bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
 
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
         async with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 return True
             return False
 
+    async def invalidate(self, *tags: str) -> int:
+        """Delete all entries carrying any of the tags."""
+        async with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
     async def clear(self):
         """Clear all cache entries."""
         async with self._lock:
             self._cache.clear()
+            self._tags.clear()
+            self._bytes = 0
             self._hits = 0
             self._misses = 0
 
@@ -139,7 +216,7 @@ class LRUCache:
                 if entry.is_expired()
             ]
             for key in expired:
-                del self._cache[key]
+                self._remove(key)
             return len(expired)
 
     def stats(self) -> Dict[str, Any]:
@@ -148,9 +225,13 @@ class LRUCache:
         return {
             "size": len(self._cache),
             "max_size": self.max_size,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": self._hits / total if total > 0 else 0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
         }
 
 
@@ -312,6 +393,16 @@ class EmbeddingCache:
         }
 
 
+def collection_tag(collection: str, project_id: Optional[str] = None) -> str:
+    """Cache tag for entries depending on a collection, optionally scoped to a project."""
+    return f"collection:{collection}" if project_id is None else f"collection:{collection}:{project_id}"
+
+
+def project_tag(project_id: str) -> str:
+    """Cache tag for entries depending on any data of a project."""
+    return f"project:{project_id}"
+
+
 class QueryResultCache:
     """
     Cache for search query results with intelligent invalidation.
@@ -327,8 +418,9 @@ class QueryResultCache:
         self,
         max_entries: int = 500,
         default_ttl: float = 300,  # 5 minutes
+        max_bytes: Optional[int] = None,
     ):
-        self.cache = LRUCache(max_size=max_entries, default_ttl=default_ttl)
+        self.cache = LRUCache(max_size=max_entries, default_ttl=default_ttl, max_bytes=max_bytes)
         self._invalidation_patterns: List[str] = []
 
     def _normalize_query(self, query: str) -> str:
@@ -373,16 +465,23 @@ class QueryResultCache:
         collection: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
         ttl: Optional[float] = None,
+        tags: Optional[List[str]] = None,
     ):
-        """Cache query results."""
+        """Cache query results, tagged with their collection and any extra tags."""
         key = self._make_key(query, collection, filters)
-        await self.cache.set(key, results, ttl)
+        tags = list(tags or [])
+        if collection:
+            tags.append(collection_tag(collection))
+        await self.cache.set(key, results, ttl, tags)
 
-    async def invalidate_collection(self, collection: str):
-        """Invalidate all results for a collection."""
-        # This is a simple approach - could be optimized with collection tracking
-        await self.cache.clear()
-        logger.debug(f"Invalidated cache for collection: {collection}")
+    async def invalidate_collection(self, collection: str, project_id: Optional[str] = None):
+        """Invalidate all results for a collection, or only those of one project in it."""
+        count = await self.cache.invalidate(collection_tag(collection, project_id))
+        logger.debug(f"Invalidated {count} cached results for collection: {collection}")
+
+    async def invalidate_project(self, project_id: str):
+        """Invalidate all results of a project."""
+        await self.cache.invalidate(project_tag(project_id))
 
     async def invalidate_pattern(self, pattern: str):
         """Invalidate results matching a pattern."""
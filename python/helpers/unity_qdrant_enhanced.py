@@ -18,10 +18,14 @@ from dataclasses import dataclass, field, asdict
 from enum import Enum
 import json
 import os
+import weakref
 from functools import lru_cache
 
 from langchain_core.documents import Document
 
+from python.helpers import bm25_sparse, files
+from python.helpers.qdrant_client import hybrid_query
+
 try:
     from qdrant_client import AsyncQdrantClient, models as qmodels
     from qdrant_client.http.models import (
@@ -95,7 +99,9 @@ class EmbeddingCache:
 
     def set(self, text: str, embedding: List[float]):
         key = hashlib.md5(text.encode()).hexdigest()
-        if len(self._cache) >= self.max_size:
+        if key in self._cache:
+            self._access_order.remove(key)
+        elif len(self._cache) >= self.max_size:
             oldest = self._access_order.pop(0)
             del self._cache[oldest]
         self._cache[key] = embedding
@@ -128,6 +134,9 @@ class UnityQdrantEnhanced:
         "created_at", "updated_at", "area", "source", "tags"
     ]
 
+    RELATIONSHIPS_PER_ENTITY = 10
+    SCROLL_PAGE_SIZE = 256
+
     # Optimized HNSW config for different collection sizes
     HNSW_CONFIGS = {
         "small": HnswConfigDiff(m=16, ef_construct=100),      # < 10k docs
@@ -148,6 +157,7 @@ class UnityQdrantEnhanced:
         enable_sparse: bool = True,
         cache_embeddings: bool = True,
         batch_size: int = 100,
+        sparse_stats_dir: str = "memory/unity_bm25",
     ):
         if not QDRANT_AVAILABLE:
             raise RuntimeError(
@@ -161,6 +171,7 @@ class UnityQdrantEnhanced:
         self.score_threshold = score_threshold
         self.limit = limit
         self.enable_sparse = enable_sparse
+        self.sparse_stats_dir = sparse_stats_dir
         self.batch_size = batch_size
 
         # Caching
@@ -171,6 +182,30 @@ class UnityQdrantEnhanced:
         # Project state tracking
         self._project_states: Dict[str, Dict[str, Any]] = {}
 
+        # Callbacks notified after writes, used to invalidate caches of search results
+        self._write_listeners: List[Any] = []
+
+    def add_write_listener(self, listener):
+        """
+        Register an async callback(collection_types, project_id) called after every write.
+        project_id is None when the write may affect any project. Bound methods are held weakly.
+        """
+        ref = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else (lambda: listener)
+        self._write_listeners.append(ref)
+
+    async def _notify_write(self, collection_types: List[UnityCollectionType], project_id: Optional[str]):
+        alive = []
+        for ref in self._write_listeners:
+            listener = ref()
+            if listener is None:
+                continue
+            alive.append(ref)
+            try:
+                await listener(collection_types, project_id)
+            except Exception:
+                pass
+        self._write_listeners = alive
+
     def _get_collection_name(self, collection_type: UnityCollectionType) -> str:
         """Generate collection name for a specific Unity entity type."""
         return f"{self.base_collection}-{collection_type.value}"
@@ -197,13 +232,17 @@ class UnityQdrantEnhanced:
             if cached:
                 return cached
 
-        embedding = await asyncio.to_thread(self.embedder.embed_query, text)
+        embedding = await self.embedder.aembed_query(text)
 
         if self.embedding_cache:
             self.embedding_cache.set(text, embedding)
 
         return embedding
 
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, to share one embedding between several search_unity calls."""
+        return await self._embed_text(query)
+
     async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Batch embed texts with caching."""
         results = []
@@ -222,9 +261,7 @@ class UnityQdrantEnhanced:
 
         # Embed uncached texts in batch
         if uncached_texts:
-            embeddings = await asyncio.to_thread(
-                self.embedder.embed_documents, uncached_texts
-            )
+            embeddings = await self.embedder.aembed_documents(uncached_texts)
             for idx, emb, text in zip(uncached_indices, embeddings, uncached_texts):
                 results.append((idx, emb))
                 if self.embedding_cache:
@@ -234,22 +271,14 @@ class UnityQdrantEnhanced:
         results.sort(key=lambda x: x[0])
         return [emb for _, emb in results]
 
-    def _generate_sparse_vector(self, text: str) -> Dict[int, float]:
-        """Generate sparse vector from text using BM25-style tokenization."""
-        # Simple BM25-style sparse vector generation
-        tokens = text.lower().split()
-        token_counts: Dict[str, int] = {}
-        for token in tokens:
-            token_counts[token] = token_counts.get(token, 0) + 1
-
-        # Convert to sparse vector format
-        sparse = {}
-        for token, count in token_counts.items():
-            # Use hash of token as index
-            idx = hash(token) % 100000  # Limit to 100k dimensions
-            sparse[idx] = float(count)
+    def _sparse_encoder(self, collection_type: UnityCollectionType) -> bm25_sparse.BM25SparseEncoder:
+        """BM25 encoder with the persisted document frequencies of a collection."""
+        name = self._get_collection_name(collection_type)
+        return bm25_sparse.get_encoder(files.get_abs_path(self.sparse_stats_dir, f"{name}.json"))
 
-        return sparse
+    def _generate_sparse_vector(self, text: str, collection_type: UnityCollectionType) -> Dict[int, float]:
+        """Generate BM25 sparse vector of a document upserted into a collection."""
+        return self._sparse_encoder(collection_type).encode_document(text)
 
     async def _ensure_collection(
         self,
@@ -351,7 +380,7 @@ class UnityQdrantEnhanced:
 
         vectors = {"dense": embedding}
         if self.enable_sparse:
-            sparse = self._generate_sparse_vector(content)
+            sparse = self._generate_sparse_vector(content, UnityCollectionType.SCENES)
             vectors["sparse"] = SparseVector(
                 indices=list(sparse.keys()),
                 values=list(sparse.values())
@@ -365,6 +394,9 @@ class UnityQdrantEnhanced:
         # Store individual GameObjects
         await self._store_gameobjects_batch(game_objects, scene_name, project_id)
 
+        await self._notify_write(
+            [UnityCollectionType.SCENES, UnityCollectionType.GAMEOBJECTS], project_id
+        )
         return doc_id
 
     async def _store_gameobjects_batch(
@@ -406,7 +438,7 @@ class UnityQdrantEnhanced:
 
             vectors = {"dense": embedding}
             if self.enable_sparse:
-                sparse = self._generate_sparse_vector(content)
+                sparse = self._generate_sparse_vector(content, UnityCollectionType.GAMEOBJECTS)
                 vectors["sparse"] = SparseVector(
                     indices=list(sparse.keys()),
                     values=list(sparse.values())
@@ -482,7 +514,7 @@ class UnityQdrantEnhanced:
 
         vectors = {"dense": embedding}
         if self.enable_sparse:
-            sparse = self._generate_sparse_vector(text)
+            sparse = self._generate_sparse_vector(text, UnityCollectionType.SCRIPTS)
             vectors["sparse"] = SparseVector(
                 indices=list(sparse.keys()),
                 values=list(sparse.values())
@@ -493,6 +525,7 @@ class UnityQdrantEnhanced:
             points=[PointStruct(id=doc_id, vector=vectors, payload=payload)]
         )
 
+        await self._notify_write([UnityCollectionType.SCRIPTS], project_id)
         return doc_id
 
     def _script_to_text(
@@ -584,7 +617,7 @@ class UnityQdrantEnhanced:
 
         vectors = {"dense": embedding}
         if self.enable_sparse:
-            sparse = self._generate_sparse_vector(content)
+            sparse = self._generate_sparse_vector(content, UnityCollectionType.ASSETS)
             vectors["sparse"] = SparseVector(
                 indices=list(sparse.keys()),
                 values=list(sparse.values())
@@ -601,6 +634,9 @@ class UnityQdrantEnhanced:
                 doc_id, dependencies, "depends_on", project_id
             )
 
+        await self._notify_write(
+            [UnityCollectionType.ASSETS, UnityCollectionType.RELATIONSHIPS], project_id
+        )
         return doc_id
 
     async def store_error(
@@ -646,6 +682,7 @@ class UnityQdrantEnhanced:
             points=[PointStruct(id=doc_id, vector=vectors, payload=payload)]
         )
 
+        await self._notify_write([UnityCollectionType.ERRORS], project_id)
         return doc_id
 
     async def store_task(
@@ -694,6 +731,7 @@ class UnityQdrantEnhanced:
             points=[PointStruct(id=doc_id, vector=vectors, payload=payload)]
         )
 
+        await self._notify_write([UnityCollectionType.TASKS], project_id)
         return doc_id
 
     async def _store_relationships(
@@ -745,7 +783,9 @@ class UnityQdrantEnhanced:
         score_threshold: Optional[float] = None,
         filters: Optional[Dict[str, Any]] = None,
         include_relationships: bool = False,
-        multi_hop: bool = False
+        multi_hop: bool = False,
+        query_embedding: Optional[List[float]] = None,
+        multi_hop_depth: int = 1,
     ) -> List[UnitySearchResult]:
         """
         Intelligent Unity-aware search with context and relationships.
@@ -760,13 +800,16 @@ class UnityQdrantEnhanced:
             filters: Additional payload filters
             include_relationships: Fetch related entities
             multi_hop: Enable multi-hop reasoning through relationships
+            multi_hop_depth: Number of relationship hops to expand
+            query_embedding: Precomputed embedding of the query, used when no context is given
         """
         threshold = score_threshold or self.score_threshold
         collections = collection_types or list(UnityCollectionType)
 
         # Enhance query with context
         enhanced_query = self._enhance_query_with_context(query, context)
-        query_embedding = await self._embed_text(enhanced_query)
+        if query_embedding is None or enhanced_query != query:
+            query_embedding = await self._embed_text(enhanced_query)
 
         # Build filter
         qdrant_filter = self._build_filter(project_id, filters)
@@ -800,7 +843,8 @@ class UnityQdrantEnhanced:
         # Multi-hop reasoning
         if multi_hop and all_results:
             all_results = await self._multi_hop_expansion(
-                all_results[:limit], query_embedding, project_id
+                all_results[:limit], query_embedding, project_id,
+                depth=multi_hop_depth, budget=limit
             )
 
         return all_results[:limit]
@@ -817,19 +861,34 @@ class UnityQdrantEnhanced:
     ) -> List[UnitySearchResult]:
         """Search a single collection."""
         try:
-            # Prepare search request
-            search_params = {
-                "collection_name": collection_name,
-                "query_vector": ("dense", query_embedding),
-                "limit": limit,
-                "score_threshold": threshold,
-                "with_vectors": False,
-            }
+            if self.enable_sparse and self.prefer_hybrid:
+                # dense and BM25 candidates fused with RRF by the server
+                sparse = self._sparse_encoder(UnityCollectionType(collection_type)).encode_query(query_text)
+                results = await hybrid_query(
+                    self.client,
+                    collection_name,
+                    query_embedding,
+                    sparse,
+                    limit,
+                    query_filter=qdrant_filter,
+                    score_threshold=threshold,
+                    dense_using="dense",
+                    sparse_using="sparse",
+                )
+            else:
+                # Prepare search request
+                search_params = {
+                    "collection_name": collection_name,
+                    "query_vector": ("dense", query_embedding),
+                    "limit": limit,
+                    "score_threshold": threshold,
+                    "with_vectors": False,
+                }
 
-            if qdrant_filter:
-                search_params["query_filter"] = qdrant_filter
+                if qdrant_filter:
+                    search_params["query_filter"] = qdrant_filter
 
-            results = await self.client.search(**search_params)
+                results = await self.client.search(**search_params)
 
             search_results = []
             for point in results:
@@ -899,86 +958,142 @@ class UnityQdrantEnhanced:
             return Filter(must=conditions)
         return None
 
-    async def _enrich_with_relationships(self, results: List[UnitySearchResult]):
-        """Add relationship data to search results."""
-        collection = self._get_collection_name(UnityCollectionType.RELATIONSHIPS)
+    async def _scroll_payloads(
+        self,
+        collection: str,
+        scroll_filter: Filter,
+        budget: int
+    ) -> List[Dict[str, Any]]:
+        """Scroll through all points matching a filter, up to budget payloads."""
+        payloads: List[Dict[str, Any]] = []
+        offset = None
+        while len(payloads) < budget:
+            points, offset = await self.client.scroll(
+                collection_name=collection,
+                scroll_filter=scroll_filter,
+                limit=min(self.SCROLL_PAGE_SIZE, budget - len(payloads)),
+                offset=offset,
+                with_vectors=False
+            )
+            payloads.extend(point.payload or {} for point in points)
+            if offset is None:
+                break
+        return payloads
 
+    async def _enrich_with_relationships(self, results: List[UnitySearchResult]):
+        """Add relationship data to search results, looked up for all results at once."""
+        by_id: Dict[str, List[UnitySearchResult]] = {}
         for result in results:
             entity_id = result.document.metadata.get("original_id")
-            if not entity_id:
-                continue
+            if entity_id:
+                by_id.setdefault(entity_id, []).append(result)
+        if not by_id:
+            return
 
+        cap = self.RELATIONSHIPS_PER_ENTITY
+        collection = self._get_collection_name(UnityCollectionType.RELATIONSHIPS)
+        found: Dict[str, List[Dict[str, Any]]] = {entity_id: [] for entity_id in by_id}
+        remaining = list(by_id)
+        # up to cap relationships per entity: a hub entity can take most of a scroll, so the
+        # entities still short of the cap are looked up again without the filled ones,
+        # each round fills at least one of them until their matches run out
+        while remaining:
+            budget = len(remaining) * cap
             try:
-                # Find relationships where this entity is source or target
-                rels = await self.client.scroll(
-                    collection_name=collection,
-                    scroll_filter=Filter(
+                # Find relationships where any of the entities is source or target
+                rels = await self._scroll_payloads(
+                    collection,
+                    Filter(
                         should=[
-                            FieldCondition(key="source_entity", match=MatchValue(value=entity_id)),
-                            FieldCondition(key="target_entity", match=MatchValue(value=entity_id))
+                            FieldCondition(key="source_entity", match=MatchAny(any=remaining)),
+                            FieldCondition(key="target_entity", match=MatchAny(any=remaining))
                         ]
                     ),
-                    limit=10,
-                    with_vectors=False
+                    budget=budget,
                 )
+            except Exception:
+                break
 
-                for point in rels[0]:
-                    result.relationships.append(point.payload)
+            for rel in rels:
+                for key in ("source_entity", "target_entity"):
+                    entity_rels = found.get(rel.get(key))
+                    if entity_rels is not None and len(entity_rels) < cap and rel not in entity_rels:
+                        entity_rels.append(rel)
+            if len(rels) < budget:
+                break  # all matches seen
+            remaining = [entity_id for entity_id in remaining if len(found[entity_id]) < cap]
 
-            except Exception:
-                pass
+        for entity_id, entity_results in by_id.items():
+            for result in entity_results:
+                result.relationships.extend(found[entity_id])
+
+    async def _retrieve_points(self, collection_type: UnityCollectionType, ids: List[str]) -> list:
+        try:
+            return await self.client.retrieve(
+                collection_name=self._get_collection_name(collection_type),
+                ids=ids,
+                with_vectors=False
+            )
+        except Exception:
+            return []
 
     async def _multi_hop_expansion(
         self,
         results: List[UnitySearchResult],
         query_embedding: List[float],
-        project_id: Optional[str]
+        project_id: Optional[str],
+        depth: int = 1,
+        budget: Optional[int] = None
     ) -> List[UnitySearchResult]:
-        """Expand results through relationship graph."""
+        """
+        Expand results through relationship graph, up to depth hops and budget added results.
+        Each hop fetches all related entities with one retrieve per collection.
+        """
         expanded = list(results)
-        seen_ids = {r.document.metadata.get("original_id") for r in results}
+        visited = {r.document.metadata.get("original_id") for r in results}
+        budget = self.limit if budget is None else budget
+        collection_types = [ct for ct in UnityCollectionType if ct != UnityCollectionType.RELATIONSHIPS]
+        frontier = results
+        added = 0
+
+        for hop in range(1, depth + 1):
+            # Get related entity IDs
+            related_ids = []
+            for result in frontier:
+                for rel in result.relationships:
+                    for key in ("source_entity", "target_entity"):
+                        rel_id = rel.get(key)
+                        if rel_id and rel_id not in visited:
+                            visited.add(rel_id)
+                            related_ids.append(rel_id)
+            related_ids = related_ids[:budget - added]
+            if not related_ids:
+                break
 
-        # Get related entity IDs
-        related_ids = set()
-        for result in results:
-            for rel in result.relationships:
-                source = rel.get("source_entity")
-                target = rel.get("target_entity")
-                if source and source not in seen_ids:
-                    related_ids.add(source)
-                if target and target not in seen_ids:
-                    related_ids.add(target)
-
-        # Fetch related entities
-        for collection_type in UnityCollectionType:
-            if collection_type == UnityCollectionType.RELATIONSHIPS:
-                continue
+            # Fetch related entities
+            fetched = await asyncio.gather(*[
+                self._retrieve_points(ct, related_ids) for ct in collection_types
+            ])
 
-            collection = self._get_collection_name(collection_type)
-            try:
-                for rel_id in related_ids:
-                    try:
-                        points = await self.client.retrieve(
-                            collection_name=collection,
-                            ids=[rel_id],
-                            with_vectors=False
-                        )
+            frontier = []
+            for collection_type, points in zip(collection_types, fetched):
+                for point in points:
+                    payload = dict(point.payload or {})
+                    text = payload.pop("text", "")
+                    payload["id"] = payload.get("original_id", str(point.id))
 
-                        for point in points:
-                            payload = dict(point.payload or {})
-                            text = payload.pop("text", "")
-                            payload["id"] = payload.get("original_id", str(point.id))
-
-                            expanded.append(UnitySearchResult(
-                                document=Document(page_content=text, metadata=payload),
-                                score=0.5,  # Lower score for related items
-                                collection=collection_type.value,
-                                context_chain=[r.document for r in results[:3]]
-                            ))
-                    except Exception:
-                        continue
-            except Exception:
-                continue
+                    frontier.append(UnitySearchResult(
+                        document=Document(page_content=text, metadata=payload),
+                        score=0.5 ** hop,  # Lower score for related items
+                        collection=collection_type.value,
+                        context_chain=[r.document for r in results[:3]]
+                    ))
+            frontier = frontier[:budget - added]
+            expanded.extend(frontier)
+            added += len(frontier)
+
+            if hop < depth and frontier and added < budget:
+                await self._enrich_with_relationships(frontier)
 
         return expanded
 
@@ -1044,33 +1159,31 @@ class UnityQdrantEnhanced:
         for _ in range(depth):
             next_level = []
 
-            for eid in current_level:
-                try:
-                    rels, _ = await self.client.scroll(
-                        collection_name=collection,
-                        scroll_filter=Filter(must=[
-                            FieldCondition(
-                                key="source_entity",
-                                match=MatchValue(value=eid)
-                            ),
-                            FieldCondition(
-                                key="relationship_type",
-                                match=MatchValue(value="depends_on")
-                            )
-                        ]),
-                        limit=50,
-                        with_vectors=False
-                    )
-
-                    for point in rels:
-                        target = point.payload.get("target_entity")
-                        if target and target not in visited:
-                            dependencies.append(point.payload)
-                            visited.add(target)
-                            next_level.append(target)
+            # one lookup for the whole level
+            try:
+                rels = await self._scroll_payloads(
+                    collection,
+                    Filter(must=[
+                        FieldCondition(
+                            key="source_entity",
+                            match=MatchAny(any=current_level)
+                        ),
+                        FieldCondition(
+                            key="relationship_type",
+                            match=MatchValue(value="depends_on")
+                        )
+                    ]),
+                    budget=50 * len(current_level),
+                )
+            except Exception:
+                break
 
-                except Exception:
-                    continue
+            for payload in rels:
+                target = payload.get("target_entity")
+                if target and target not in visited:
+                    dependencies.append(payload)
+                    visited.add(target)
+                    next_level.append(target)
 
             current_level = next_level
             if not current_level:
@@ -1123,7 +1236,7 @@ class UnityQdrantEnhanced:
 
             vectors = {"dense": vec}
             if self.enable_sparse:
-                sparse = self._generate_sparse_vector(doc.page_content)
+                sparse = self._generate_sparse_vector(doc.page_content, UnityCollectionType.DOCUMENTATION)
                 vectors["sparse"] = SparseVector(
                     indices=list(sparse.keys()),
                     values=list(sparse.values())
@@ -1136,6 +1249,7 @@ class UnityQdrantEnhanced:
             batch = points[i:i + self.batch_size]
             await self.client.upsert(collection_name=collection, points=batch)
 
+        await self._notify_write([UnityCollectionType.DOCUMENTATION], None)
         return list(ids)
 
     async def adelete(self, ids: Sequence[str]):
@@ -1151,6 +1265,8 @@ class UnityQdrantEnhanced:
             except Exception:
                 continue
 
+        await self._notify_write(list(UnityCollectionType), None)
+
     async def aget_by_ids(self, ids: Sequence[str]) -> List[Document]:
         """Get documents by IDs from all collections."""
         uuid_ids = [self._to_uuid(i) for i in ids]
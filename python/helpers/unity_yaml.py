@@ -0,0 +1,186 @@
+"""
+Single-pass parser for Unity YAML scenes and prefabs.
+
+Unity serializes every object as its own document, introduced by a
+``--- !u!<classID> &<fileID>`` header. The file is split on those headers once,
+building a fileID -> document map, and GameObjects, their components and the
+Transform hierarchy are resolved from that map. Files are memory-mapped, only
+the documents that are actually read get copied out of the page cache.
+"""
+
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# Common Unity component class IDs
+COMPONENT_TYPES = {
+    "4": "Transform",
+    "20": "Camera",
+    "23": "MeshRenderer",
+    "33": "MeshFilter",
+    "54": "Rigidbody",
+    "65": "BoxCollider",
+    "82": "AudioSource",
+    "108": "Light",
+    "114": "MonoBehaviour",
+    "135": "SphereCollider",
+    "136": "CapsuleCollider",
+    "137": "SkinnedMeshRenderer",
+    "224": "RectTransform",
+    "225": "CanvasRenderer",
+    "226": "Canvas",
+}
+
+GAMEOBJECT_CLASS = b"1"
+MONOBEHAVIOUR_CLASS = b"114"
+TRANSFORM_CLASSES = (b"4", b"224")
+
+_HEADER_RE = re.compile(rb"^--- !u!(\d+) &(-?\d+)([^\r\n]*)", re.M)
+_GO_FIELD_RE = re.compile(rb"^  (m_Name|m_TagString|m_Layer|m_IsActive): ?([^\r\n]*)", re.M)
+_COMPONENT_RE = re.compile(rb"component: ?\{fileID: (-?\d+)\}")
+_FATHER_RE = re.compile(rb"m_Father: ?\{fileID: (-?\d+)\}")
+_SCRIPT_RE = re.compile(rb"m_Script: ?\{fileID: -?\d+, guid: ([a-f0-9]+)")
+
+
+@dataclass
+class UnityGameObject:
+    """Parsed Unity GameObject from scene/prefab."""
+    name: str
+    file_id: str
+    tag: str
+    layer: int
+    is_active: bool
+    components: List[Dict[str, Any]]
+    children_ids: List[str]
+    parent_id: Optional[str]
+    transform: Optional[Dict[str, Any]]
+
+
+class UnityYamlIndex:
+    """fileID -> (classID, document span) map over a Unity YAML buffer."""
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        self.buffer = buffer
+        self.documents: Dict[bytes, tuple[bytes, int, int]] = {}
+        self.order: List[bytes] = []
+
+        prev: Optional[tuple[bytes, bytes, int]] = None
+        for match in _HEADER_RE.finditer(buffer):
+            if prev:
+                self._add(*prev, match.start())
+            # stripped documents are prefab instance placeholders without data
+            prev = None if b"stripped" in match.group(3) else (match.group(2), match.group(1), match.end())
+        if prev:
+            self._add(*prev, len(buffer))
+
+    def _add(self, file_id: bytes, class_id: bytes, start: int, end: int):
+        self.documents[file_id] = (class_id, start, end)
+        self.order.append(file_id)
+
+    def class_id(self, file_id: bytes) -> Optional[bytes]:
+        doc = self.documents.get(file_id)
+        return doc[0] if doc else None
+
+    def body(self, file_id: bytes) -> bytes:
+        _, start, end = self.documents[file_id]
+        return self.buffer[start:end]
+
+
+def parse_unity_yaml(content: Union[str, bytes]) -> List[UnityGameObject]:
+    """Parse Unity YAML scene/prefab content."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return _parse(UnityYamlIndex(content))
+
+
+def parse_unity_file(path: Union[str, Path]) -> List[UnityGameObject]:
+    """Parse a Unity YAML scene/prefab file through a memory map."""
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return []
+        with buffer:
+            return _parse(UnityYamlIndex(buffer))
+
+
+def _text(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace").strip()
+
+
+def _parse(index: UnityYamlIndex) -> List[UnityGameObject]:
+    game_objects: List[UnityGameObject] = []
+    transform_owner: Dict[str, str] = {}  # transform fileID -> gameobject fileID
+
+    for file_id in index.order:
+        if index.class_id(file_id) != GAMEOBJECT_CLASS:
+            continue
+        body = index.body(file_id)
+        fields = {key: value for key, value in _GO_FIELD_RE.findall(body)}
+        if b"m_Name" not in fields:
+            continue
+
+        go_id = file_id.decode()
+        components = []
+        transform = None
+        for comp_id in _COMPONENT_RE.findall(body):
+            comp = _parse_component(index, comp_id)
+            if comp is None:
+                continue
+            components.append(comp)
+            if comp["type"] in ("Transform", "RectTransform"):
+                transform = comp
+                transform_owner[comp["file_id"]] = go_id
+
+        try:
+            layer = int(fields.get(b"m_Layer", b"0"))
+        except ValueError:
+            layer = 0
+
+        game_objects.append(UnityGameObject(
+            name=_text(fields[b"m_Name"]),
+            file_id=go_id,
+            tag=_text(fields.get(b"m_TagString", b"Untagged")),
+            layer=layer,
+            is_active=fields.get(b"m_IsActive", b"1").strip() != b"0",
+            components=components,
+            children_ids=[],
+            parent_id=transform.get("parent") if transform else None,
+            transform=transform,
+        ))
+
+    # m_Father points to the parent Transform, resolve it to the GameObject owning it
+    go_by_id = {go.file_id: go for go in game_objects}
+    for go in game_objects:
+        if not go.parent_id:
+            continue
+        parent_go = transform_owner.get(go.parent_id)
+        if parent_go:
+            go.parent_id = parent_go
+            go_by_id[parent_go].children_ids.append(go.file_id)
+
+    return game_objects
+
+
+def _parse_component(index: UnityYamlIndex, comp_id: bytes) -> Optional[Dict[str, Any]]:
+    class_id = index.class_id(comp_id)
+    if class_id is None:
+        return None
+    type_id = class_id.decode()
+    comp: Dict[str, Any] = {
+        "type": COMPONENT_TYPES.get(type_id, f"Component_{type_id}"),
+        "file_id": comp_id.decode(),
+    }
+
+    if class_id == MONOBEHAVIOUR_CLASS:
+        script = _SCRIPT_RE.search(index.body(comp_id))
+        if script:
+            comp["script_guid"] = script.group(1).decode()
+    elif class_id in TRANSFORM_CLASSES:
+        father = _FATHER_RE.search(index.body(comp_id))
+        if father and father.group(1) != b"0":
+            comp["parent"] = father.group(1).decode()
+
+    return comp
@@ -0,0 +1,59 @@
+import sys, os
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import bm25_sparse
+from python.helpers.bm25_sparse import BM25SparseEncoder, term_index, tokenize
+
+
+def test_tokenize_splits_identifiers():
+    tokens = tokenize("The PlayerController reads HTTPServerURL and a player_speed")
+    assert "playercontroller" in tokens and "player" in tokens and "controller" in tokens
+    assert {"httpserverurl", "http", "server", "url", "player_speed"} <= set(tokens)
+    # stopwords and single characters are dropped
+    assert "the" not in tokens and "a" not in tokens
+
+
+def test_term_index_is_stable_across_processes():
+    code = "from python.helpers.bm25_sparse import term_index; print(term_index('rigidbody'))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert int(out.stdout) == term_index("rigidbody")
+
+
+def test_frequencies_persist(tmp_path):
+    path = str(tmp_path / "bm25.json")
+    encoder = BM25SparseEncoder(path)
+    encoder.encode_documents(["Rigidbody velocity", "Animator controller", "Rigidbody mass"])
+    encoder.save()
+
+    reloaded = BM25SparseEncoder(path)
+    assert reloaded.stats.doc_count == 3
+    assert reloaded.stats.df[term_index("rigidbody")] == 2
+    assert reloaded.encode_query("rigidbody animator") == encoder.encode_query("rigidbody animator")
+    # rarer terms weigh more
+    query = reloaded.encode_query("rigidbody animator")
+    assert query[term_index("animator")] > query[term_index("rigidbody")]
+
+
+def test_bm25_ranking():
+    encoder = BM25SparseEncoder()
+    docs = [
+        "PlayerController moves the player with a Rigidbody",
+        "EnemySpawner spawns enemies on a timer",
+        "UI manager shows the health bar",
+    ]
+    vectors = encoder.encode_documents(docs)
+    query = encoder.encode_query("player controller")
+
+    def score(vec):
+        return sum(w * vec.get(idx, 0.0) for idx, w in query.items())
+
+    scores = [score(v) for v in vectors]
+    assert scores[0] > 0 and scores[0] == max(scores)
+    assert scores[1] == scores[2] == 0
+
+
+def test_shared_encoder(tmp_path):
+    path = str(tmp_path / "shared.json")
+    assert bm25_sparse.get_encoder(path) is bm25_sparse.get_encoder(os.path.join(str(tmp_path), ".", "shared.json"))
@@ -0,0 +1,220 @@
+import sys, os
+import json
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import persist_chat, history
+from python.helpers.log import Log
+from agent import Agent, AgentContextType
+
+
+def make_agent(number):
+    agent = SimpleNamespace(number=number, data={})
+    agent.history = history.History(agent)
+    return agent
+
+
+def make_context():
+    return SimpleNamespace(
+        id="journal-test",
+        name="chat",
+        created_at=None,
+        last_message=None,
+        type=AgentContextType.USER,
+        streaming_agent=None,
+        data={},
+        output_data={},
+        agent0=make_agent(0),
+        log=Log(),
+    )
+
+
+def say(agent, text, ai=False):
+    agent.history.add_message(ai, text, tokens=len(text))
+
+
+def normalized(data):
+    data = json.loads(persist_chat._safe_json_serialize(data))
+    data.pop("journal_seq", None)
+    for agent in data["agents"]:
+        agent["history"] = json.loads(agent["history"])
+    return data
+
+
+def replayed(context):
+    data = json.loads(files.read_file(persist_chat._get_chat_file_path(context.id)))
+    seq = persist_chat._replay_journal(data, persist_chat._get_journal_file_path(context.id))
+    return normalized(data), seq
+
+
+def journal_lines(context):
+    path = persist_chat._get_journal_file_path(context.id)
+    return files.read_file(path).splitlines() if files.exists(path) else []
+
+
+@pytest.fixture(autouse=True)
+def chats_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist_chat, "CHATS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(persist_chat, "JOURNAL_COMPACT_RATIO", 1000.0)
+    persist_chat._journals.clear()
+    yield
+    persist_chat._journals.clear()
+
+
+def test_deltas_replay_to_the_full_serialization():
+    context = make_context()
+    agent0 = context.agent0
+    say(agent0, "hello")
+    context.log.log(type="user", heading="hello")
+    persist_chat.save_tmp_chat(context)  # snapshot
+
+    for i in range(5):
+        say(agent0, f"reply {i}", ai=True)
+        agent0.data["iteration"] = i
+        context.log.log(type="agent", heading=f"step {i}")
+        persist_chat.save_tmp_chat(context)
+
+    assert len(journal_lines(context)) == 5
+    data, seq = replayed(context)
+    assert seq == 5
+    assert data == normalized(persist_chat._serialize_context(context))
+
+
+def test_unchanged_agent_data_is_left_out_of_deltas():
+    context = make_context()
+    agent0 = context.agent0
+    agent0.data.update({"big": "x" * 1000, "step": 0, "gone": True})
+    persist_chat.save_tmp_chat(context)
+
+    agent0.data["step"] = 1
+    del agent0.data["gone"]
+    persist_chat.save_tmp_chat(context)
+    persist_chat.save_tmp_chat(context)
+
+    first, second = [json.loads(line)["agents"][0] for line in journal_lines(context)]
+    assert "data" not in first
+    assert first["data_changed"] == {"step": 1}
+    assert first["data_removed"] == ["gone"]
+    assert second["data_changed"] == {} and "data_removed" not in second
+    data, _ = replayed(context)
+    assert data["agents"][0]["data"] == {"big": "x" * 1000, "step": 1}
+
+
+def test_history_version_bump_mid_journal_stores_the_history_whole():
+    context = make_context()
+    agent0 = context.agent0
+    say(agent0, "first topic")
+    persist_chat.save_tmp_chat(context)
+
+    say(agent0, "more", ai=True)
+    persist_chat.save_tmp_chat(context)
+    agent0.history.new_topic()
+    say(agent0, "second topic")
+    persist_chat.save_tmp_chat(context)
+    # compression rewrites messages in place and bumps the version
+    agent0.history.current.messages[0].set_summary("summarized")
+    agent0.history.version += 1
+    persist_chat.save_tmp_chat(context)
+    say(agent0, "after compression", ai=True)
+    persist_chat.save_tmp_chat(context)
+
+    entries = [json.loads(line)["agents"][0] for line in journal_lines(context)]
+    assert ["history" in e for e in entries] == [False, True, True, False]
+    data, _ = replayed(context)
+    assert data == normalized(persist_chat._serialize_context(context))
+
+
+def test_torn_last_line_is_ignored():
+    context = make_context()
+    say(context.agent0, "hello")
+    persist_chat.save_tmp_chat(context)
+    say(context.agent0, "complete", ai=True)
+    persist_chat.save_tmp_chat(context)
+    expected = normalized(persist_chat._serialize_context(context))
+
+    say(context.agent0, "torn", ai=True)
+    persist_chat.save_tmp_chat(context)
+    path = persist_chat._get_journal_file_path(context.id)
+    content = files.read_file(path)
+    files.write_file(path, content[: len(content) - 20])
+
+    data, seq = replayed(context)
+    assert seq == 1
+    assert data == expected
+
+
+def test_journal_is_compacted_into_the_snapshot(monkeypatch):
+    monkeypatch.setattr(persist_chat, "JOURNAL_COMPACT_ENTRIES", 3)
+    context = make_context()
+    persist_chat.save_tmp_chat(context)
+    for i in range(3):
+        say(context.agent0, f"message {i}")
+        persist_chat.save_tmp_chat(context)
+    assert len(journal_lines(context)) == 3
+
+    say(context.agent0, "compacted")
+    persist_chat.save_tmp_chat(context)
+    assert journal_lines(context) == []
+    snapshot = json.loads(files.read_file(persist_chat._get_chat_file_path(context.id)))
+    assert snapshot["journal_seq"] == 3
+
+    say(context.agent0, "after compaction")
+    persist_chat.save_tmp_chat(context)
+    [line] = journal_lines(context)
+    assert json.loads(line)["seq"] == 4
+    data, seq = replayed(context)
+    assert seq == 4
+    assert data == normalized(persist_chat._serialize_context(context))
+
+
+def test_subordinate_appears_and_disappears():
+    context = make_context()
+    agent0 = context.agent0
+    say(agent0, "delegate")
+    persist_chat.save_tmp_chat(context)
+
+    sub = make_agent(1)
+    agent0.data[Agent.DATA_NAME_SUBORDINATE] = sub
+    sub.data[Agent.DATA_NAME_SUPERIOR] = agent0
+    say(sub, "working")
+    persist_chat.save_tmp_chat(context)
+    say(sub, "done", ai=True)
+    persist_chat.save_tmp_chat(context)
+    data, _ = replayed(context)
+    assert [a["number"] for a in data["agents"]] == [0, 1]
+    assert data == normalized(persist_chat._serialize_context(context))
+
+    del agent0.data[Agent.DATA_NAME_SUBORDINATE]
+    say(agent0, "back", ai=True)
+    persist_chat.save_tmp_chat(context)
+    # a new subordinate in the same position starts from its own history
+    other = make_agent(1)
+    agent0.data[Agent.DATA_NAME_SUBORDINATE] = other
+    say(other, "fresh")
+    persist_chat.save_tmp_chat(context)
+
+    data, _ = replayed(context)
+    assert data == normalized(persist_chat._serialize_context(context))
+    assert [m["content"] for m in data["agents"][1]["history"]["current"]["messages"]] == ["fresh"]
+
+
+def test_log_guid_reset_replaces_the_log():
+    context = make_context()
+    context.log.log(type="user", heading="before")
+    persist_chat.save_tmp_chat(context)
+    context.log.log(type="agent", heading="also before")
+    persist_chat.save_tmp_chat(context)
+
+    context.log.reset()
+    context.log.log(type="user", heading="after")
+    persist_chat.save_tmp_chat(context)
+    context.log.log(type="agent", heading="after too")
+    persist_chat.save_tmp_chat(context)
+
+    data, _ = replayed(context)
+    assert data["log"]["guid"] == context.log.guid
+    assert [item["heading"] for item in data["log"]["logs"]] == ["after", "after too"]
+    assert data == normalized(persist_chat._serialize_context(context))
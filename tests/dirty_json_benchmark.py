@@ -0,0 +1,50 @@
+# Compares resumable DirtyJsonStream with re-parsing the whole accumulated response per chunk.
+# Run manually: python tests/dirty_json_benchmark.py
+import sys, os
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.dirty_json import DirtyJson, DirtyJsonStream
+
+CHUNK_SIZE = 16  # chars per streamed chunk, roughly a few tokens
+
+
+def make_response(size: int) -> str:
+    text = ("Lorem ipsum dolor sit amet, \"consectetur\" adipiscing elit.\n" * (size // 58 + 1))[:size]
+    return json.dumps(
+        {
+            "thoughts": ["Streaming benchmark"],
+            "headline": "Responding",
+            "tool_name": "response",
+            "tool_args": {"text": text},
+        }
+    )
+
+
+def bench_full(response: str) -> float:
+    start = time.perf_counter()
+    for end in range(CHUNK_SIZE, len(response) + CHUNK_SIZE, CHUNK_SIZE):
+        DirtyJson.parse_string(response[:end])
+    return time.perf_counter() - start
+
+
+def bench_stream(response: str) -> float:
+    start = time.perf_counter()
+    parser = DirtyJsonStream()
+    for end in range(CHUNK_SIZE, len(response) + CHUNK_SIZE, CHUNK_SIZE):
+        parser.update(response[:end])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for size in (10_000, 100_000):
+        response = make_response(size)
+        stream = bench_stream(response)
+        full = bench_full(response) if size <= 10_000 or "--full" in sys.argv else None
+        line = f"{size:>7} chars, {len(response) // CHUNK_SIZE} chunks: stream {stream:.3f}s"
+        if full is not None:
+            line += f", full re-parse {full:.3f}s ({full / stream:.0f}x)"
+        else:
+            line += ", full re-parse skipped (pass --full)"
+        print(line)
@@ -0,0 +1,45 @@
+import sys, os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.dirty_json import DirtyJson, DirtyJsonStream
+
+import pytest
+
+
+examples = [
+    'Sure! {"thoughts": ["a", "b\\n c"], "headline": "x", "tool_name": "response", "tool_args": {"text": "Hello \\"world\\" \\u00e9"}}',
+    '{"a": 1, "b": -2.5e3, "c": true, "d": null, "e": [1, 2, [3, {"f": "g"}],], "h": False}',
+    "{'a': 'single', b: unquoted value, c: 12}",
+    '{ // comment\n "a": /* block */ "x", "ml": """  multi\n line "q" """, "t": `tick`}',
+    '["x", 1, {"y": [ ]}, "z"] trailing',
+    '"just a string" more',
+    '{"n": nul, "m": truex, "esc": "\\x\\/"}',
+]
+
+
+@pytest.mark.parametrize("example", examples)
+def test_chunked_matches_full_parse(example: str):
+    expected = DirtyJson.parse_string(example)
+    rnd = random.Random(example)
+    for _ in range(50):
+        parser = DirtyJsonStream()
+        i = 0
+        while i < len(example):
+            size = rnd.randint(1, 8)
+            parser.feed(example[i : i + size])
+            i += size
+        assert parser.result == expected
+
+
+def test_partial_string_is_exposed():
+    parser = DirtyJsonStream()
+    text = '{"tool_name": "response", "tool_args": {"text": "Hello wor'
+    assert parser.update(text) == {"tool_name": "response", "tool_args": {"text": "Hello wor"}}
+    assert parser.update(text + 'ld"}}')["tool_args"]["text"] == "Hello world"  # type: ignore
+
+
+def test_update_restarts_on_rewritten_text():
+    parser = DirtyJsonStream()
+    parser.update('{"a": "secret')
+    assert parser.update('{"a": "******", "b": 1}') == {"a": "******", "b": 1}
@@ -0,0 +1,47 @@
+# Query embedding throughput of the CPU MiniLM model at 1/8/64 concurrent callers,
+# one encode() per query (asyncio.to_thread) vs coalesced by EmbeddingBatcher.
+# Needs sentence-transformers and the model download. Run manually: python tests/embedding_batcher_benchmark.py
+import sys, os
+import asyncio
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.embedding_batcher import EmbeddingBatcher
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CALLERS = (1, 8, 64)
+QUERIES_PER_CALLER = 20
+
+
+async def run(callers: int, embed) -> float:
+    async def caller(c: int):
+        for q in range(QUERIES_PER_CALLER):
+            await embed(f"how does caller {c} handle query {q} about the player controller?")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(c) for c in range(callers)))
+    return callers * QUERIES_PER_CALLER / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(MODEL, device="cpu")
+
+    def embed_documents(texts):
+        return model.encode(texts, convert_to_tensor=False).tolist()
+
+    async def single(text):
+        return await asyncio.to_thread(embed_documents, [text])
+
+    batcher = EmbeddingBatcher(embed_documents)
+    asyncio.run(single("warm-up"))
+
+    for callers in CALLERS:
+        per_call = asyncio.run(run(callers, single))
+        batched = asyncio.run(run(callers, batcher.embed))
+        print(
+            f"{callers:>3} callers: per-call {per_call:7.1f} q/s, batched {batched:7.1f} q/s "
+            f"({batched / per_call:.1f}x), avg batch {batcher.texts / max(batcher.batches, 1):.1f}"
+        )
+        batcher.batches = batcher.texts = 0
@@ -0,0 +1,67 @@
+import sys, os
+import asyncio
+import threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.embedding_batcher import EmbeddingBatcher
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+
+def test_concurrent_queries_are_coalesced():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model.embed_documents, max_batch_size=16, max_wait=0.05)
+
+    async def run():
+        texts = [f"query {i}" for i in range(40)]
+        texts.insert(1, "query 0")
+        return texts, await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+    texts, vectors = asyncio.run(run())
+    assert vectors == [[float(len(t)), float(ord(t[0]))] for t in texts]
+    # 40 distinct texts in batches of at most 16, the duplicate is embedded once
+    assert sum(len(c) for c in model.calls) == 40
+    assert max(len(c) for c in model.calls) <= 16
+    assert len(model.calls) <= 4
+
+
+def test_callers_on_other_threads_and_loops():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model.embed_documents, max_wait=0.05)
+    results = {}
+
+    def caller(i):
+        results[i] = asyncio.run(batcher.embed(f"text {i}"))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: [float(len(f"text {i}")), float(ord("t"))] for i in range(8)}
+    assert len(model.calls) < 8
+    assert batcher.embed_sync("x") == [1.0, float(ord("x"))]
+
+
+def test_errors_reach_every_caller():
+    def failing(texts):
+        raise RuntimeError("model down")
+
+    batcher = EmbeddingBatcher(failing, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(RuntimeError):
+        batcher.embed_sync("c")
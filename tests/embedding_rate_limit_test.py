@@ -0,0 +1,115 @@
+import sys, os
+import asyncio
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import models
+from models import ModelConfig, ModelType, LiteLLMEmbeddingWrapper
+from python.helpers.tokens import estimate_tokens
+
+
+def config(name, **limits):
+    return ModelConfig(type=ModelType.EMBEDDING, provider="test", name=name, **limits)
+
+
+def limiter_of(conf):
+    return models.rate_limiters.get(f"{conf.provider}\\{conf.name}")
+
+
+def response(texts):
+    return SimpleNamespace(data=[{"embedding": [float(len(t)), 1.0]} for t in texts])
+
+
+def test_has_rate_limits():
+    assert not models._has_rate_limits(None)
+    assert not models._has_rate_limits(config("none"))
+    assert models._has_rate_limits(config("requests", limit_requests=1))
+    assert models._has_rate_limits(config("input", limit_input=1))
+    assert models._has_rate_limits(config("output", limit_output=1))
+
+
+def test_estimate_tokens_counts_all_texts():
+    assert estimate_tokens(["abcd", "efgh"]) == estimate_tokens("abcdefgh")
+    assert estimate_tokens([]) == 0
+    assert estimate_tokens("a") >= 1
+
+
+def test_limiter_is_skipped_without_limits():
+    conf = config("unlimited")
+    asyncio.run(models.apply_embedding_rate_limiter(conf, ["text"]))
+    models.apply_embedding_rate_limiter_sync(conf, ["text"])
+    assert limiter_of(conf) is None
+
+
+def test_usage_is_counted_with_estimated_tokens():
+    conf = config("counted", limit_requests=100, limit_input=10_000)
+    texts = ["first text", "second text"]
+    asyncio.run(models.apply_embedding_rate_limiter(conf, texts))
+    models.apply_embedding_rate_limiter_sync(conf, texts)
+    limiter = limiter_of(conf)
+    assert asyncio.run(limiter.get_total("requests")) == 2
+    assert asyncio.run(limiter.get_total("input")) == 2 * estimate_tokens(texts)
+
+
+def test_sync_limiter_does_not_block_a_running_loop():
+    conf = config("loop", limit_requests=1)
+    models.apply_embedding_rate_limiter_sync(conf, ["fills the window"])
+
+    async def run():
+        started = time.monotonic()
+        models.apply_embedding_rate_limiter_sync(conf, ["over the limit"])
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.5
+    # counted anyway, async callers wait for it
+    assert asyncio.run(limiter_of(conf).get_total("requests")) == 2
+
+
+def test_wrappers_apply_the_limiter(monkeypatch):
+    calls = []
+
+    def embedding(model, input, **kwargs):
+        calls.append(("sync", model, list(input)))
+        return response(input)
+
+    async def aembedding(model, input, **kwargs):
+        calls.append(("async", model, list(input)))
+        return response(input)
+
+    monkeypatch.setattr(models, "embedding", embedding)
+    monkeypatch.setattr(models, "aembedding", aembedding)
+    conf = config("wrapped", limit_requests=100)
+    wrapper = LiteLLMEmbeddingWrapper(model="wrapped", provider="test", model_config=conf)
+
+    assert wrapper.embed_documents(["ab", "abc"]) == [[2.0, 1.0], [3.0, 1.0]]
+    assert wrapper.embed_query("abcd") == [4.0, 1.0]
+
+    async def run():
+        docs = await wrapper.aembed_documents(["a"])
+        query = await wrapper.aembed_query("abcde")
+        return docs, query
+
+    assert asyncio.run(run()) == ([[1.0, 1.0]], [5.0, 1.0])
+    assert [c[0] for c in calls] == ["sync", "sync", "async", "sync"]  # queries go through the batcher
+    assert all(c[1] == "test/wrapped" for c in calls)
+    assert asyncio.run(limiter_of(conf).get_total("requests")) == 4
+
+
+def test_async_wrapper_waits_for_the_window(monkeypatch):
+    async def aembedding(model, input, **kwargs):
+        return response(input)
+
+    monkeypatch.setattr(models, "aembedding", aembedding)
+    conf = config("waiting", limit_requests=1)
+    limiter = models.get_rate_limiter("test", "waiting", 1, 0, 0)
+    limiter.timeframe = 0.3
+    wrapper = LiteLLMEmbeddingWrapper(model="waiting", provider="test", model_config=conf)
+
+    async def run():
+        await wrapper.aembed_documents(["first"])
+        started = time.monotonic()
+        await wrapper.aembed_documents(["second"])
+        return time.monotonic() - started
+
+    assert 0.2 < asyncio.run(run()) < 1.0
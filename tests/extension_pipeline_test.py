@@ -0,0 +1,136 @@
+import sys, os
+import asyncio
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import extension, extract_tools
+
+POINT = "test_point"
+
+EXTENSION = '''
+import asyncio
+from python.helpers.extension import Extension
+
+
+class {name}(Extension):
+    STATELESS = {stateless}
+
+    async def execute(self, calls=None, **kwargs):
+        await asyncio.sleep({delay})
+        if calls is not None:
+            calls.append(("{label}", id(self)))
+'''
+
+
+class FakeAgent:
+    def __init__(self, profile=""):
+        self.config = type("Config", (), {"profile": profile})()
+
+
+def write_extension(folder, file, label, stateless=False, delay=0.0):
+    os.makedirs(folder, exist_ok=True)
+    name = "".join(part.title() for part in file.split("_") if not part.isdigit())
+    with open(os.path.join(folder, f"{file}.py"), "w") as f:
+        f.write(EXTENSION.format(name=name or "Ext", stateless=stateless, delay=delay, label=label))
+    # directory mtimes have coarse resolution on some filesystems, make the change visible
+    stamp = time.time_ns() + 1_000_000_000
+    os.utime(folder, ns=(stamp, stamp))
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(extension.files, "get_abs_path", lambda *paths: os.path.join(str(tmp_path), *paths))
+    monkeypatch.setattr(extension, "_pipelines", {})
+    monkeypatch.setattr(extension, "_cache", {})
+    extension.reset_extension_timings()
+    loads = []
+    load = extract_tools.load_classes_from_folder
+
+    def counting_load(folder, *args, **kwargs):
+        loads.append(folder)
+        return load(folder, *args, **kwargs)
+
+    monkeypatch.setattr(extract_tools, "load_classes_from_folder", counting_load)
+    defaults = os.path.join(str(tmp_path), "python/extensions", POINT)
+    profile = os.path.join(str(tmp_path), "agents", "dev", "extensions", POINT)
+    yield defaults, profile, loads
+    extension.reset_extension_timings()
+
+
+def labels(agent, **kwargs):
+    calls = []
+    asyncio.run(extension.call_extensions(POINT, agent=agent, calls=calls, **kwargs))
+    return [label for label, _ in calls]
+
+
+def test_pipeline_is_cached_until_a_folder_changes(tree):
+    defaults, _, loads = tree
+    write_extension(defaults, "_10_first", "first")
+    agent = FakeAgent()
+
+    assert labels(agent) == ["first"]
+    assert labels(agent) == ["first"]
+    assert len(loads) == 1
+
+    write_extension(defaults, "_20_second", "second")
+    assert labels(agent) == ["first", "second"]
+    assert len(loads) == 2
+
+    os.remove(os.path.join(defaults, "_10_first.py"))
+    os.utime(defaults, ns=(time.time_ns() + 2_000_000_000,) * 2)
+    assert labels(agent) == ["second"]
+
+
+def test_profile_extensions_override_defaults_by_file_name(tree):
+    defaults, profile, _ = tree
+    write_extension(defaults, "_10_shared", "default shared")
+    write_extension(defaults, "_30_last", "default last")
+    write_extension(profile, "_10_shared", "profile shared")
+    write_extension(profile, "_20_extra", "profile extra")
+
+    assert labels(FakeAgent("dev")) == ["profile shared", "profile extra", "default last"]
+    assert labels(FakeAgent()) == ["default shared", "default last"]
+    # a profile without its own extensions gets the defaults
+    assert labels(FakeAgent("other")) == ["default shared", "default last"]
+
+
+def test_only_stateless_extensions_are_reused_per_agent(tree):
+    defaults, _, _ = tree
+    write_extension(defaults, "_10_stateful", "stateful")
+    write_extension(defaults, "_20_stateless", "stateless", stateless=True)
+    first, second = FakeAgent(), FakeAgent()
+
+    def instances(agent):
+        calls = []
+        asyncio.run(extension.call_extensions(POINT, agent=agent, calls=calls))
+        return dict(calls)
+
+    a, b, c = instances(first), instances(first), instances(second)
+    assert a["stateless"] == b["stateless"] != c["stateless"]
+    classes = asyncio.run(extension._get_pipeline(POINT, ""))
+    stateful = classes[0]
+    assert extension._get_instance(stateful, first) is not extension._get_instance(stateful, first)
+    stateless = classes[1]
+    assert extension._get_instance(stateless, None) is not extension._get_instance(stateless, None)
+
+
+def test_timings_are_recorded_per_extension(tree):
+    defaults, _, _ = tree
+    write_extension(defaults, "_10_fast", "fast")
+    write_extension(defaults, "_20_slow", "slow", delay=0.02)
+    agent = FakeAgent()
+    labels(agent)
+    labels(agent)
+
+    timings = extension.get_extension_timings()
+    assert list(timings) == [f"{POINT}/_20_slow", f"{POINT}/_10_fast"]
+    slow = timings[f"{POINT}/_20_slow"]
+    assert slow["calls"] == 2
+    assert slow["max_time"] >= 0.02
+    assert slow["avg_time"] == pytest.approx(slow["total_time"] / 2)
+
+    extension.reset_extension_timings()
+    assert extension.get_extension_timings() == {}
@@ -0,0 +1,56 @@
+# Recall and latency of the FAISS index types available for the memory backend (conf/memory.yaml faiss.index_type).
+# Run manually: python tests/faiss_ann_benchmark.py [vectors] [dimension]
+import sys, os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import faiss_ann
+import faiss
+import numpy as np
+
+QUERIES = 200
+K = 10
+
+
+def make_vectors(n: int, d: int, rnd: np.random.Generator) -> np.ndarray:
+    # clustered unit vectors, closer to real embeddings than uniform noise
+    centers = rnd.standard_normal((max(1, n // 500), d)).astype(np.float32)
+    x = centers[rnd.integers(0, len(centers), n)] + 0.5 * rnd.standard_normal((n, d)).astype(np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+def bench(index_type: str, x: np.ndarray, queries: np.ndarray, truth: np.ndarray, **config):
+    flat = faiss.IndexFlatIP(x.shape[1])
+    start = time.perf_counter()
+    index = faiss_ann.wrap(flat, {"index_type": index_type, "min_vectors": 1, **config})
+    index.add(x)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [index.search(q[None, :], K)[1][0] for q in queries]
+    latency = (time.perf_counter() - start) / len(queries)
+    recall = np.mean([len(set(r) & set(t)) / K for r, t in zip(results, truth)])
+    label = index_type + "".join(f" {k}={v}" for k, v in config.items())
+    print(f"{label:<40} build {build:7.2f}s  query {latency * 1000:7.3f}ms  recall@{K} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    d = int(sys.argv[2]) if len(sys.argv) > 2 else 384
+    rnd = np.random.default_rng(0)
+    x = make_vectors(n, d, rnd)
+    queries = x[rnd.choice(n, QUERIES, replace=False)] + 0.1 * rnd.standard_normal((QUERIES, d)).astype(np.float32)
+    faiss.normalize_L2(queries)
+
+    reference = faiss.IndexFlatIP(d)
+    reference.add(x)
+    truth = reference.search(queries, K)[1]
+
+    print(f"{n} vectors, {d} dimensions, {QUERIES} single queries")
+    bench("flat", x, queries, truth)
+    for ef in (32, 64, 128):
+        bench("hnsw", x, queries, truth, hnsw_ef_search=ef)
+    for nprobe in (8, 16, 32):
+        bench("ivfpq", x, queries, truth, ivf_nprobe=nprobe)
+    bench("ivfpq", x, queries, truth, ivf_nprobe=16, refine_factor=10)
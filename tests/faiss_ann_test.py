@@ -0,0 +1,101 @@
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import faiss_ann
+import faiss
+import numpy as np
+
+import pytest
+
+D = 32
+
+
+def make_vectors(n: int, seed: int = 0) -> np.ndarray:
+    x = np.random.default_rng(seed).standard_normal((n, D)).astype(np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+def test_flat_type_keeps_plain_index():
+    flat = faiss.IndexFlatIP(D)
+    assert faiss_ann.wrap(flat, {"index_type": "flat"}) is flat
+    with pytest.raises(ValueError):
+        faiss_ann.wrap(flat, {"index_type": "lsh"})
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivfpq"])
+def test_ann_follows_flat_positions(index_type: str):
+    x = make_vectors(3000)
+    index = faiss_ann.wrap(faiss.IndexFlatIP(D), {"index_type": index_type, "min_vectors": 1000, "pq_m": 8})
+    reference = faiss.IndexFlatIP(D)
+
+    index.add(x[:500])
+    assert index.ann is None  # below min_vectors
+    index.add(x[500:])
+    reference.add(x)
+    assert index.ann is not None
+
+    removed = np.arange(0, 3000, 9, dtype=np.int64)
+    index.remove_ids(removed)
+    reference.remove_ids(removed)
+    assert index.ntotal == reference.ntotal
+
+    scores, ids = index.search(x[1:2], 5)
+    # the query vector itself is still stored, at its compacted position
+    assert ids[0][0] == 1 - np.searchsorted(removed, 1)
+    # scores are exact inner products from the flat index
+    assert np.allclose(scores[0][0], reference.reconstruct(int(ids[0][0])) @ x[1], atol=1e-5)
+
+
+def test_serialize_roundtrip_restores_ann():
+    x = make_vectors(2000)
+    config = {"index_type": "hnsw", "min_vectors": 1000}
+    index = faiss_ann.wrap(faiss.IndexFlatIP(D), config)
+    index.add(x)
+    data = faiss_ann.serialize(index)
+
+    flat = faiss.deserialize_index(np.frombuffer(data["index.faiss"], dtype=np.uint8))
+    assert isinstance(flat, faiss.IndexFlatIP)
+    restored = faiss_ann.wrap(flat, config, data["index.ann"])
+    assert restored.restored
+    assert (restored.search(x[:20], 5)[1] == index.search(x[:20], 5)[1]).all()
+
+    # changed build parameters invalidate the saved structure
+    rebuilt = faiss_ann.wrap(flat, {**config, "hnsw_m": 16}, data["index.ann"])
+    assert not rebuilt.restored and rebuilt.ann is not None
+
+    # a damaged file is rebuilt as well
+    damaged = faiss_ann.wrap(flat, config, data["index.ann"][:100])
+    assert not damaged.restored and damaged.ann is not None
+
+
+def test_search_is_consistent_with_concurrent_updates():
+    import threading
+
+    x = make_vectors(4000)
+    index = faiss_ann.wrap(faiss.IndexFlatIP(D), {"index_type": "hnsw", "min_vectors": 1000, "rebuild_ratio": 0.05})
+    index.add(x[:3000])
+    queries = x[2900:3000]  # never removed, always found with their own exact score
+    errors = []
+    done = threading.Event()
+
+    def searcher():
+        try:
+            while not done.is_set():
+                scores, ids = index.search(queries, 3)
+                assert (ids[:, 0] >= 0).all()
+                assert np.allclose(scores[:, 0], 1.0, atol=1e-4)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=searcher) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    # removals compact positions and trigger rebuilds while the searches run
+    for start in range(0, 1000, 100):
+        index.remove_ids(np.arange(start // 10, start // 10 + 60, dtype=np.int64))
+        index.add(x[3000 + start : 3100 + start])
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert not errors
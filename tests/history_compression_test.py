@@ -0,0 +1,118 @@
+import sys, os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import history
+from python.helpers.log import Log
+
+CTX_SIZE = 1000
+
+
+class SummaryAgent:
+    """Stub of the agent methods history compression uses, the utility model records its concurrency."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.context = SimpleNamespace(log=Log())
+        self.history: history.History = None  # type: ignore
+        self.active = 0
+        self.max_active = 0
+        self.versions: list[int] = []  # history version seen by each summary call
+
+    async def call_utility_model(self, system: str, message: str) -> str:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.versions.append(self.history.version)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return "short summary"
+
+    def read_prompt(self, file: str, **kwargs) -> str:
+        return file
+
+    def parse_prompt(self, file: str, **kwargs) -> str:
+        return kwargs.get("summary", file)
+
+
+@pytest.fixture(autouse=True)
+def ctx_size(monkeypatch):
+    monkeypatch.setattr(history, "_get_ctx_size_for_history", lambda: CTX_SIZE)
+
+
+def make_history(topics: int, topic_messages: int = 2, current_messages: int = 0, tokens: int = 50):
+    agent = SummaryAgent()
+    hist = agent.history = history.History(agent)
+    for t in range(topics):
+        for m in range(topic_messages):
+            hist.add_message(m % 2 == 1, f"topic {t} message {m}", tokens=tokens)
+        hist.new_topic()
+    for m in range(current_messages):
+        hist.add_message(m % 2 == 1, f"current message {m}", tokens=tokens)
+    return agent, hist
+
+
+def test_plan_meets_the_budget_with_the_fewest_oldest_topics():
+    _, hist = make_history(topics=10)  # 100 tokens each
+    hist.topics[0].set_summary("already summarized")
+    limit = 500
+    planned = hist.plan_topics_compression(limit)
+
+    assert planned == hist.topics[1 : len(planned) + 1]
+    assert all(not topic.summary for topic in planned)
+
+    def expected_total(topics):
+        return sum(
+            t.get_tokens() * history.SUMMARY_SIZE_ESTIMATE if t in topics else t.get_tokens()
+            for t in hist.topics
+        )
+
+    assert expected_total(planned) <= limit
+    assert expected_total(planned[:-1]) > limit
+
+
+def test_plan_is_empty_under_the_budget():
+    _, hist = make_history(topics=3)
+    assert hist.plan_topics_compression(hist.get_topics_tokens()) == []
+
+
+def test_summaries_run_concurrently_up_to_the_cap():
+    agent, hist = make_history(topics=12)
+    assert asyncio.run(hist.compress())
+
+    stats = hist.compress_stats
+    assert stats.calls == 12
+    assert 1 < agent.max_active <= history.COMPRESS_CONCURRENCY
+    # gathered, not one after another
+    assert stats.wall_time < stats.serial_time
+    assert hist.get_topics_tokens() <= CTX_SIZE * history.HISTORY_TOPIC_RATIO
+
+
+def test_version_is_bumped_once_per_round():
+    # the current topic needs two rounds of attention compression, the topics one
+    agent, hist = make_history(topics=12, current_messages=12, tokens=100)
+    assert asyncio.run(hist.compress())
+
+    assert agent.max_active <= history.COMPRESS_CONCURRENCY
+    rounds = sorted(set(agent.versions))
+    assert rounds == [0, 1]
+    # the first round summarizes topics and the current topic side by side
+    assert agent.versions.count(0) == 13
+    assert hist.version == 2
+    assert hist.get_current_topic_tokens() <= CTX_SIZE * history.CURRENT_TOPIC_RATIO
+
+
+def test_nothing_to_compress_keeps_the_version():
+    agent, hist = make_history(topics=1)
+    assert not asyncio.run(hist.compress())
+    assert hist.version == 0
+    assert agent.versions == []
+
+
+def test_summary_model_is_called_directly_outside_compression():
+    agent, hist = make_history(topics=0)
+    assert asyncio.run(hist.call_summary_model(system="s", message="m")) == "short summary"
+    assert hist.compress_stats.calls == 0
@@ -0,0 +1,135 @@
+import sys, os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import history, tokens
+from python.helpers.log import Log
+
+
+class StubAgent:
+    def __init__(self):
+        self.context = SimpleNamespace(log=Log())
+
+    async def call_utility_model(self, system: str, message: str) -> str:
+        return "a short summary of the messages"
+
+    def read_prompt(self, file: str, **kwargs) -> str:
+        return f"[{file}]"
+
+    def parse_prompt(self, file: str, **kwargs) -> str:
+        return kwargs.get("summary", file)
+
+
+@pytest.fixture(autouse=True)
+def ctx_size(monkeypatch):
+    monkeypatch.setattr(history, "_get_ctx_size_for_history", lambda: 1000)
+
+
+def fresh(record) -> int:
+    """Token count recomputed from the text, ignoring every cache."""
+    if isinstance(record, history.Message):
+        return record.calculate_tokens()
+    if isinstance(record, history.History):
+        return sum(fresh(r) for r in record.bulks + record.topics) + fresh(record.current)
+    if record.summary:
+        return tokens.approximate_tokens(record.summary)
+    children = record.messages if isinstance(record, history.Topic) else record.records
+    return sum(fresh(r) for r in children)
+
+
+def assert_counts(hist: history.History):
+    assert hist.get_bulks_tokens() == sum(fresh(b) for b in hist.bulks)
+    assert hist.get_topics_tokens() == sum(fresh(t) for t in hist.topics)
+    assert hist.get_current_topic_tokens() == fresh(hist.current)
+    assert hist.get_tokens() == fresh(hist)
+
+
+def make_history():
+    hist = history.History(StubAgent())
+    for t in range(3):
+        hist.add_message(False, f"question number {t} about the build")
+        hist.add_message(True, f"answer number {t}, the build uses make and a few scripts")
+        hist.new_topic()
+    hist.add_message(False, "the current question")
+    assert_counts(hist)  # caches are warm before each change
+    return hist
+
+
+def test_add_message_and_new_topic():
+    hist = make_history()
+    hist.add_message(True, "a reply in the current topic")
+    assert_counts(hist)
+    hist.new_topic()
+    assert_counts(hist)
+    hist.new_topic()  # empty current topic is not moved
+    assert_counts(hist)
+    hist.add_message(False, "first message of a new topic")
+    assert_counts(hist)
+
+
+def test_set_summary_on_topic_bulk_and_message():
+    hist = make_history()
+    hist.topics[0].set_summary("topic summary")
+    assert_counts(hist)
+
+    asyncio.run(hist.compress_topics(limit=0))  # summarizes the rest
+    assert_counts(hist)
+    asyncio.run(hist.compress_topics(limit=0))  # summarized topics move to bulks
+    assert hist.bulks
+    assert_counts(hist)
+    hist.bulks[0].set_summary("a different bulk summary, somewhat longer than before")
+    assert_counts(hist)
+
+    # messages do not know their topic, whoever summarizes them invalidates it
+    hist.current.messages[0].set_summary("message summary")
+    hist.current.invalidate_tokens()
+    assert_counts(hist)
+
+
+def test_compress_large_messages():
+    hist = make_history()
+    hist.add_message(True, {"output": "a very long tool output line\n" * 300})
+    assert_counts(hist)
+    assert asyncio.run(hist.current.compress_large_messages())
+    assert hist.current.messages[-1].summary
+    assert_counts(hist)
+
+
+def test_compress_attention():
+    hist = make_history()
+    for i in range(6):
+        hist.add_message(i % 2 == 0, f"step {i} of the current task with some detail")
+    assert_counts(hist)
+    assert asyncio.run(hist.current.compress_attention())
+    assert_counts(hist)
+
+
+def test_summarize_and_merge_bulks():
+    hist = make_history()
+    asyncio.run(hist.compress_topics(limit=0))
+    asyncio.run(hist.compress_topics(limit=0))
+    assert len(hist.bulks) > 1
+    assert_counts(hist)
+    asyncio.run(hist.merge_bulks_by(2))
+    assert_counts(hist)
+    asyncio.run(hist.compress_bulks())
+    assert_counts(hist)
+
+
+def test_from_dict():
+    hist = make_history()
+    asyncio.run(hist.compress_topics(limit=0))
+    asyncio.run(hist.compress_topics(limit=0))
+    hist.add_message(True, "after moving topics")
+    restored = history.History.from_dict(hist.to_dict(), history=history.History(hist.agent))
+    assert_counts(restored)
+    assert restored.get_tokens() == hist.get_tokens()
+
+    # loading into a history with warm caches replaces them
+    target = make_history()
+    history.History.from_dict(hist.to_dict(), history=target)
+    assert_counts(target)
@@ -0,0 +1,100 @@
+import sys, os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import models
+
+
+class FakeTensor:
+    def __init__(self, numel, element_size):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+class FakeSentenceTransformer:
+    loads = 0
+
+    def __init__(self, name, **kwargs):
+        time.sleep(0.05)  # long enough for concurrent callers to race on loading
+        type(self).loads += 1
+        self.name = name
+        self.kwargs = kwargs
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, convert_to_tensor=False):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def parameters(self):
+        return [FakeTensor(10, 4)]
+
+    def buffers(self):
+        return [FakeTensor(5, 2)]
+
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    FakeSentenceTransformer.loads = 0
+    monkeypatch.setattr(models, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(models, "local_embedding_models", {})
+
+
+def test_model_is_loaded_once_per_provider_model_and_arguments():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        entries = list(executor.map(lambda _: models.get_local_embedding_model("huggingface", "mini"), range(8)))
+    assert FakeSentenceTransformer.loads == 1
+    assert all(entry is entries[0] for entry in entries)
+
+    on_cpu = models.get_local_embedding_model("huggingface", "mini", device="cpu")
+    assert on_cpu is not entries[0]
+    assert on_cpu.model.kwargs == {"device": "cpu"}
+    assert FakeSentenceTransformer.loads == 2
+
+
+def test_wrappers_share_the_weights():
+    first = models.LocalSentenceTransformerWrapper("huggingface", "sentence-transformers/mini")
+    second = models.LocalSentenceTransformerWrapper("huggingface", "mini", stream_timeout=5)
+    assert first.shared is second.shared
+    assert FakeSentenceTransformer.loads == 1
+    assert first.embed_documents(["ab"]) == [[2.0, 1.0]]
+
+
+def test_encode_runs_concurrently_on_the_shared_model():
+    entry = models.get_local_embedding_model("huggingface", "mini")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda t: entry.encode([t]), ["a", "bb", "ccc", "dddd"]))
+    assert results == [[[1.0, 1.0]], [[2.0, 1.0]], [[3.0, 1.0]], [[4.0, 1.0]]]
+    assert entry.model.max_active > 1
+
+
+def test_memory_is_reported_per_loaded_model():
+    assert models.get_local_embedding_models_memory() == {}
+    entry = models.get_local_embedding_model("huggingface", "mini")
+    assert models.get_local_embedding_models_memory() == {entry.key: 10 * 4 + 5 * 2}
+
+
+def test_warm_up_loads_and_embeds(monkeypatch):
+    # provider defaults come from the user's settings, not needed here
+    monkeypatch.setattr(models, "_merge_provider_defaults", lambda kind, provider, kwargs: (provider, kwargs))
+    memory = asyncio.run(models.warm_up_embedding_model("huggingface", "sentence-transformers/mini"))
+    [entry] = models.local_embedding_models.values()
+    assert memory == {entry.key: 50}
+    assert entry.model.name == "mini"
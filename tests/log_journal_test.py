@@ -0,0 +1,62 @@
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files  # noqa: F401, imported before strings as in the app
+from python.helpers.log import Log
+
+
+def apply(client: dict, items: list[dict]):
+    # what the web UI does with a poll response
+    for out in items:
+        previous = client.get(out["no"], "")
+        client[out["no"]] = previous[: out.get("content_from", 0)] + out["content"]
+
+
+def test_journal_keeps_one_entry_per_item():
+    log = Log()
+    first = log.log("agent", heading="thinking")
+    second = log.log("tool", heading="tool")
+    for i in range(500):
+        first.stream(content=f"chunk {i} ")
+    assert log.version == 502
+    assert list(log.journal) == [1, 0]
+    assert [out["no"] for out in log.output(start=1)] == [0, 1]
+    assert [out["no"] for out in log.output(start=2)] == [0]
+    assert log.output(start=log.version) == []
+    assert second.version == 2
+
+
+def test_streamed_content_is_sent_as_delta():
+    log = Log()
+    item = log.log("response", heading="reply", content="Hello")
+    client: dict = {}
+    apply(client, log.output(start=0, deltas=True))
+    seen = log.version
+
+    item.stream(content=" world")
+    item.stream(content="!")
+    out = log.output(start=seen, deltas=True)
+    assert out[0]["content"] == " world!" and out[0]["content_from"] == 5
+    apply(client, out)
+    assert client[0] == "Hello world!"
+    seen = log.version
+
+    # content replaced, not appended, is sent whole
+    item.update(content="Bye")
+    out = log.output(start=seen, deltas=True)
+    assert out[0]["content"] == "Bye" and "content_from" not in out[0]
+    apply(client, out)
+    assert client[0] == "Bye"
+
+    # clients without deltas and new clients always get the full content
+    item.stream(content=" now")
+    assert log.output(start=seen)[0]["content"] == "Bye now"
+    assert log.output(start=0, deltas=True)[0]["content"] == "Bye now"
+
+
+def test_reset():
+    log = Log()
+    log.log("info", content="x")
+    guid = log.guid
+    log.reset()
+    assert log.guid != guid and log.version == 0 and not log.journal
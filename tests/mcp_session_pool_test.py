@@ -0,0 +1,115 @@
+import sys, os
+import asyncio
+import time
+from contextlib import AsyncExitStack
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import anyio
+from python.helpers import mcp_session_pool
+from python.helpers.mcp_session_pool import MCPSessionPool
+
+
+class FakeSession:
+    opened = 0
+
+    def __init__(self):
+        FakeSession.opened += 1
+        self.id = FakeSession.opened
+        self.broken = False
+
+    async def send_ping(self):
+        if self.broken:
+            raise anyio.ClosedResourceError()
+
+    async def call(self, delay: float = 0):
+        if self.broken:
+            raise anyio.ClosedResourceError()
+        await asyncio.sleep(delay)
+        return self.id
+
+
+async def fake_factory(stack: AsyncExitStack):
+    return FakeSession()
+
+
+def test_sessions_are_reused_across_event_loops():
+    pool = MCPSessionPool("reuse", fake_factory, size=2)
+    first = asyncio.run(pool.run(lambda s: s.call()))
+    second = asyncio.run(pool.run(lambda s: s.call()))
+    assert first == second
+    stats = pool.get_stats()
+    assert stats["opened"] == 1 and stats["misses"] == 1 and stats["hits"] == 1
+    pool.close()
+
+
+def test_concurrency_is_bounded_by_pool_size():
+    pool = MCPSessionPool("bounded", fake_factory, size=2, max_in_flight=4)
+
+    async def burst():
+        return await asyncio.gather(*[pool.run(lambda s: s.call(0.05)) for _ in range(8)])
+
+    ids = asyncio.run(burst())
+    assert len(set(ids)) == 2
+    assert pool.get_stats()["calls"] == 8
+    pool.close()
+
+
+def test_broken_session_is_replaced():
+    pool = MCPSessionPool("broken", fake_factory, size=1)
+    sessions = []
+
+    async def grab(session):
+        sessions.append(session)
+        return session.id
+
+    first = asyncio.run(pool.run(grab))
+    sessions[0].broken = True
+    # the failed write is retried on a new session
+    second = asyncio.run(pool.run(lambda s: s.call()))
+    assert second != first
+    assert pool.get_stats()["discarded"] == 1
+    pool.close()
+
+
+class TimedSession(FakeSession):
+    """Transport that closes when nothing was read for longer than its read timeout."""
+
+    read_timeout = 0.2
+
+    def __init__(self):
+        super().__init__()
+        self.last_read = time.monotonic()
+
+    def _read(self):
+        if time.monotonic() - self.last_read > self.read_timeout:
+            self.broken = True
+        self.last_read = time.monotonic()
+
+    async def send_ping(self):
+        self._read()
+        await super().send_ping()
+
+    async def call(self, delay: float = 0):
+        self._read()
+        return await super().call(delay)
+
+
+async def timed_factory(stack: AsyncExitStack):
+    return TimedSession()
+
+
+def test_read_timeout_outlives_the_health_interval():
+    assert mcp_session_pool.READ_TIMEOUT > mcp_session_pool.HEALTH_INTERVAL + mcp_session_pool.PING_TIMEOUT
+
+
+def test_idle_session_survives_a_gap_longer_than_its_read_timeout(monkeypatch):
+    # health pings come more often than the read timeout, as with the real constants
+    monkeypatch.setattr(mcp_session_pool, "HEALTH_INTERVAL", TimedSession.read_timeout / 4)
+    pool = MCPSessionPool("idle", timed_factory, size=1)
+    first = asyncio.run(pool.run(lambda s: s.call()))
+    time.sleep(TimedSession.read_timeout * 3)
+    second = asyncio.run(pool.run(lambda s: s.call()))
+    assert first == second
+    stats = pool.get_stats()
+    assert stats["opened"] == 1 and stats["discarded"] == 0 and stats["errors"] == 0
+    pool.close()
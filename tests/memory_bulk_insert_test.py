@@ -0,0 +1,136 @@
+import sys, os
+import asyncio
+
+import faiss
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import memory
+from python.helpers.memory import Memory, MyFaiss
+
+DIM = 4
+
+
+class FakeEmbedder(Embeddings):
+    """Deterministic vectors, texts containing fail_on raise, calls are recorded per batch."""
+
+    def __init__(self, fail_on: str = "", delay: float = 0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.batches: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.fail_on and any(self.fail_on in t for t in texts):
+            raise RuntimeError("embedding failed")
+        self.batches.append(list(texts))
+        return [[float(len(t)), 1.0, float(sum(map(ord, t)) % 7), 0.5] for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.delay)
+        return self.embed_documents(texts)
+
+
+def make_memory(monkeypatch, embedder: FakeEmbedder, saves: list) -> Memory:
+    db = MyFaiss(
+        embedding_function=embedder,
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+    )
+    monkeypatch.setattr(Memory, "_save_db_file", staticmethod(lambda db, subdir: saves.append(db.index.ntotal)))
+    mem = Memory(db, "bulk_test")
+    mem.cfg = {"batch": {"size": 4, "workers": 2}, "persistence": {}}
+    return mem
+
+
+def docs(count: int, prefix: str = "doc") -> list[Document]:
+    return [Document(page_content=f"{prefix} {i}", metadata={}) for i in range(count)]
+
+
+def test_ids_are_unique_against_the_docstore(monkeypatch):
+    saves = []
+    mem = make_memory(monkeypatch, FakeEmbedder(), saves)
+    existing = asyncio.run(mem.insert_documents_bulk(docs(3, "old")))
+
+    # the generator repeats itself and hits ids already stored
+    generated = iter([existing[0], "new1", "new1", existing[2], "new2", "new3"])
+    monkeypatch.setattr(memory.guids, "generate_id", lambda length: next(generated))
+    assert mem._generate_doc_ids(3) == ["new1", "new2", "new3"]
+
+
+def test_documents_land_in_the_index_once(monkeypatch):
+    saves = []
+    embedder = FakeEmbedder(delay=0.01)
+    mem = make_memory(monkeypatch, embedder, saves)
+    batch = docs(18)
+
+    ids = asyncio.run(mem.insert_documents_bulk(batch))
+    assert len(set(ids)) == 18
+    assert [doc.metadata["id"] for doc in batch] == ids
+    assert all(doc.metadata["area"] == Memory.Area.MAIN.value for doc in batch)
+
+    assert mem.db.index.ntotal == 18
+    assert sorted(mem.db.index_to_docstore_id.values()) == sorted(ids)
+    assert [doc.page_content for doc in mem.db.get_by_ids(ids)] == [doc.page_content for doc in batch]
+    assert sorted(len(b) for b in embedder.batches) == [2, 4, 4, 4, 4]
+    assert saves == [18]  # persisted once, at the end
+
+
+def test_failed_batch_persists_the_inserted_ones(monkeypatch):
+    saves = []
+    mem = make_memory(monkeypatch, FakeEmbedder(fail_on="doc 5", delay=0.01), saves)
+    batch = docs(12)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(mem.insert_documents_bulk(batch, workers=1))
+    # the failed batch is skipped, the batches before and after it are stored and saved
+    stored = {doc.page_content for doc in mem.db.get_all_docs().values()}
+    assert stored == {f"doc {i}" for i in [0, 1, 2, 3, 8, 9, 10, 11]}
+    assert saves == [8]
+
+
+def test_preload_saves_only_when_knowledge_changed(monkeypatch, tmp_path):
+    saves = []
+    mem = make_memory(monkeypatch, FakeEmbedder(), saves)
+    monkeypatch.setattr(memory, "abs_db_dir", lambda subdir: str(tmp_path))
+    knowledge = {}
+
+    def preload_folders(log_item, kn_dirs, index):
+        # stands in for knowledge_import, reports each file with its state
+        for file, (state, texts) in knowledge.items():
+            index[file] = {**index.get(file, {}), "file": file, "checksum": str(texts), "state": state}
+            if state == "changed":
+                index[file]["documents"] = [Document(page_content=t, metadata={}) for t in texts]
+        return index
+
+    monkeypatch.setattr(mem, "_preload_knowledge_folders", preload_folders)
+
+    def preload():
+        asyncio.run(mem.preload_knowledge(None, [], "bulk_test"))
+
+    knowledge["a.md"] = ("changed", ["alpha one", "alpha two"])
+    knowledge["b.md"] = ("changed", ["beta"])
+    preload()
+    assert saves == [3]
+
+    knowledge["a.md"] = ("original", [])
+    knowledge["b.md"] = ("original", [])
+    preload()
+    preload()
+    assert saves == [3]  # nothing changed, nothing written
+
+    knowledge["b.md"] = ("removed", [])
+    preload()
+    assert saves == [3, 2]
+    del knowledge["b.md"]
+    preload()
+    assert saves == [3, 2]
@@ -0,0 +1,103 @@
+import sys, os
+import asyncio
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import memory_persistence
+
+
+def _read(folder: str, name: str) -> str:
+    with open(os.path.join(folder, name), "rb") as f:
+        return f.read().decode()
+
+
+def test_burst_is_written_once_after_delay(tmp_path):
+    state = {"v": 0}
+    snapshot = lambda: {"index.bin": str(state["v"]).encode()}
+    flushes = memory_persistence.get_stats()["flushes"]
+
+    for i in range(5):
+        with memory_persistence.writing("burst"):
+            state["v"] = i
+        memory_persistence.mark_dirty("burst", str(tmp_path), snapshot, 0.2, 5)
+    assert memory_persistence.is_dirty("burst")
+    assert not os.path.exists(tmp_path / "index.bin")
+
+    time.sleep(0.6)
+    assert not memory_persistence.is_dirty("burst")
+    assert _read(str(tmp_path), "index.bin") == "4"
+    assert memory_persistence.get_stats()["flushes"] == flushes + 1
+    # no temp files left behind
+    assert os.listdir(tmp_path) == ["index.bin"]
+
+
+def test_flush_all_writes_pending(tmp_path):
+    snapshot = lambda: {"a": b"1", "b": b"2"}
+    memory_persistence.mark_dirty("forced", str(tmp_path), snapshot, 100, 100)
+    assert memory_persistence.flush_all() >= 1
+    assert _read(str(tmp_path), "a") == "1"
+    assert _read(str(tmp_path), "b") == "2"
+    assert not memory_persistence.is_dirty("forced")
+
+
+def test_failed_snapshot_stays_dirty(tmp_path):
+    def snapshot():
+        raise RuntimeError("boom")
+
+    memory_persistence.mark_dirty("failing", str(tmp_path), snapshot, 100, 100)
+    assert not memory_persistence.flush("failing")
+    assert memory_persistence.is_dirty("failing")
+    # replace the snapshot so the atexit flush does not fail again
+    memory_persistence.mark_dirty("failing", str(tmp_path), lambda: {}, 100, 100)
+    memory_persistence.flush("failing")
+
+
+def test_snapshot_waits_for_running_mutation(tmp_path):
+    state = {"a": 0, "b": 0}
+    snapshot = lambda: {"state": f"{state['a']},{state['b']}".encode()}
+    memory_persistence.mark_dirty("consistent", str(tmp_path), snapshot, 100, 100)
+    mutating = threading.Event()
+
+    def mutate():
+        with memory_persistence.writing("consistent"):
+            mutating.set()
+            state["a"] = 1
+            time.sleep(0.2)
+            state["b"] = 1
+
+    writer = threading.Thread(target=mutate)
+    writer.start()
+    mutating.wait()
+    assert memory_persistence.flush("consistent")
+    writer.join()
+    assert _read(str(tmp_path), "state") == "1,1"
+
+
+def test_async_writer_does_not_block_loop_during_snapshot(tmp_path):
+    def snapshot():
+        time.sleep(0.3)
+        return {"x": b"1"}
+
+    memory_persistence.mark_dirty("slow", str(tmp_path), snapshot, 100, 100)
+    flusher = threading.Thread(target=memory_persistence.flush, args=("slow",))
+    flusher.start()
+    time.sleep(0.05)  # snapshot is running
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        async with memory_persistence.awriting("slow"):
+            pass
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 5  # the loop kept running while the writer waited
+    flusher.join()
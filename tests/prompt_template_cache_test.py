@@ -0,0 +1,67 @@
+import sys, os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+
+PLUGIN = """from python.helpers.files import VariablesPlugin
+
+class Variables(VariablesPlugin):
+    def get_variables(self, file, backup_dirs=None, **kwargs):
+        return {"tools": "tool list"}
+"""
+
+
+def write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    # make the change visible even on filesystems with coarse mtimes
+    stamp = time.time_ns() + 10_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+def stats_delta(before):
+    after = files.prompt_template_stats()
+    return after["loads"] - before["loads"], after["hits"] - before["hits"]
+
+
+def test_cached_template_is_reused(tmp_path):
+    default = tmp_path / "default"
+    default.mkdir()
+    write(default / "main.md", "Hello {{name}}, use {{tools}}\n{{ include 'part.md' }}")
+    write(default / "main.py", PLUGIN)
+    write(default / "part.md", "part for {{name}}")
+    dirs = [str(default)]
+
+    files.clear_prompt_templates()
+    before = files.prompt_template_stats()
+    for name in ("Ann", "Bob"):
+        text = files.read_prompt_file("main.md", dirs, name=name)
+        assert text == f"Hello {name}, use tool list\npart for {name}"
+    # main.md and the include are loaded once, then served from the cache
+    assert stats_delta(before) == (2, 2)
+
+
+def test_template_invalidated_by_changes(tmp_path):
+    profile, default = tmp_path / "profile", tmp_path / "default"
+    profile.mkdir()
+    default.mkdir()
+    write(default / "main.md", "default {{x}}")
+    dirs = [str(profile), str(default)]
+
+    files.clear_prompt_templates()
+    assert files.read_prompt_file("main.md", dirs, x=1) == "default 1"
+    write(default / "main.md", "changed {{x}}")
+    assert files.read_prompt_file("main.md", dirs, x=2) == "changed 2"
+    # a profile override created later takes precedence
+    write(profile / "main.md", "profile {{x}}")
+    os.utime(profile, ns=(time.time_ns() + 20_000_000_000,) * 2)
+    assert files.read_prompt_file("main.md", dirs, x=3) == "profile 3"
+
+
+def test_parse_file_json_template(tmp_path):
+    write(tmp_path / "msg.md", '```json\n{"value": {{value}}}\n```')
+    files.clear_prompt_templates()
+    assert files.parse_file("msg.md", [str(tmp_path)], value=[1, 2]) == {"value": [1, 2]}
+    assert files.parse_file("msg.md", [str(tmp_path)], value="x") == {"value": "x"}
+    assert files.prompt_template_stats()["hits"] >= 1
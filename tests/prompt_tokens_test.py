@@ -0,0 +1,144 @@
+import sys, os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+import models
+from agent import Agent, ContextWindow, LoopData
+from python.helpers import history, tokens
+from python.helpers.log import Log
+from python.api.ctx_window_get import GetCtxWindow
+
+SYSTEM = "You are a careful assistant working on a software project. " * 20
+
+
+class FakeAgent:
+    """Just what prepare_prompt needs, extensions are replaced by a single hook."""
+
+    DATA_NAME_CTX_WINDOW = Agent.DATA_NAME_CTX_WINDOW
+    prepare_prompt = Agent.prepare_prompt
+
+    def __init__(self, extension=None):
+        self.context = SimpleNamespace(log=Log())
+        self.history = history.History(self)
+        self.data = {}
+        self.loop_data = LoopData()
+        self.extension = extension
+
+    async def call_extensions(self, extension_point, **kwargs):
+        if extension_point == "message_loop_prompts_after" and self.extension:
+            self.extension(kwargs["loop_data"])
+
+    async def get_system_prompt(self, loop_data):
+        return [SYSTEM]
+
+    def read_prompt(self, file, **kwargs):
+        return f"Extras: {kwargs['extras']}"
+
+    def get_data(self, field):
+        return self.data.get(field, None)
+
+    def set_data(self, field, value):
+        self.data[field] = value
+
+
+def make_agent(extension=None):
+    agent = FakeAgent(extension)
+    for i in range(12):
+        agent.history.add_message(False, f"Please look at module {i} and explain what it does in detail.")
+        agent.history.add_message(True, f"Module {i} parses the configuration and validates every field. " * 5)
+        if i % 4 == 3:
+            agent.history.new_topic()
+    agent.loop_data.extras_persistent["memories"] = "The project uses tabs for indentation."
+    return agent
+
+
+def prepare(agent):
+    return asyncio.run(agent.prepare_prompt(agent.loop_data))
+
+
+def test_prompt_tokens_match_the_formatted_prompt():
+    agent = make_agent()
+    prepare(agent)
+    window = agent.get_data(Agent.DATA_NAME_CTX_WINDOW)
+    assert isinstance(window, ContextWindow)
+    assert window.tokens == agent.loop_data.prompt_tokens
+    formatted = tokens.approximate_tokens(window.text)
+    # counted per part instead of on the formatted text, role labels and separators differ
+    assert abs(agent.loop_data.prompt_tokens - formatted) <= formatted * (tokens.APPROX_BUFFER - 1)
+
+
+def test_extension_replacing_history_is_counted():
+    replacement = [history.OutputMessage(ai=False, content="Only this short summary is sent.")]
+
+    def replace(loop_data):
+        loop_data.history_output = replacement
+
+    full, replaced = make_agent(), make_agent(replace)
+    prepare(full)
+    prepare(replaced)
+    extras_tokens = full.loop_data.prompt_tokens - tokens.approximate_tokens(SYSTEM) - full.history.get_tokens()
+    assert replaced.loop_data.prompt_tokens == (
+        tokens.approximate_tokens(SYSTEM)
+        + tokens.approximate_tokens(history.output_text(replacement))
+        + extras_tokens
+    )
+    assert "Only this short summary" in replaced.get_data(Agent.DATA_NAME_CTX_WINDOW).text
+
+
+def test_extension_extending_history_is_counted():
+    added = history.OutputMessage(ai=False, content="An extra instruction added by an extension. " * 30)
+
+    def extend(loop_data):
+        loop_data.history_output.append(added)
+
+    plain, extended = make_agent(), make_agent(extend)
+    prepare(plain)
+    prepare(extended)
+    grown = extended.loop_data.prompt_tokens - plain.loop_data.prompt_tokens
+    assert grown >= tokens.approximate_tokens(added["content"]) * 0.9
+
+
+def test_ctx_window_get_serves_windows_and_legacy_dicts():
+    agent = make_agent()
+    prepare(agent)
+    context = SimpleNamespace(streaming_agent=None, agent0=agent)
+    handler = GetCtxWindow(None, None)  # type: ignore
+    handler.use_context = lambda ctxid: context  # type: ignore
+
+    result = asyncio.run(handler.process({"context": "ctx"}, None))  # type: ignore
+    window = agent.get_data(Agent.DATA_NAME_CTX_WINDOW)
+    assert result == {"content": window.text, "tokens": window.tokens}
+    assert SYSTEM.strip() in result["content"]
+
+    agent.set_data(Agent.DATA_NAME_CTX_WINDOW, {"text": "saved by an older version", "tokens": 7})
+    result = asyncio.run(handler.process({"context": "ctx"}, None))  # type: ignore
+    assert result == {"content": "saved by an older version", "tokens": 7}
+
+    agent.set_data(Agent.DATA_NAME_CTX_WINDOW, None)
+    assert asyncio.run(handler.process({"context": "ctx"}, None)) == {"content": "", "tokens": 0}  # type: ignore
+
+
+@pytest.mark.parametrize("input_tokens", [None, 1234])
+def test_unified_call_counts_given_input_tokens(monkeypatch, input_tokens):
+    async def acompletion(model, messages, stream, **kwargs):
+        return {"choices": [{"message": {"content": "done"}}]}
+
+    monkeypatch.setattr(models, "acompletion", acompletion)
+    name = f"chat-{input_tokens}"
+    conf = models.ModelConfig(type=models.ModelType.CHAT, provider="test", name=name, limit_requests=100)
+    model = models.LiteLLMChatWrapper(model=name, provider="test", model_config=conf)
+    messages = [HumanMessage(content="Summarize the module. " * 50)]
+
+    response, _ = asyncio.run(model.unified_call(messages=messages, input_tokens=input_tokens))
+    assert response == "done"
+    limiter = models.rate_limiters[f"test\\{name}"]
+    counted = asyncio.run(limiter.get_total("input"))
+    if input_tokens is None:
+        assert counted > 0  # estimated from the converted messages
+    else:
+        assert counted == input_tokens
@@ -0,0 +1,55 @@
+import sys, os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qdrant_client import AsyncQdrantClient, models as qmodels
+from python.helpers.qdrant_client import SPARSE_VECTOR, hybrid_query, to_sparse_vector
+
+
+async def make_collection():
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        "memories",
+        vectors_config=qmodels.VectorParams(size=2, distance=qmodels.Distance.COSINE),
+        sparse_vectors_config={SPARSE_VECTOR: qmodels.SparseVectorParams()},
+    )
+    await client.upsert("memories", points=[
+        qmodels.PointStruct(id=1, vector={"": [1, 0], SPARSE_VECTOR: to_sparse_vector({5: 1.0})}),
+        # shares only a term with the query, dense similarity 0
+        qmodels.PointStruct(id=2, vector={"": [0, 1], SPARSE_VECTOR: to_sparse_vector({7: 1.0})}),
+        qmodels.PointStruct(id=3, vector={"": [0.9, 0.1], SPARSE_VECTOR: to_sparse_vector({5: 1.0})}),
+    ])
+    return client
+
+
+def test_fusion_returns_keyword_hits_without_threshold():
+    async def run():
+        client = await make_collection()
+        return [p.id for p in await hybrid_query(client, "memories", [1, 0], {7: 1.0}, 5)]
+
+    assert sorted(asyncio.run(run())) == [1, 2, 3]
+
+
+def test_threshold_applies_to_fused_results():
+    async def run():
+        client = await make_collection()
+        points = await hybrid_query(client, "memories", [1, 0], {7: 1.0}, 5, score_threshold=0.6)
+        limited = await hybrid_query(client, "memories", [1, 0], {7: 1.0}, 1, score_threshold=0.6)
+        return [p.id for p in points], [p.id for p in limited]
+
+    points, limited = asyncio.run(run())
+    assert sorted(points) == [1, 3]
+    assert limited == [points[0]]
+
+
+def test_fused_results_carry_dense_similarity():
+    async def run():
+        client = await make_collection()
+        return await hybrid_query(client, "memories", [1, 0], {7: 1.0}, 5)
+
+    scores = {p.id: p.score for p in asyncio.run(run())}
+    assert scores[1] == pytest.approx(1.0)
+    assert scores[2] == pytest.approx(0.0, abs=1e-6)
+    assert scores[3] == pytest.approx(0.9 / (0.9**2 + 0.1**2) ** 0.5)
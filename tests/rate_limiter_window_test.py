@@ -0,0 +1,134 @@
+import sys, os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.rate_limiter import RateLimiter
+
+
+def test_totals_expire_with_window():
+    async def run():
+        limiter = RateLimiter(seconds=0.3, requests=10)
+        limiter.add(requests=2, input=100)
+        limiter.add(requests=1)
+        assert await limiter.get_total("requests") == 3
+        assert await limiter.get_total("input") == 100
+        await asyncio.sleep(0.35)
+        assert await limiter.get_total("requests") == 0
+        assert await limiter.get_total("missing") == 0
+
+    asyncio.run(run())
+
+
+def test_wakes_up_when_window_frees_not_on_a_poll():
+    async def run():
+        limiter = RateLimiter(seconds=0.3, requests=2)
+        await limiter.acquire(requests=1)
+        await limiter.acquire(requests=1)
+        started = time.monotonic()
+        await limiter.acquire(requests=1)
+        waited = time.monotonic() - started
+        assert 0.25 < waited < 0.6
+        assert await limiter.get_total("requests") == 1
+        metrics = limiter.metrics()
+        assert metrics["keys"]["requests"]["waits"] == 1
+        assert metrics["keys"]["requests"]["wait_histogram"]["<=0.5s"] == 1
+        assert metrics["admitted"] == 3
+
+    asyncio.run(run())
+
+
+def test_waiters_are_admitted_in_order():
+    async def run():
+        limiter = RateLimiter(seconds=0.2, requests=1)
+        await limiter.acquire(requests=1)
+        order = []
+
+        async def caller(i):
+            await limiter.acquire(requests=1)
+            order.append(i)
+
+        await asyncio.gather(*(caller(i) for i in range(4)))
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+
+
+def test_callback_can_skip_waiting():
+    messages = []
+
+    async def callback(msg, key, total, limit):
+        messages.append((key, total, limit))
+        return True
+
+    async def run():
+        limiter = RateLimiter(seconds=60, input=100)
+        await limiter.acquire(input=80)
+        started = time.monotonic()
+        await limiter.acquire(callback, input=50)
+        assert time.monotonic() - started < 0.1
+        assert await limiter.get_total("input") == 130
+
+    asyncio.run(run())
+    assert messages == [("input", 80, 100)]
+
+
+def test_waiters_on_other_threads_share_the_queue():
+    limiter = RateLimiter(seconds=0.2, requests=1)
+    asyncio.run(limiter.acquire(requests=1))
+    done = []
+
+    def worker(i):
+        asyncio.run(limiter.acquire(requests=1))
+        done.append(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert sorted(done) == [0, 1, 2]
+    # one admission per window, each waiter woken once its predecessor is in
+    assert 0.5 < time.monotonic() - started < 1.5
+    assert limiter.metrics()["waiting"] == 0
+
+
+def test_waiter_is_admitted_while_the_head_loop_is_blocked():
+    # a sync embed on a loop thread waits for an acquire on a helper thread,
+    # while a task of that same blocked loop is the head of the queue
+    limiter = RateLimiter(seconds=0.2, requests=1)
+
+    async def run():
+        await limiter.acquire(requests=1)
+        head = asyncio.create_task(limiter.acquire(requests=1))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(asyncio.run, limiter.acquire(requests=1)).result(timeout=5)
+        blocked_for = time.monotonic() - started
+        await head
+        return blocked_for
+
+    blocked_for = asyncio.run(run())
+    # the head is admitted by the helper's timer at ~0.2 s, the helper one window later
+    assert 0.3 < blocked_for < 1.0
+    assert limiter.metrics()["waiting"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        limiter = RateLimiter(seconds=0.2, requests=1)
+        await limiter.acquire(requests=1)
+        first = asyncio.create_task(limiter.acquire(requests=1))
+        second = asyncio.create_task(limiter.acquire(requests=1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        started = time.monotonic()
+        await second
+        assert time.monotonic() - started < 0.4
+        assert limiter.metrics()["waiting"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+# Masks 150 secrets in MB-sized logs with the compiled matcher and the previous str.replace loop,
+# and streams the same log in small chunks through the new and the previous streaming filter.
+# Run manually: python tests/secrets_mask_benchmark.py
+import sys, os
+import random
+import string
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.secrets import SecretsMatcher, StreamingSecretsFilter, alias_for_key
+
+SECRET_COUNT = 150
+LOG_SIZES = (1_000_000, 4_000_000)
+LINE_COUNT = 20_000
+CHUNK = 16
+
+
+def make_secrets(rng: random.Random) -> dict:
+    alphabet = string.ascii_letters + string.digits
+    return {f"KEY_{i}": "".join(rng.choice(alphabet) for _ in range(rng.randint(8, 40))) for i in range(SECRET_COUNT)}
+
+
+def make_log(rng: random.Random, secrets: dict, size: int) -> str:
+    words = ["agent", "tool", "response", "memory", "error", "Traceback", "json", "http", "200", "user"]
+    values = list(secrets.values())
+    parts, length = [], 0
+    while length < size:
+        word = rng.choice(values) if rng.random() < 0.002 else rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def legacy_mask(secrets: dict, text: str) -> str:
+    # the previous SecretsManager.mask_values body
+    for key, value in sorted(secrets.items(), key=lambda x: len(x[1]), reverse=True):
+        if value and len(value.strip()) >= 4:
+            text = text.replace(value, alias_for_key(key))
+    return text
+
+
+class LegacyStreamingFilter:
+    # the previous StreamingSecretsFilter: prefix set, full rescan of the pending buffer per chunk
+    def __init__(self, key_to_value: dict, min_trigger: int = 3):
+        self.value_to_key = {v: k for k, v in key_to_value.items() if v}
+        self.prefixes = {v[:i] for v in self.value_to_key for i in range(min_trigger, len(v) + 1)}
+        self.max_len = max((len(v) for v in self.value_to_key), default=0)
+        self.min_trigger = min_trigger
+        self.pending = ""
+
+    def process_chunk(self, chunk: str) -> str:
+        self.pending += chunk
+        for val in sorted(self.value_to_key, key=len, reverse=True):
+            self.pending = self.pending.replace(val, alias_for_key(self.value_to_key[val]))
+        hold = 0
+        for length in range(min(len(self.pending), self.max_len), self.min_trigger - 1, -1):
+            if self.pending[-length:] in self.prefixes:
+                hold = length
+                break
+        emit, self.pending = (self.pending[:-hold], self.pending[-hold:]) if hold else (self.pending, "")
+        return emit
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def stream(filter_instance, text: str) -> str:
+    return "".join(filter_instance.process_chunk(text[i : i + CHUNK]) for i in range(0, len(text), CHUNK))
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    secrets = make_secrets(rng)
+    matcher, build = timed(SecretsMatcher, secrets, 4)
+    print(f"{SECRET_COUNT} secrets, matcher built in {build * 1000:.1f}ms")
+
+    for size in LOG_SIZES:
+        log = make_log(rng, secrets, size)
+        new, new_time = timed(matcher.mask, log)
+        old, old_time = timed(legacy_mask, secrets, log)
+        assert new == old
+        print(f"{size / 1e6:.0f} MB log: matcher {new_time * 1000:.1f}ms, str.replace loop {old_time * 1000:.1f}ms")
+
+    # log updates mask many short strings (headings, kvps)
+    lines = make_log(rng, secrets, LINE_COUNT * 60).split(" ")[:LINE_COUNT]
+    _, new_time = timed(lambda: [matcher.mask(line) for line in lines])
+    _, old_time = timed(lambda: [legacy_mask(secrets, line) for line in lines])
+    print(f"{LINE_COUNT} short strings: matcher {new_time * 1000:.1f}ms, str.replace loop {old_time * 1000:.1f}ms")
+
+    log = make_log(rng, secrets, LOG_SIZES[0])
+    streaming = StreamingSecretsFilter(secrets, matcher=SecretsMatcher(secrets, 0))
+    new, new_time = timed(stream, streaming, log)
+    old, old_time = timed(stream, LegacyStreamingFilter(secrets), log)
+    assert new == old
+    print(f"1 MB stream in {CHUNK}-char chunks: automaton {new_time * 1000:.1f}ms, legacy filter {old_time * 1000:.1f}ms")
@@ -0,0 +1,52 @@
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.secrets import SecretsManager, SecretsMatcher, StreamingSecretsFilter
+
+SECRETS = {"SHORT": "abc", "LONG": "abcdef", "OTHER": "bcd", "TOKEN": "tok-123456"}
+
+
+def test_mask_prefers_longest_value():
+    matcher = SecretsMatcher(SECRETS)
+    assert matcher.mask("x abcdef y abc z bcd") == "x §§secret(LONG) y §§secret(SHORT) z §§secret(OTHER)"
+    assert matcher.mask("<abc>", "<secret>{key}</secret>") == "<<secret>SHORT</secret>>"
+    assert matcher.mask("nothing here") == "nothing here"
+    # regex metacharacters in values are literal
+    assert SecretsMatcher({"RE": "a.b*c"}).mask("a.b*c axbbc") == "§§secret(RE) axbbc"
+
+
+def test_long_text_search_matches_regex():
+    matcher = SecretsMatcher(SECRETS)
+    text = " ".join(["abcdef", "xabcd", "bcdabc", "tok-123456", "plain"] * 50)
+    short = matcher.mask(text)
+    matcher.LONG_TEXT = 0
+    assert matcher.mask(text) == short
+
+
+def test_min_length():
+    matcher = SecretsMatcher(SECRETS, min_length=4)
+    assert matcher.mask("abc abcdef") == "abc §§secret(LONG)"
+    assert SecretsMatcher({}).mask("abc") == "abc"
+
+
+def test_streaming_holds_partial_secrets():
+    stream = StreamingSecretsFilter(SECRETS)
+    out = [stream.process_chunk(chunk) for chunk in ["key: tok", "-12", "3456 and", " bcd", "ef end tok-1"]]
+    out.append(stream.finalize())
+    assert "".join(out) == "key: §§secret(TOKEN) and §§secret(OTHER)ef end ***"
+    # the partial token prefix is never emitted
+    assert out[:3] == ["key: ", "", "§§secret(TOKEN) and"]
+
+
+def test_manager_rebuilds_matcher_on_change(tmp_path):
+    path = str(tmp_path / "secrets.env")
+    with open(path, "w") as f:
+        f.write('API_KEY="secret-one"\n')
+    manager = SecretsManager(path)
+    assert manager.mask_values("use secret-one") == "use §§secret(API_KEY)"
+    assert manager.get_matcher() is manager.get_matcher()
+
+    manager.save_secrets('API_KEY="secret-two"\n')
+    # not registered through get_instance, so not reached by the global invalidation
+    manager.clear_cache()
+    assert manager.mask_values("secret-one secret-two") == "secret-one §§secret(API_KEY)"
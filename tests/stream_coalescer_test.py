@@ -0,0 +1,143 @@
+import sys, os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.stream_coalescer import StreamCoalescer
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.0, fail_on: str = ""):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.batches: list[tuple[str, str]] = []
+
+    async def __call__(self, chunk: str, full: str):
+        if self.fail_on and self.fail_on in chunk:
+            raise ValueError(chunk)
+        await asyncio.sleep(self.delay)
+        self.batches.append((chunk, full))
+
+
+async def feed(stream: StreamCoalescer, chunks: list[str], pause: float = 0.0):
+    full = ""
+    for chunk in chunks:
+        full += chunk
+        await stream.add(chunk, full)
+        await asyncio.sleep(pause)
+    return full
+
+
+def test_first_chunk_passes_through_and_the_rest_is_batched():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler, window_ms=1000)
+        full = await feed(stream, ["a", "b", "c", "d"])
+        assert handler.batches == [("a", "a")]
+        await stream.flush()
+        return handler, full
+
+    handler, full = asyncio.run(run())
+    assert handler.batches == [("a", "a"), ("bcd", full)]
+
+
+def test_window_zero_passes_every_chunk():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler)
+        await feed(stream, ["a", "b", "c"])
+        return handler
+
+    assert [chunk for chunk, _ in asyncio.run(run()).batches] == ["a", "b", "c"]
+
+
+def test_max_chars_flushes_before_the_window():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler, window_ms=1000, max_chars=4)
+        await feed(stream, ["start", "ab", "cd", "ef", "g"])
+        assert [chunk for chunk, _ in handler.batches] == ["start", "abcd"]
+        await stream.flush()
+        return handler
+
+    assert [chunk for chunk, _ in asyncio.run(run()).batches] == ["start", "abcd", "efg"]
+
+
+def test_timer_flushes_without_a_new_chunk():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler, window_ms=30)
+        full = await feed(stream, ["a", "b", "c"])
+        await asyncio.sleep(0.1)  # the stream stalls, nothing calls add or flush
+        flushed = list(handler.batches)
+        await stream.flush()
+        return flushed, handler, full
+
+    flushed, handler, full = asyncio.run(run())
+    assert flushed == [("a", "a"), ("bc", full)]
+    assert handler.batches == flushed
+
+
+def test_batches_stay_in_order_with_a_slow_handler():
+    chunks = [f"{i} " for i in range(40)]
+
+    async def run():
+        handler = Recorder(delay=0.005)
+        stream = StreamCoalescer(handler, window_ms=10, max_chars=12)
+        full = await feed(stream, chunks, pause=0.002)
+        await stream.flush()
+        return handler, full
+
+    handler, full = asyncio.run(run())
+    assert "".join(chunk for chunk, _ in handler.batches) == full
+    # each batch carries the full text up to and including itself
+    sent = ""
+    for chunk, batch_full in handler.batches:
+        sent += chunk
+        assert batch_full == sent
+    assert 1 < len(handler.batches) < len(chunks)
+
+
+def test_final_flush_sends_the_rest_once():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler, window_ms=1000)
+        full = await feed(stream, ["a", "b"])
+        await stream.flush()
+        await stream.flush()
+        await asyncio.sleep(0)
+        return handler, full
+
+    handler, full = asyncio.run(run())
+    assert handler.batches == [("a", "a"), ("b", full)]
+
+
+def test_cancel_keeps_the_buffer():
+    async def run():
+        handler = Recorder()
+        stream = StreamCoalescer(handler, window_ms=20)
+        await feed(stream, ["a", "b"])
+        stream.cancel()
+        await asyncio.sleep(0.05)
+        assert handler.batches == [("a", "a")]
+        await stream.flush()
+        return handler
+
+    assert asyncio.run(run()).batches == [("a", "a"), ("b", "ab")]
+
+
+def test_timer_errors_surface_on_the_next_call():
+    async def run():
+        handler = Recorder(fail_on="stop")
+        stream = StreamCoalescer(handler, window_ms=20)
+        await feed(stream, ["a", "stop"])
+        await asyncio.sleep(0.05)
+        with pytest.raises(ValueError):
+            await stream.add("c", "astopc")
+        # raised once, the stream keeps working
+        await stream.add("d", "astopd")
+        await stream.flush()
+        return handler
+
+    assert asyncio.run(run()).batches == [("a", "a"), ("d", "astopd")]
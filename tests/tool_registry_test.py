@@ -0,0 +1,142 @@
+import sys, os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import files
+from python.helpers import tool_registry
+from agent import Agent
+from python.tools.unknown import Unknown
+
+TOOL = '''
+from python.helpers.tool import Tool, Response
+
+
+class {name}(Tool):
+    LABEL = "{label}"
+
+    async def execute(self, **kwargs):
+        return Response(message=self.LABEL, break_loop=False)
+'''
+
+
+def bump(path, seconds=1):
+    # mtimes have coarse resolution on some filesystems, make the change visible
+    stamp = time.time_ns() + seconds * 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+def write_tool(folder, name, label, seconds=1):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}.py")
+    with open(path, "w") as f:
+        f.write(TOOL.format(name=name.title().replace("_", ""), label=label))
+    bump(path, seconds)
+    bump(folder, seconds)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_registry.files, "get_abs_path", lambda *paths: os.path.join(str(tmp_path), *paths))
+    monkeypatch.setattr(tool_registry, "_stats", {key: 0 for key in tool_registry._stats})
+    tool_registry.clear_cache()
+    defaults = os.path.join(str(tmp_path), tool_registry.DEFAULT_TOOLS_FOLDER)
+    profile = os.path.join(str(tmp_path), "agents", "dev", "tools")
+    os.makedirs(defaults)
+    yield defaults, profile
+    tool_registry.clear_cache()
+
+
+def test_classes_are_cached_until_the_file_changes(tree):
+    defaults, _ = tree
+    path = write_tool(defaults, "search", "first")
+
+    cls = tool_registry.get_tool_class("search")
+    assert cls.LABEL == "first"
+    assert tool_registry.get_tool_class("search") is cls
+    stats = tool_registry.get_stats()
+    assert (stats["loads"], stats["hits"], stats["reloads"], stats["cached"]) == (1, 1, 0, 1)
+
+    write_tool(defaults, "search", "second", seconds=2)
+    assert tool_registry.get_tool_class("search").LABEL == "second"
+    assert tool_registry.get_stats()["reloads"] == 1
+
+    # an unchanged mtime keeps the cached class even if the content differs
+    stamp = os.stat(path).st_mtime_ns
+    with open(path, "w") as f:
+        f.write(TOOL.format(name="Search", label="third"))
+    os.utime(path, ns=(stamp, stamp))
+    assert tool_registry.get_tool_class("search").LABEL == "second"
+
+
+def test_folder_changes_add_and_remove_tools(tree):
+    defaults, _ = tree
+    write_tool(defaults, "search", "search")
+    assert tool_registry.get_tool_class("browse") is None
+
+    write_tool(defaults, "browse", "browse", seconds=2)
+    assert tool_registry.get_tool_class("browse").LABEL == "browse"
+
+    os.remove(os.path.join(defaults, "browse.py"))
+    bump(defaults, 3)
+    assert tool_registry.get_tool_class("browse") is None
+    assert tool_registry.get_tool_class("search").LABEL == "search"
+
+
+def test_profile_tools_override_defaults(tree):
+    defaults, profile = tree
+    write_tool(defaults, "search", "default search")
+    write_tool(defaults, "browse", "default browse")
+    write_tool(profile, "search", "profile search")
+
+    assert tool_registry.get_tool_class("search", "dev").LABEL == "profile search"
+    assert tool_registry.get_tool_class("browse", "dev").LABEL == "default browse"
+    assert tool_registry.get_tool_class("search").LABEL == "default search"
+    # a profile without its own tools gets the defaults
+    assert tool_registry.get_tool_class("search", "other").LABEL == "default search"
+
+
+def test_broken_profile_tool_falls_back_to_the_default(tree):
+    defaults, profile = tree
+    write_tool(defaults, "search", "default search")
+    os.makedirs(profile)
+    with open(os.path.join(profile, "search.py"), "w") as f:
+        f.write("this is not python")
+
+    assert tool_registry.get_tool_class("search", "dev").LABEL == "default search"
+    assert tool_registry.get_stats()["errors"] == 1
+    # the failure is cached until the file changes
+    tool_registry.get_tool_class("search", "dev")
+    assert tool_registry.get_stats()["errors"] == 1
+
+
+def test_index_tools_counts_resolved_classes(tree):
+    defaults, profile = tree
+    write_tool(defaults, "search", "default search")
+    write_tool(defaults, "browse", "default browse")
+    write_tool(profile, "search", "profile search")
+    with open(os.path.join(defaults, "broken.py"), "w") as f:
+        f.write("this is not python")
+    bump(defaults, 2)
+
+    assert tool_registry.index_tools("dev") == 3
+    assert tool_registry.get_stats()["loads"] == 4
+    tool_registry.get_tool_class("search", "dev")
+    assert tool_registry.get_stats()["loads"] == 4
+
+
+def test_missing_tool_falls_back_to_unknown(tree):
+    defaults, _ = tree
+    write_tool(defaults, "search", "search")
+    agent = SimpleNamespace(config=SimpleNamespace(profile="dev"))
+
+    assert tool_registry.get_tool_class("missing", "dev") is None
+    assert tool_registry.get_stats()["not_found"] == 1
+
+    tool = Agent.get_tool(agent, "missing", None, {}, "", None)  # type: ignore
+    assert type(tool) is Unknown
+    assert tool.name == "missing"
+    assert Agent.get_tool(agent, "search", None, {}, "", None).LABEL == "search"  # type: ignore
@@ -0,0 +1,70 @@
+import sys, os
+import asyncio
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.unity_qdrant_enhanced import UnityQdrantEnhanced, UnityCollectionType
+from python.helpers.unity_context_engine import UnityContextEngine
+
+DELAY = 0.05
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    async def aembed_query(self, text):
+        self.texts.append(text)
+        return [0.1, 0.2]
+
+
+def make_engine():
+    embedder = FakeEmbedder()
+    qdrant = UnityQdrantEnhanced(embedder=embedder)
+    searches = []
+
+    async def search_unity(query, collection_types=None, query_embedding=None, **kwargs):
+        searches.append((collection_types, query_embedding))
+        await asyncio.sleep(DELAY)
+        return []
+
+    qdrant.search_unity = search_unity
+    return UnityContextEngine(qdrant, "p1"), embedder, searches
+
+
+def test_sub_queries_run_concurrently_with_one_embedding():
+    engine, embedder, searches = make_engine()
+    query = "NullReferenceException in PlayerController"
+
+    start = time.perf_counter()
+    context = asyncio.run(engine.get_context(query))
+    elapsed = time.perf_counter() - start
+
+    # primary search, errors, solutions and tasks, each one round-trip of DELAY
+    assert len(searches) == 4
+    assert elapsed < DELAY * 3
+    assert embedder.texts == [query]
+    shared = [emb for types, emb in searches if types != engine._select_collections(context.query_analysis.intent)]
+    assert shared == [[0.1, 0.2]] * 3
+    for stage in ("analysis", "context_chain", "embedding", "errors", "solutions", "tasks", "total"):
+        assert stage in context.timings
+    assert context.timings["total"] < sum(context.timings[s] for s in ("errors", "solutions", "tasks"))
+
+
+def test_cached_context_is_invalidated_by_writes():
+    engine, _, searches = make_engine()
+
+    async def run():
+        await engine.get_context("where is the spawn manager")
+        count = len(searches)
+        await engine.get_context("where is the spawn manager")
+        assert len(searches) == count
+        await engine.qdrant._notify_write([UnityCollectionType.SCRIPTS], "other-project")
+        await engine.get_context("where is the spawn manager")
+        assert len(searches) == count
+        await engine.qdrant._notify_write([UnityCollectionType.SCRIPTS], "p1")
+        await engine.get_context("where is the spawn manager")
+        assert len(searches) == 2 * count
+        assert engine.cache_stats()["query_cache"]["hits"] == 2
+
+    asyncio.run(run())
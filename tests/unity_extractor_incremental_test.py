@@ -0,0 +1,116 @@
+import sys, os
+import asyncio
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import unity_knowledge_extractor
+from python.helpers.unity_knowledge_extractor import UnityKnowledgeExtractor
+
+SCRIPT = """using UnityEngine;
+namespace Game {
+    public class Player : MonoBehaviour {
+        public float speed = 2f;
+        void Update() { }
+    }
+}
+"""
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.scripts = []
+
+    async def ensure_all_unity_collections(self):
+        pass
+
+    async def store_script(self, file_path, content, classes, project_id, metadata):
+        self.scripts.append((file_path, classes, metadata))
+        return file_path
+
+    async def store_asset(self, **kwargs):
+        return kwargs["asset_path"]
+
+
+def make_extractor(qdrant, workers):
+    return UnityKnowledgeExtractor(qdrant, "test-project", process_workers=workers)
+
+
+def test_incremental_extraction_skips_unchanged_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(unity_knowledge_extractor, "STATE_DIR", str(tmp_path / "state"))
+    project = tmp_path / "project"
+    (project / "Assets").mkdir(parents=True)
+    script = project / "Assets" / "Player.cs"
+    script.write_text(SCRIPT)
+
+    qdrant = FakeQdrant()
+    progress = asyncio.run(make_extractor(qdrant, 1).extract_project(str(project)))
+    assert progress.scripts_extracted == 1 and not progress.errors
+    _, classes, metadata = qdrant.scripts[0]
+    assert classes[0]["name"] == "Player" and metadata["has_unity_callbacks"]
+
+    state = json.loads((tmp_path / "state" / "test-project_files.json").read_text())
+    assert list(state["hashes"]) == [str(script)]
+
+    # a fresh extractor reads the persisted stats and does not touch the file
+    extractor = make_extractor(qdrant, 0)
+    monkeypatch.setattr(extractor, "_compute_file_hash", lambda path: (_ for _ in ()).throw(AssertionError))
+    assert asyncio.run(extractor.extract_project(str(project))).total_files == 0
+
+    # touched without changes: hashed once, stats updated, not re-indexed
+    os.utime(script, ns=(1, 1))
+    extractor = make_extractor(qdrant, 0)
+    assert asyncio.run(extractor.extract_project(str(project))).total_files == 0
+    assert extractor._file_stats[str(script)][0] == 1
+
+    script.write_text(SCRIPT.replace("Player", "Enemy"))
+    progress = asyncio.run(make_extractor(qdrant, 0).extract_project(str(project)))
+    assert progress.scripts_extracted == 1
+    assert qdrant.scripts[-1][1][0]["name"] == "Enemy"
+
+
+def test_failed_files_are_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(unity_knowledge_extractor, "STATE_DIR", str(tmp_path / "state"))
+    project = tmp_path / "project"
+    (project / "Assets").mkdir(parents=True)
+    (project / "Assets" / "Player.cs").write_text(SCRIPT)
+
+    qdrant = FakeQdrant()
+    extractor = make_extractor(qdrant, 0)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("embedding service down")
+
+    monkeypatch.setattr(qdrant, "store_script", fail)
+    progress = asyncio.run(extractor.extract_project(str(project)))
+    assert len(progress.errors) == 1
+
+    monkeypatch.undo()
+    monkeypatch.setattr(unity_knowledge_extractor, "STATE_DIR", str(tmp_path / "state"))
+    assert asyncio.run(make_extractor(qdrant, 0).extract_project(str(project))).scripts_extracted == 1
+
+
+def test_watcher_parses_inline_and_commits_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(unity_knowledge_extractor, "STATE_DIR", str(tmp_path / "state"))
+    project = tmp_path / "project"
+    (project / "Assets").mkdir(parents=True)
+    script = project / "Assets" / "Player.cs"
+    script.write_text(SCRIPT)
+
+    qdrant = FakeQdrant()
+    extractor = make_extractor(qdrant, 4)
+    watcher = unity_knowledge_extractor.UnityKnowledgeWatcher(extractor, str(project), debounce_seconds=0)
+
+    async def update():
+        watcher._pending_updates.add(script)
+        await watcher._process_updates()
+
+    asyncio.run(update())
+    assert len(qdrant.scripts) == 1
+    assert extractor._pool is None  # parsed in a thread, no worker processes left behind
+    state = json.loads((tmp_path / "state" / "test-project_files.json").read_text())
+    assert list(state["hashes"]) == [str(script)]
+
+    # saved again without changes, not re-indexed
+    os.utime(script, ns=(1, 1))
+    asyncio.run(update())
+    assert len(qdrant.scripts) == 1
@@ -0,0 +1,54 @@
+import sys, os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers.unity_memory_cache import LRUCache, QueryResultCache, collection_tag
+
+
+def test_lru_cache_is_bounded_by_bytes():
+    async def run():
+        cache = LRUCache(max_size=100, max_bytes=10_000)
+        for i in range(10):
+            await cache.set(f"k{i}", "x" * 3_000)
+        stats = cache.stats()
+        assert stats["size"] == 3 and stats["bytes"] <= 10_000
+        assert stats["evictions"] == 7
+        assert await cache.get("k9") is not None and await cache.get("k0") is None
+        # values larger than the whole cache are not stored
+        await cache.set("huge", "x" * 20_000)
+        assert await cache.get("huge") is None
+        assert cache.stats()["hit_rate"] == 1 / 3
+
+    asyncio.run(run())
+
+
+def test_lru_cache_invalidates_by_tag():
+    async def run():
+        cache = LRUCache(max_size=10)
+        await cache.set("a", 1, tags=["scripts", "p1"])
+        await cache.set("b", 2, tags=["scenes", "p1"])
+        await cache.set("c", 3, tags=["scenes"])
+        assert await cache.invalidate("scripts") == 1
+        assert await cache.get("a") is None and await cache.get("b") == 2
+        assert await cache.invalidate("scenes", "p1") == 2
+        assert cache.stats()["size"] == 0 and cache.stats()["invalidations"] == 3
+
+    asyncio.run(run())
+
+
+def test_query_cache_invalidates_only_its_collection():
+    async def run():
+        cache = QueryResultCache()
+        await cache.set("Player movement", ["script"], collection="scripts")
+        await cache.set("Main scene", ["scene"], collection="scenes")
+        await cache.invalidate_collection("scripts")
+        assert await cache.get("player  movement", collection="scripts") is None
+        assert await cache.get("main scene", collection="scenes") == ["scene"]
+
+        await cache.set("enemy", ["x"], tags=[collection_tag("scripts", "p1")])
+        await cache.invalidate_collection("scripts", "p2")
+        assert await cache.get("enemy") == ["x"]
+        await cache.invalidate_collection("scripts", "p1")
+        assert await cache.get("enemy") is None
+
+    asyncio.run(run())
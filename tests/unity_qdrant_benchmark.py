@@ -0,0 +1,165 @@
+# Relationship enrichment and multi-hop expansion against an in-memory Qdrant,
+# batched lookups vs the previous per-result / per-id round-trips.
+# Run manually: python tests/unity_qdrant_benchmark.py [--latency-ms 2]
+import sys, os
+import asyncio
+import random
+import time
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import Filter, FieldCondition, MatchValue
+from langchain_core.documents import Document
+from python.helpers.unity_qdrant_enhanced import (
+    UnityQdrantEnhanced, UnityCollectionType, UnitySearchResult
+)
+
+SCRIPTS = 2_000
+LINKS = 5  # relationships per script
+RESULTS = 20
+LATENCY = float(sys.argv[sys.argv.index("--latency-ms") + 1]) / 1000 if "--latency-ms" in sys.argv else 0.0
+DIM = 32
+
+
+class RandomEmbedder:
+    def embed_query(self, text):
+        rnd = random.Random(text)
+        return [rnd.uniform(-1, 1) for _ in range(DIM)]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+class CountingClient:
+    """Counts round-trips to the client and optionally adds network latency to each."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in ("scroll", "retrieve", "search"):
+            return attr
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            if LATENCY:
+                await asyncio.sleep(LATENCY)
+            return await attr(*args, **kwargs)
+        return call
+
+
+async def legacy_enrich(qdrant, results):
+    collection = qdrant._get_collection_name(UnityCollectionType.RELATIONSHIPS)
+    for result in results:
+        entity_id = result.document.metadata.get("original_id")
+        rels = await qdrant.client.scroll(
+            collection_name=collection,
+            scroll_filter=Filter(should=[
+                FieldCondition(key="source_entity", match=MatchValue(value=entity_id)),
+                FieldCondition(key="target_entity", match=MatchValue(value=entity_id)),
+            ]),
+            limit=10, with_vectors=False,
+        )
+        result.relationships.extend(point.payload for point in rels[0])
+
+
+async def legacy_multi_hop(qdrant, results):
+    expanded = list(results)
+    seen = {r.document.metadata.get("original_id") for r in results}
+    related = {
+        rel.get(key) for r in results for rel in r.relationships
+        for key in ("source_entity", "target_entity") if rel.get(key) not in seen
+    }
+    for ct in UnityCollectionType:
+        if ct == UnityCollectionType.RELATIONSHIPS:
+            continue
+        for rel_id in related:
+            try:
+                points = await qdrant.client.retrieve(
+                    collection_name=qdrant._get_collection_name(ct), ids=[rel_id], with_vectors=False
+                )
+            except Exception:
+                continue
+            for point in points:
+                payload = dict(point.payload or {})
+                expanded.append(UnitySearchResult(
+                    document=Document(page_content=payload.pop("text", ""), metadata=payload),
+                    score=0.5, collection=ct.value,
+                ))
+    return expanded
+
+
+async def populate() -> UnityQdrantEnhanced:
+    qdrant = UnityQdrantEnhanced(embedder=RandomEmbedder(), enable_sparse=False, score_threshold=-1.0)
+    qdrant.client = AsyncQdrantClient(location=":memory:")
+    await qdrant.ensure_all_unity_collections()
+
+    ids = []
+    for i in range(SCRIPTS):
+        ids.append(await qdrant.store_script(
+            file_path=f"Assets/Scripts/Script{i}.cs",
+            content=f"public class Script{i} : MonoBehaviour {{ }}",
+            classes=[{"name": f"Script{i}", "methods": []}],
+            project_id="bench",
+        ))
+    rnd = random.Random(0)
+    for doc_id in ids:
+        await qdrant._store_relationships(doc_id, rnd.sample(ids, LINKS), "references", "bench")
+    return qdrant
+
+
+async def search(qdrant):
+    # primary search without relationships, enrichment and expansion are timed separately
+    return await qdrant.search_unity(
+        "player movement controller", collection_types=[UnityCollectionType.SCRIPTS],
+        project_id="bench", limit=RESULTS,
+    )
+
+
+async def main():
+    start = time.perf_counter()
+    qdrant = await populate()
+    print(f"populated {SCRIPTS} scripts with {SCRIPTS * LINKS} relationships in {time.perf_counter() - start:.1f}s")
+    counting = CountingClient(qdrant.client)
+    qdrant.client = counting
+
+    for name, enrich, expand in (
+        ("legacy ", legacy_enrich, lambda q, r: legacy_multi_hop(q, r)),
+        ("batched", lambda q, r: q._enrich_with_relationships(r),
+         lambda q, r: q._multi_hop_expansion(r, [], "bench", depth=1, budget=10_000)),
+    ):
+        results = await search(qdrant)
+        counting.calls = 0
+        start = time.perf_counter()
+        await enrich(qdrant, results)
+        expanded = await expand(qdrant, results)
+        elapsed = time.perf_counter() - start
+        rels = sum(len(r.relationships) for r in results)
+        print(
+            f"{name}: {len(results)} results, {rels} relationships, {len(expanded) - len(results)} expanded, "
+            f"{counting.calls} round-trips, {elapsed * 1000:.1f} ms"
+        )
+
+    results = await search(qdrant)
+    counting.calls = 0
+    start = time.perf_counter()
+    await qdrant._enrich_with_relationships(results)
+    expanded = await qdrant._multi_hop_expansion(results, [], "bench", depth=3, budget=200)
+    print(
+        f"batched depth 3, budget 200: {len(expanded) - len(results)} expanded, "
+        f"{counting.calls} round-trips, {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")  # local mode ignores payload indexes
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+import sys, os
+import asyncio
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qdrant_client import AsyncQdrantClient
+from python.helpers.unity_qdrant_enhanced import UnityQdrantEnhanced, UnityCollectionType
+
+
+class Embedder:
+    async def aembed_query(self, text):
+        return [1.0, float(len(text) % 7), 0.5]
+
+
+class SameVectorEmbedder:
+    async def aembed_query(self, text):
+        return [0.6, 0.8, 0.0]
+
+    async def aembed_documents(self, texts):
+        return [[0.6, 0.8, 0.0] for _ in texts]
+
+
+class CountingClient:
+    def __init__(self, client):
+        self.client = client
+        self.calls = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return await attr(*args, **kwargs)
+        return call
+
+
+async def make_graph(count: int):
+    # script i references i + 1 and i + 2
+    warnings.simplefilter("ignore")
+    qdrant = UnityQdrantEnhanced(embedder=Embedder(), enable_sparse=False, score_threshold=-1.0)
+    qdrant.client = AsyncQdrantClient(location=":memory:")
+    await qdrant.ensure_all_unity_collections()
+    ids = [
+        await qdrant.store_script(f"Assets/S{i}.cs", f"class S{i} {{}}", [{"name": f"S{i}"}], "p")
+        for i in range(count)
+    ]
+    for i, doc_id in enumerate(ids):
+        await qdrant._store_relationships(doc_id, ids[i + 1:i + 3], "references", "p")
+    counting = CountingClient(qdrant.client)
+    qdrant.client = counting
+    return qdrant, counting, ids
+
+
+def test_enrichment_and_expansion_are_batched():
+    async def run():
+        qdrant, counting, ids = await make_graph(12)
+        results = await qdrant.search_unity("class", collection_types=[UnityCollectionType.SCRIPTS], limit=3)
+        counting.calls.clear()
+
+        await qdrant._enrich_with_relationships(results)
+        assert counting.calls == {"scroll": 1}
+        for result in results:
+            own = result.document.metadata["original_id"]
+            assert result.relationships
+            assert all(own in (r["source_entity"], r["target_entity"]) for r in result.relationships)
+
+        counting.calls.clear()
+        expanded = await qdrant._multi_hop_expansion(results, [], "p", depth=1, budget=100)
+        # one retrieve per collection, not per related id
+        assert counting.calls == {"retrieve": len(UnityCollectionType) - 1}
+        new_ids = [r.document.metadata["original_id"] for r in expanded[len(results):]]
+        assert len(new_ids) == len(set(new_ids)) > 0
+        assert not set(new_ids) & {r.document.metadata["original_id"] for r in results}
+
+    asyncio.run(run())
+
+
+def test_multi_hop_depth_respects_budget():
+    async def run():
+        qdrant, _, ids = await make_graph(30)
+        results = await qdrant.search_unity("class", collection_types=[UnityCollectionType.SCRIPTS], limit=1)
+        await qdrant._enrich_with_relationships(results)
+        one_hop = await qdrant._multi_hop_expansion(results, [], "p", depth=1, budget=100)
+        deep = await qdrant._multi_hop_expansion(results, [], "p", depth=4, budget=100)
+        assert len(deep) > len(one_hop)
+        capped = await qdrant._multi_hop_expansion(results, [], "p", depth=4, budget=3)
+        assert len(capped) == len(results) + 3
+
+    asyncio.run(run())
+
+
+def test_entity_dependencies_follow_levels():
+    async def run():
+        qdrant, counting, ids = await make_graph(1)
+        await qdrant._store_relationships("a", ["b", "c"], "depends_on", "p")
+        await qdrant._store_relationships("b", ["d"], "depends_on", "p")
+        await qdrant._store_relationships("d", ["e"], "depends_on", "p")
+        counting.calls.clear()
+        deps = await qdrant.get_entity_dependencies("a", depth=2)
+        assert sorted(d["target_entity"] for d in deps) == ["b", "c", "d"]
+        assert counting.calls == {"scroll": 2}
+
+    asyncio.run(run())
+
+
+def test_hub_entity_does_not_starve_others():
+    async def run():
+        qdrant, counting, ids = await make_graph(4)
+        # the first script references far more entities than a shared budget of 4 * 10
+        hub_targets = [f"extra-{i}" for i in range(300)]
+        await qdrant._store_relationships(ids[0], hub_targets, "references", "p")
+        results = await qdrant.search_unity("class", collection_types=[UnityCollectionType.SCRIPTS], limit=4)
+        for result in results:
+            result.relationships.clear()
+
+        await qdrant._enrich_with_relationships(results)
+        counts = {r.document.metadata["original_id"]: len(r.relationships) for r in results}
+        assert counts[ids[0]] == qdrant.RELATIONSHIPS_PER_ENTITY
+        # S1 references S2, S3 and is referenced by S0
+        assert counts[ids[1]] == 3
+        assert all(counts[i] > 0 for i in ids)
+
+    asyncio.run(run())
+
+
+def test_hybrid_search_scores_are_dense_similarity(tmp_path):
+    async def run():
+        warnings.simplefilter("ignore")
+        qdrant = UnityQdrantEnhanced(
+            embedder=SameVectorEmbedder(), enable_sparse=True, score_threshold=-1.0, sparse_stats_dir=str(tmp_path)
+        )
+        qdrant.client = AsyncQdrantClient(location=":memory:")
+        await qdrant.ensure_all_unity_collections()
+        for i in range(3):
+            await qdrant.store_script(f"Assets/S{i}.cs", f"class S{i} {{}}", [{"name": f"S{i}"}], "p")
+        return await qdrant.search_unity("class S1", collection_types=[UnityCollectionType.SCRIPTS], limit=3)
+
+    results = asyncio.run(run())
+    assert len(results) == 3
+    for result in results:
+        # cosine similarity of identical vectors, not a rank based fusion score
+        assert abs(result.score - 1.0) < 1e-6, result.score
@@ -0,0 +1,66 @@
+# Parses synthetic Unity scenes with the single-pass parser and, for small scenes, the previous regex parser.
+# Run manually: python tests/unity_yaml_benchmark.py [--legacy]
+import sys, os
+import re
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import unity_yaml
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_scene(count: int) -> str:
+    # every GameObject has a Transform and a MonoBehaviour, objects are nested 10 per parent
+    parts = ["%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"]
+    for i in range(count):
+        go, tr, mb = 1000 + i * 3, 1001 + i * 3, 1002 + i * 3
+        father = 1001 + (i // 10) * 3 if i >= 10 else 0
+        parts.append(
+            f"--- !u!1 &{go}\nGameObject:\n  m_ObjectHideFlags: 0\n  serializedVersion: 6\n"
+            f"  m_Component:\n  - component: {{fileID: {tr}}}\n  - component: {{fileID: {mb}}}\n"
+            f"  m_Layer: {i % 8}\n  m_Name: Object {i}\n  m_TagString: Untagged\n  m_IsActive: 1\n"
+            f"--- !u!4 &{tr}\nTransform:\n  m_ObjectHideFlags: 0\n  m_GameObject: {{fileID: {go}}}\n"
+            f"  m_LocalPosition: {{x: {i}, y: 0, z: 0}}\n  m_Children: []\n  m_Father: {{fileID: {father}}}\n"
+            f"--- !u!114 &{mb}\nMonoBehaviour:\n  m_ObjectHideFlags: 0\n  m_GameObject: {{fileID: {go}}}\n"
+            f"  m_Enabled: 1\n  m_Script: {{fileID: 11500000, guid: 0123456789abcdef0123456789abcdef, type: 3}}\n"
+            f"  speed: {i * 0.5}\n"
+        )
+    return "".join(parts)
+
+
+def legacy_parse(content: str) -> int:
+    # the previous implementation: lazy regex per GameObject, full-content searches per component
+    go_pattern = r"--- !u!1 &(\d+)\s*GameObject:\s*m_ObjectHideFlags: \d+[\s\S]*?m_Name: ([^\n]+)[\s\S]*?m_TagString: ([^\n]+)[\s\S]*?m_Layer: (\d+)"
+    count = 0
+    for match in re.finditer(go_pattern, content):
+        section = re.search(rf"--- !u!1 &{match.group(1)}[\s\S]*?(?=--- !u!|$)", content)
+        for comp_id in re.findall(r"component:\s*\{fileID: (\d+)\}", section.group() if section else ""):
+            re.search(rf"--- !u!(\d+) &{comp_id}[\s\S]*?(?=--- !u!|$)", content)
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in SIZES:
+            content = make_scene(count)
+            path = os.path.join(tmp, f"scene_{count}.unity")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+            start = time.perf_counter()
+            objects = unity_yaml.parse_unity_file(path)
+            elapsed = time.perf_counter() - start
+            linked = sum(len(go.children_ids) for go in objects)
+            line = (
+                f"{count:>7} GameObjects, {len(content) / 1e6:6.1f} MB: "
+                f"single-pass {elapsed:.3f}s ({len(objects)} objects, {linked} child links)"
+            )
+            if count <= 1_000 or "--legacy" in sys.argv:
+                start = time.perf_counter()
+                legacy_parse(content)
+                legacy = time.perf_counter() - start
+                line += f", legacy regex {legacy:.3f}s ({legacy / elapsed:.0f}x)"
+            print(line)
@@ -0,0 +1,78 @@
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.helpers import unity_yaml
+
+SCENE = """%YAML 1.1
+%TAG !u! tag:unity3d.com,2011:
+--- !u!1 &100
+GameObject:
+  m_ObjectHideFlags: 0
+  serializedVersion: 6
+  m_Component:
+  - component: {fileID: 101}
+  - component: {fileID: 102}
+  m_Layer: 5
+  m_Name: Player
+  m_TagString: Player
+  m_IsActive: 1
+--- !u!4 &101
+Transform:
+  m_GameObject: {fileID: 100}
+  m_Children:
+  - {fileID: 201}
+  m_Father: {fileID: 0}
+--- !u!114 &102
+MonoBehaviour:
+  m_GameObject: {fileID: 100}
+  m_Script: {fileID: 11500000, guid: abcdef0123456789abcdef0123456789, type: 3}
+--- !u!1 &200
+GameObject:
+  m_ObjectHideFlags: 0
+  m_Component:
+  - component: {fileID: 201}
+  - component: {fileID: 999}
+  m_Layer: 0
+  m_Name: Weapon
+  m_TagString: Untagged
+  m_IsActive: 0
+--- !u!4 &201
+Transform:
+  m_GameObject: {fileID: 200}
+  m_Father: {fileID: 101}
+--- !u!1 &300 stripped
+GameObject:
+  m_CorrespondingSourceObject: {fileID: 1, guid: 0000, type: 3}
+"""
+
+
+def check(objects):
+    assert [go.name for go in objects] == ["Player", "Weapon"]
+    player, weapon = objects
+    assert player.tag == "Player" and player.layer == 5 and player.is_active
+    assert [c["type"] for c in player.components] == ["Transform", "MonoBehaviour"]
+    assert player.components[1]["script_guid"] == "abcdef0123456789abcdef0123456789"
+    assert not weapon.is_active
+    # unknown component references are skipped
+    assert [c["type"] for c in weapon.components] == ["Transform"]
+    # m_Father references the parent Transform, resolved to its GameObject
+    assert player.parent_id is None
+    assert weapon.parent_id == "100"
+    assert player.children_ids == ["200"]
+    assert weapon.transform and weapon.transform["parent"] == "101"
+
+
+def test_parse_text():
+    check(unity_yaml.parse_unity_yaml(SCENE))
+
+
+def test_parse_file_matches_text(tmp_path):
+    path = tmp_path / "scene.unity"
+    path.write_text("﻿" + SCENE, encoding="utf-8")
+    check(unity_yaml.parse_unity_file(path))
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.prefab"
+    path.write_bytes(b"")
+    assert unity_yaml.parse_unity_file(path) == []
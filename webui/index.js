@@ -253,6 +253,10 @@ function setConnectionStatus(connected) {
 let lastLogVersion = 0;
 let lastLogGuid = "";
 let lastSpokenNo = 0;
+let lastListingVersion = null;
+let lastListingGuid = null;
+// full content of log items by message id, streamed items arrive as appended text
+const logContents = new Map();
 
 export async function poll() {
   let updated = false;
@@ -263,6 +267,9 @@ export async function poll() {
     const log_from = lastLogVersion;
     const response = await sendJsonData("/poll", {
       log_from: log_from,
+      log_deltas: true,
+      listing_version: lastListingVersion,
+      listing_guid: lastListingGuid,
       notifications_from: notificationStore.lastNotificationVersion || 0,
       context: context || null,
       timezone: timezone,
@@ -294,6 +301,7 @@ export async function poll() {
       if (chatHistoryEl) chatHistoryEl.innerHTML = "";
       lastLogVersion = 0;
       lastLogGuid = response.log_guid;
+      logContents.clear();
       await poll();
       return;
     }
@@ -302,6 +310,19 @@ export async function poll() {
       updated = true;
       for (const log of response.logs) {
         const messageId = log.id || log.no; // Use log.id if available
+        if (log.content_from) {
+          const previous = logContents.get(messageId);
+          if (previous === undefined || previous.length < log.content_from) {
+            // missing the streamed part, reload the whole log
+            lastLogVersion = 0;
+            logContents.clear();
+            await poll();
+            return;
+          }
+          log.content = previous.slice(0, log.content_from) + log.content;
+          delete log.content_from;
+        }
+        logContents.set(messageId, log.content);
         setMessage(
           messageId,
           log.type,
@@ -328,13 +349,14 @@ export async function poll() {
     // Update status icon state
     setConnectionStatus(true);
 
-    // Update chats list using store
-    let contexts = response.contexts || [];
-    chatsStore.applyContexts(contexts);
-
-    // Update tasks list using store
-    let tasks = response.tasks || [];
-    tasksStore.applyTasks(tasks);
+    // Chats and tasks lists are only sent when they changed
+    if (response.contexts !== undefined) {
+      chatsStore.applyContexts(response.contexts || []);
+      tasksStore.applyTasks(response.tasks || []);
+    }
+    lastListingVersion = response.listing_version ?? null;
+    lastListingGuid = response.listing_guid ?? null;
+    const contexts = chatsStore.contexts;
 
     // Make sure the active context is properly selected in both lists
     if (context) {
@@ -478,6 +500,7 @@ export const setContext = function (id) {
   lastLogGuid = "";
   lastLogVersion = 0;
   lastSpokenNo = 0;
+  logContents.clear();
 
   // Stop speech when switching chats
   speechStore.stopAudio();